@@ -0,0 +1,17 @@
+"""
+Fixtures Pytest partagées par les tests de toutes les applications.
+"""
+
+import pytest
+from django.core.cache import caches
+
+
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """
+    Vide tous les caches Django avant chaque test, pour que les entrées
+    laissées par un test ne faussent pas le suivant.
+    """
+    for cache in caches.all(initialized_only=True):
+        cache.clear()
+    yield
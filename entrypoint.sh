@@ -4,8 +4,14 @@ set -e
 echo "==> Applying migrations..."
 python manage.py migrate --noinput
 
-echo "==> Collecting static files..."
-python manage.py collectstatic --noinput
+# Journal WAL, enregistré dans le fichier SQLite (sans effet sur PostgreSQL)
+echo "==> Setting SQLite journal mode..."
+python manage.py set_journal_mode
+
+# Les fichiers statiques sont construits au build de l'image : ils ne sont
+# recollectés que si les sources ont changé depuis (volume monté en dev...)
+echo "==> Checking static files..."
+python manage.py build_assets --if-stale
 
 echo "==> Starting application..."
 exec "$@"
@@ -0,0 +1,87 @@
+"""
+Configuration gunicorn, chargée depuis le dossier de lancement de ``serve.sh``.
+
+Classe, nombre de workers et de threads, keep-alive, délais et recyclage
+des workers sont calculés d'après le CPU et la mémoire du conteneur, ou
+imposés par l'environnement (``WEB_CONCURRENCY``, ``GUNICORN_THREADS``...) :
+voir :mod:`oc_lettings_site.server_config`.
+
+``GUNICORN_PRELOAD`` (``True`` par défaut) charge l'application dans le
+processus maître avant de créer les workers : ils démarrent sans réimporter
+Django ni recompiler les templates, et partagent cette mémoire. Les hooks
+ci-dessous libèrent et recréent les ressources propres à chaque processus
+(voir :mod:`oc_lettings_site.workers`). Sans préchargement, chaque worker
+importe l'application lui-même et les hooks n'ont rien à faire.
+
+À son arrêt, chaque worker journalise le nombre de requêtes servies par
+route, l'histogramme de leurs latences et les compteurs du cache d'objets
+(voir :mod:`oc_lettings_site.worker_stats`).
+
+``GUNICORN_BOOT_LOG`` et ``GUNICORN_STATS_LOG`` désignent des fichiers où
+chaque worker ajoute, en JSON Lines, la durée de son démarrage (utilisé par
+``benchmark_startup``) et son résumé à l'arrêt (``benchmark_gunicorn``).
+"""
+import json
+import os
+import time
+
+from oc_lettings_site.server_config import cpu_limit, memory_limit, server_settings
+
+preload_app = os.environ.get("GUNICORN_PRELOAD", "True") == "True"
+
+_server = server_settings()
+worker_class = _server['worker_class']
+workers = _server['workers']
+threads = _server['threads']
+keepalive = _server['keepalive']
+timeout = _server['timeout']
+graceful_timeout = _server['graceful_timeout']
+max_requests = _server['max_requests']
+max_requests_jitter = _server['max_requests_jitter']
+
+
+def when_ready(server):
+    memory = memory_limit()
+    server.log.info(
+        "%s workers %s × %s threads (CPU %.2f, mémoire %s Mo), max_requests %s ± %s",
+        server.cfg.workers, server.cfg.worker_class_str, server.cfg.threads, cpu_limit(),
+        memory // 2**20 if memory else '?', server.cfg.max_requests,
+        server.cfg.max_requests_jitter,
+    )
+
+
+def pre_fork(server, worker):
+    if server.cfg.preload_app:
+        from oc_lettings_site.workers import prepare_fork
+
+        prepare_fork()
+
+
+def post_fork(server, worker):
+    worker.boot_started = time.time()
+    if server.cfg.preload_app:
+        from oc_lettings_site.workers import init_worker
+
+        init_worker()
+
+
+def post_worker_init(worker):
+    boot_ms = (time.time() - worker.boot_started) * 1000
+    worker.log.info("Worker %s prêt en %.0f ms", worker.pid, boot_ms)
+    boot_log = os.environ.get("GUNICORN_BOOT_LOG")
+    if boot_log:
+        with open(boot_log, 'a', encoding='utf-8') as file:
+            file.write(json.dumps({
+                'pid': worker.pid, 'started': worker.boot_started, 'boot_ms': boot_ms,
+            }) + '\n')
+
+
+def worker_exit(server, worker):
+    from oc_lettings_site import worker_stats
+
+    summary = worker_stats.summary()
+    server.log.info("Worker %s : %s", worker.pid, json.dumps(dict(summary, pid=worker.pid)))
+    stats_log = os.environ.get("GUNICORN_STATS_LOG")
+    if stats_log:
+        with open(stats_log, 'a', encoding='utf-8') as file:
+            file.write(json.dumps(dict(summary, pid=worker.pid)) + '\n')
@@ -0,0 +1,199 @@
+"""
+API JSON en lecture seule des locations.
+
+Routes :
+    ``/api/lettings/`` : liste paginée par curseur (:func:`letting_list`).
+    ``/api/lettings/<id>/`` : une location (:func:`letting_detail`).
+    ``/api/lettings/export/`` : catalogue complet diffusé en NDJSON ou CSV
+    (:func:`export`).
+
+Chaque location est renvoyée avec son adresse imbriquée, restreinte aux
+champs du paramètre ``fields`` (voir :mod:`oc_lettings_site.api`).
+
+Comme la page de détail, :func:`letting_detail` lit la location par le cache
+d'objets (un identifiant inconnu y reste brièvement mémorisé) et limite le
+débit par adresse IP.
+"""
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import StreamingHttpResponse
+from django.views.decorators.http import require_safe
+from oc_lettings_site import api, object_cache
+from oc_lettings_site.bulk import ChunkEncoder
+from oc_lettings_site.db_routing import use_read_database
+from oc_lettings_site.page_cache import cached_page
+from oc_lettings_site.pagination import paginate
+from oc_lettings_site.rate_limit import rate_limited
+from . import bulk
+from .models import Letting, LettingSummary
+
+ADDRESS_FIELDS = {
+    'number': 'address__number',
+    'street': 'address__street',
+    'city': 'address__city',
+    'state': 'address__state',
+    'zip_code': 'address__zip_code',
+    'country_iso_code': 'address__country_iso_code',
+}
+
+LETTING_FIELDS = {
+    'id': 'id',
+    'title': 'title',
+    'address': ADDRESS_FIELDS,
+}
+
+# Formats d'export : paramètre ``format`` → (format de RowWriter, type MIME, extension)
+EXPORT_FORMATS = {
+    'ndjson': ('jsonl', 'application/x-ndjson; charset=utf-8', 'ndjson'),
+    'csv': ('csv', 'text/csv; charset=utf-8', 'csv'),
+}
+
+
+@api.api_view
+@cached_page('lettings')
+@use_read_database
+def letting_list(request):
+    """
+    Vue qui renvoie une page de locations en JSON.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue (``fields``, ``after``,
+            ``before``, ``size``).
+
+    Returns:
+        JsonResponse: ``{"results": [...], "next": url, "previous": url}``.
+    """
+    fields = api.select_fields(request, LETTING_FIELDS)
+    rows = Letting.objects.values('id', *api.orm_paths(fields))
+    page = paginate(rows, request, settings.LETTINGS_PAGE_SIZE)
+    data = {'results': [api.shape(row, fields) for row in page]}
+    data.update(api.page_links(request, page))
+    return api.json_response(data)
+
+
+def _summary_row(summary):
+    """Renvoie les valeurs d'un résumé de location, indexées par chemin ORM."""
+    row = {path: getattr(summary, name) for name, path in ADDRESS_FIELDS.items()}
+    row.update(id=summary.pk, title=summary.title)
+    return row
+
+
+@api.api_view
+@rate_limited('letting')
+@cached_page('lettings')
+@use_read_database
+def letting_detail(request, letting_id):
+    """
+    Vue qui renvoie une location en JSON.
+
+    La location est lue dans la table des résumés par le cache d'objets,
+    partagé avec la page de détail : les demandes répétées d'un identifiant
+    inconnu ne touchent pas la base.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue (``fields``).
+        letting_id (int): L'identifiant de la location.
+
+    Returns:
+        JsonResponse: La location, ou une erreur 404.
+    """
+    fields = api.select_fields(request, LETTING_FIELDS)
+    try:
+        summary = object_cache.get_or_load(
+            'letting', letting_id, lambda: LettingSummary.objects.get(pk=letting_id),
+        )
+    except ObjectDoesNotExist:
+        return api.json_error("Location introuvable.", status=404)
+    return api.json_response(api.shape(_summary_row(summary), fields))
+
+
+def _export_response(request, stream_rows):
+    """
+    Prépare la réponse diffusée d'un export, ou une erreur 400.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue (``format``, ``compress``).
+        stream_rows (callable): Reçoit un :class:`ChunkEncoder` et renvoie le
+            générateur, synchrone ou asynchrone, des morceaux du fichier.
+
+    Returns:
+        HttpResponse: La réponse diffusée, ou une erreur JSON.
+    """
+    export_format = EXPORT_FORMATS.get(request.GET.get('format', 'ndjson'))
+    if export_format is None:
+        return api.json_error(
+            f"Format inconnu. Formats disponibles : {', '.join(EXPORT_FORMATS)}.", status=400
+        )
+    compress = request.GET.get('compress')
+    if compress not in (None, 'gzip'):
+        return api.json_error("Compression inconnue. Valeur disponible : gzip.", status=400)
+
+    fmt, content_type, extension = export_format
+    filename = f'lettings.{extension}'
+    if compress:
+        content_type = 'application/gzip'
+        filename += '.gz'
+    encoder = ChunkEncoder(bulk.LETTING_FIELDS, fmt, compress=bool(compress))
+    response = StreamingHttpResponse(stream_rows(encoder), content_type=content_type)
+    response['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
+
+
+@require_safe
+@cached_page('lettings')
+@use_read_database
+def export(request):
+    """
+    Vue qui diffuse le catalogue complet des locations et de leurs adresses.
+
+    Les lignes sont lues par une seule requête jointe, au fil d'un itérateur
+    côté serveur, puis encodées et envoyées par lots de ``EXPORT_CHUNK_SIZE`` :
+    la mémoire du worker reste constante quelle que soit la taille de la
+    table. Le fichier produit peut être réimporté par ``import_lettings``.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue (``format`` : ``ndjson``
+            par défaut ou ``csv`` ; ``compress=gzip`` pour un fichier gzip
+            compressé au fil de l'eau).
+
+    Returns:
+        StreamingHttpResponse: Le fichier diffusé, ou une erreur 400.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    # Le générateur est consommé après le retour de la vue : l'alias de
+    # lecture est fixé tant qu'il est encore connu
+    rows = bulk.iter_lettings(chunk_size, using=Letting.objects.db)
+
+    def generate(encoder):
+        yield encoder.header()
+        while chunk := list(islice(rows, chunk_size)):
+            # gzip retient les petits lots : pas de morceau vide
+            if data := encoder.encode(chunk):
+                yield data
+        yield encoder.finish()
+
+    return _export_response(request, generate)
+
+
+@require_safe
+@cached_page('lettings')
+@use_read_database
+async def export_async(request):
+    """
+    Version asynchrone de :func:`export` : les lots sont lus hors de la
+    boucle d'événements et diffusés par un générateur asynchrone, que Django
+    ne met pas en mémoire comme il le ferait d'un itérateur synchrone.
+    """
+    chunk_size = settings.EXPORT_CHUNK_SIZE
+    batches = bulk.aiter_letting_batches(chunk_size, using=Letting.objects.db)
+
+    async def generate(encoder):
+        yield encoder.header()
+        async for batch in batches:
+            if data := encoder.encode(batch):
+                yield data
+        yield encoder.finish()
+
+    return _export_response(request, generate)
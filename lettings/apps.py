@@ -3,3 +3,6 @@ from django.apps import AppConfig
 
 class LettingsConfig(AppConfig):
     name = 'lettings'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,297 @@
+"""
+Construction, écriture, lecture et modification en masse des locations.
+
+Utilisé par les commandes ``import_lettings`` / ``export_lettings`` /
+``edit_lettings``, par les actions de l'admin et par l'export diffusé de
+l'API. Une ligne décrit une location et son adresse, à plat :
+``title, number, street, city, state, zip_code, country_iso_code``.
+
+Les modifications en masse (:func:`retitle_lettings`,
+:func:`normalize_addresses`, :func:`delete_lettings`,
+:func:`delete_addresses`) s'exécutent par lots de clés primaires, chacun
+dans sa transaction, en requêtes ``UPDATE`` / ``DELETE`` ensemblistes :
+aucune instance n'est chargée ni enregistrée une à une, et les signaux ne
+sont pas émis. Les résumés (:mod:`lettings.summary`) et les caches des
+locations touchées sont donc mis à jour ici ; l'index plein texte suit par
+ses triggers.
+"""
+import string
+from itertools import islice
+
+from asgiref.sync import sync_to_async
+from django.db import connections, router, transaction
+from django.db.models import Case, Value, When
+from django.db.models.functions import Replace, StrIndex
+from oc_lettings_site import object_cache, page_cache
+from oc_lettings_site.bulk import pk_batches, validate
+from . import geo, summary
+from .models import Address, Letting, LettingSummary
+
+ADDRESS_FIELDS = ('number', 'street', 'city', 'state', 'zip_code', 'country_iso_code')
+LETTING_FIELDS = ('title',) + ADDRESS_FIELDS
+
+# Codes pays ISO 3166-1 alpha-2 (ou usuels) saisis à la place du code alpha-3
+COUNTRY_ISO_FIXES = {
+    'US': 'USA',
+    'CA': 'CAN',
+    'MX': 'MEX',
+    'GB': 'GBR',
+    'UK': 'GBR',
+    'FR': 'FRA',
+}
+
+
+def build_letting(line_number, row):
+    """
+    Construit et valide l'adresse et la location d'une ligne importée.
+
+    L'adresse est géocodée depuis son code postal, ``bulk_create`` n'appelant
+    pas ``Address.save()``.
+
+    Args:
+        line_number (int): Numéro de la ligne, pour les messages d'erreur.
+        row (dict): Valeurs de la ligne.
+
+    Returns:
+        tuple: ``(Address, Letting)`` non enregistrées.
+
+    Raises:
+        ValidationError: Si une valeur enfreint les validateurs des modèles.
+    """
+    address = Address(**{field: row.get(field, '') for field in ADDRESS_FIELDS})
+    validate(address, line_number)
+    geo.locate(address)
+    letting = Letting(title=row.get('title', ''))
+    validate(letting, line_number, exclude=['address'])
+    return address, letting
+
+
+def write_lettings(batch):
+    """
+    Écrit un lot de couples ``(Address, Letting)`` en deux ``bulk_create``.
+
+    Les clés primaires des adresses sont renvoyées par l'insertion et
+    reportées sur les locations avant leur propre insertion ; les résumés
+    des locations sont ensuite écrits en une requête.
+    """
+    addresses = Address.objects.bulk_create([address for address, _ in batch])
+    lettings = []
+    for address, (_, letting) in zip(addresses, batch):
+        letting.address = address
+        lettings.append(letting)
+    Letting.objects.bulk_create(lettings)
+    summary.refresh(letting.pk for letting in lettings)
+
+
+def after_import():
+    """Invalide les pages ``lettings``, ``bulk_create`` n'émettant pas de signaux."""
+    page_cache.bump_version('lettings')
+
+
+def _letting_rows(using=None):
+    """Requête jointe des valeurs exportées, triée par id."""
+    columns = ('title',) + tuple(f'address__{field}' for field in ADDRESS_FIELDS)
+    return Letting.objects.using(using).order_by('id').values_list(*columns)
+
+
+def iter_lettings(chunk_size=2000, using=None):
+    """
+    Parcourt toutes les locations et leur adresse, triées par id.
+
+    Une seule requête jointe, limitée aux colonnes exportées et lue par un
+    itérateur côté serveur : la mémoire reste constante quelle que soit la
+    taille de la table.
+
+    Args:
+        chunk_size (int): Nombre de lignes lues par aller-retour en base.
+        using (str | None): Alias de la base lue (par défaut, celui du routeur).
+
+    Returns:
+        iterator: Tuples de valeurs, dans l'ordre de ``LETTING_FIELDS``.
+    """
+    return _letting_rows(using).iterator(chunk_size=chunk_size)
+
+
+async def aiter_letting_batches(chunk_size=2000, using=None):
+    """
+    Version asynchrone de :func:`iter_lettings`, par lots.
+
+    Chaque lot est lu dans le thread des appels synchrones à l'ORM. Django
+    5.2 exécute la requête de ``values_list().aiterator()`` dans la boucle
+    d'événements, ce qu'il interdit : l'itérateur synchrone est donc
+    parcouru ici par ``sync_to_async``, un aller-retour par lot.
+
+    Yields:
+        list[tuple]: Au plus ``chunk_size`` tuples de valeurs, dans l'ordre
+        de ``LETTING_FIELDS``.
+    """
+    rows = iter_lettings(chunk_size, using=using)
+    next_batch = sync_to_async(lambda: list(islice(rows, chunk_size)))
+    while batch := await next_batch():
+        yield batch
+
+
+def normalize_city(city):
+    """
+    Normalise un nom de ville : espaces réduits et, s'il est saisi tout en
+    majuscules ou tout en minuscules, une majuscule à chaque mot. Une casse
+    mixte (``McAllen``) est conservée.
+    """
+    city = ' '.join(city.split())
+    if city.isupper() or city.islower():
+        return string.capwords(city)
+    return city
+
+
+def normalize_state(state):
+    """Normalise un code d'état : sans espaces, en majuscules."""
+    return state.strip().upper()
+
+
+def normalize_country(code):
+    """Normalise un code pays en code ISO alpha-3 en majuscules."""
+    code = code.strip().upper()
+    return COUNTRY_ISO_FIXES.get(code, code)
+
+
+# Champ de l'adresse → fonction de normalisation de ses valeurs
+ADDRESS_NORMALIZERS = {
+    'city': normalize_city,
+    'state': normalize_state,
+    'country_iso_code': normalize_country,
+}
+
+
+def _invalidate_lettings(letting_ids):
+    object_cache.invalidate('letting', *letting_ids)
+    page_cache.bump_version('lettings')
+
+
+def retitle_lettings(queryset, find, replace, batch_size=1000):
+    """
+    Remplace ``find`` par ``replace`` dans le titre des locations d'une
+    requête, par un ``UPDATE`` par lot.
+
+    Les locations sont choisies par ``StrIndex`` (``INSTR`` sous SQLite),
+    sensible à la casse comme ``REPLACE`` : ``title__contains`` ne l'est pas
+    sous SQLite et retiendrait des titres que le remplacement laisse
+    inchangés.
+
+    Returns:
+        int: Nombre de locations modifiées.
+    """
+    updated = 0
+    if not find or find == replace:
+        return updated
+    title = Replace('title', Value(find), Value(replace))
+    queryset = queryset.alias(find_at=StrIndex('title', Value(find))).filter(find_at__gt=0)
+    for ids in pk_batches(queryset, batch_size):
+        with transaction.atomic(using=router.db_for_write(Letting)):
+            updated += Letting.objects.filter(pk__in=ids).update(title=title)
+            LettingSummary.objects.filter(pk__in=ids).update(title=title)
+        _invalidate_lettings(ids)
+    return updated
+
+
+def normalize_addresses(queryset, batch_size=1000):
+    """
+    Normalise la ville, l'état et le code pays des adresses d'une requête
+    (voir :data:`ADDRESS_NORMALIZERS`).
+
+    Pour chaque lot et chaque champ, les valeurs distinctes sont lues et
+    normalisées en Python, puis celles qui changent sont corrigées par un
+    seul ``UPDATE ... SET champ = CASE ...``.
+
+    Returns:
+        dict: Nombre d'adresses corrigées par champ.
+    """
+    counts = dict.fromkeys(ADDRESS_NORMALIZERS, 0)
+    for ids in pk_batches(queryset, batch_size):
+        batch = Address.objects.filter(pk__in=ids)
+        changed = 0
+        with transaction.atomic(using=router.db_for_write(Address)):
+            for field, normalize in ADDRESS_NORMALIZERS.items():
+                values = batch.order_by().values_list(field, flat=True).distinct()
+                fixes = {value: normalize(value) for value in values}
+                fixes = {old: new for old, new in fixes.items() if old != new}
+                if not fixes:
+                    continue
+                fixed = batch.filter(**{f'{field}__in': fixes}).update(**{field: Case(
+                    *(When(**{field: old}, then=Value(new)) for old, new in fixes.items())
+                )})
+                counts[field] += fixed
+                changed += fixed
+        if changed:
+            letting_ids = list(
+                Letting.objects.filter(address_id__in=ids).values_list('id', flat=True)
+            )
+            summary.refresh(letting_ids)
+            _invalidate_lettings(letting_ids)
+    return counts
+
+
+def _delete_rows(model, ids, using):
+    """
+    Supprime des lignes par clé primaire en un ``DELETE`` SQL, sans la
+    collecte des objets liés ni les signaux de ``QuerySet.delete()`` ;
+    renvoie leur nombre.
+    """
+    if not ids:
+        return 0
+    connection = connections[using]
+    quote = connection.ops.quote_name
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f"DELETE FROM {quote(model._meta.db_table)} "
+            f"WHERE {quote(model._meta.pk.column)} IN ({', '.join(['%s'] * len(ids))})",
+            ids,
+        )
+        return cursor.rowcount
+
+
+def delete_lettings(queryset, batch_size=1000):
+    """
+    Supprime les locations d'une requête, leurs résumés et les adresses
+    qu'elles laissent sans location, par trois ``DELETE`` par lot.
+
+    Returns:
+        tuple: ``(locations supprimées, adresses supprimées)``.
+    """
+    using = router.db_for_write(Letting)
+    lettings = addresses = 0
+    for ids in pk_batches(queryset, batch_size):
+        with transaction.atomic(using=using):
+            address_ids = list(
+                Letting.objects.filter(pk__in=ids).values_list('address_id', flat=True)
+            )
+            _delete_rows(LettingSummary, ids, using)
+            lettings += _delete_rows(Letting, ids, using)
+            orphans = Address.objects.filter(pk__in=address_ids, letting__isnull=True)
+            addresses += _delete_rows(
+                Address, list(orphans.values_list('pk', flat=True)), using
+            )
+        _invalidate_lettings(ids)
+    return lettings, addresses
+
+
+def delete_addresses(queryset, batch_size=1000):
+    """
+    Supprime les adresses d'une requête, leurs locations et leurs résumés,
+    par trois ``DELETE`` par lot au lieu de la cascade instance par instance
+    de l'ORM.
+
+    Returns:
+        tuple: ``(locations supprimées, adresses supprimées)``.
+    """
+    using = router.db_for_write(Address)
+    lettings = addresses = 0
+    for ids in pk_batches(queryset, batch_size):
+        with transaction.atomic(using=using):
+            letting_ids = list(
+                Letting.objects.filter(address_id__in=ids).values_list('id', flat=True)
+            )
+            _delete_rows(LettingSummary, letting_ids, using)
+            lettings += _delete_rows(Letting, letting_ids, using)
+            addresses += _delete_rows(Address, ids, using)
+        _invalidate_lettings(letting_ids)
+    return lettings, addresses
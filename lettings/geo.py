@@ -0,0 +1,243 @@
+"""
+Géocodage hors ligne des adresses et recherche des locations les plus proches.
+
+Les coordonnées d'une adresse sont celles du centroïde de son code postal,
+lues dans la table embarquée ``lettings/data/zip_centroids.csv`` (centroïdes
+approximatifs des codes postaux utilisés par le projet et de grandes villes
+américaines ; ``geocode_addresses --centroids`` accepte une table plus
+complète au même format).
+
+Chaque adresse géocodée porte aussi le numéro de sa case dans une grille de
+``1 / CELLS_PER_DEGREE`` degré de côté (environ 11 km en latitude), indexé en
+base. Une recherche de proximité ne lit ainsi que les cases qui recouvrent le
+cercle demandé : une plage contiguë de numéros par rangée de la grille. Le
+cercle s'élargit par étapes jusqu'au rayon demandé, tant que ``limit``
+locations n'ont pas été trouvées. Les candidats sont classés en SQL par une
+distance équirectangulaire, simple arithmétique, puis la distance exacte
+(haversine) des ``limit`` premiers est calculée en Python.
+
+L'antiméridien n'est pas traité : une recherche ne déborde pas de l'autre
+côté de la longitude ±180°.
+"""
+import csv
+import math
+from functools import lru_cache, reduce
+from operator import or_
+from pathlib import Path
+
+from django.db.models import ExpressionWrapper, F, FloatField, Q
+
+ZIP_CENTROIDS_PATH = Path(__file__).resolve().parent / 'data' / 'zip_centroids.csv'
+
+# Grille de 0,1° : 1800 rangées de latitude × 3600 colonnes de longitude
+CELLS_PER_DEGREE = 10
+GRID_ROWS = 180 * CELLS_PER_DEGREE
+GRID_COLUMNS = 360 * CELLS_PER_DEGREE
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE = math.pi * EARTH_RADIUS_KM / 180
+
+# Marge du filtre équirectangulaire, avant la vérification exacte du rayon
+APPROXIMATION_MARGIN = 1.01
+
+# Fractions successives du rayon explorées par :func:`nearby`
+SEARCH_STEPS = (0.125, 0.25, 0.5, 1.0)
+
+
+def grid_cell(latitude, longitude):
+    """
+    Renvoie le numéro de la case de la grille contenant un point.
+
+    Returns:
+        int | None: ``rangée * GRID_COLUMNS + colonne``, ou ``None`` sans
+        coordonnées.
+    """
+    if latitude is None or longitude is None:
+        return None
+    row = min(math.floor((latitude + 90) * CELLS_PER_DEGREE), GRID_ROWS - 1)
+    column = min(math.floor((longitude + 180) * CELLS_PER_DEGREE), GRID_COLUMNS - 1)
+    return row * GRID_COLUMNS + column
+
+
+def cell_ranges(latitude, longitude, radius_km):
+    """
+    Renvoie les plages de cases de la grille qui recouvrent un cercle.
+
+    Args:
+        latitude (float): Latitude du centre, en degrés.
+        longitude (float): Longitude du centre, en degrés.
+        radius_km (float): Rayon, en kilomètres.
+
+    Returns:
+        list[tuple[int, int]]: Une plage ``(première, dernière)`` par rangée.
+    """
+    delta_lat = radius_km / KM_PER_DEGREE
+    # Près des pôles, le cercle couvre toute la rangée
+    delta_lon = delta_lat / max(math.cos(math.radians(latitude)), 1e-6)
+
+    def index(value, offset, size):
+        return min(max(math.floor((value + offset) * CELLS_PER_DEGREE), 0), size - 1)
+
+    first_row = index(latitude - delta_lat, 90, GRID_ROWS)
+    last_row = index(latitude + delta_lat, 90, GRID_ROWS)
+    first_column = index(longitude - delta_lon, 180, GRID_COLUMNS)
+    last_column = index(longitude + delta_lon, 180, GRID_COLUMNS)
+    return [
+        (row * GRID_COLUMNS + first_column, row * GRID_COLUMNS + last_column)
+        for row in range(first_row, last_row + 1)
+    ]
+
+
+def haversine_km(lat1, lon1, lat2, lon2):
+    """Renvoie la distance orthodromique entre deux points, en kilomètres."""
+    phi1, phi2 = math.radians(lat1), math.radians(lat2)
+    d_phi = phi2 - phi1
+    d_lambda = math.radians(lon2 - lon1)
+    a = math.sin(d_phi / 2) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(d_lambda / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+@lru_cache(maxsize=None)
+def load_zip_centroids(path=ZIP_CENTROIDS_PATH):
+    """
+    Charge une table de centroïdes de codes postaux.
+
+    Args:
+        path (Path | str): Fichier CSV ``zip_code,latitude,longitude``.
+
+    Returns:
+        dict: ``{code postal: (latitude, longitude)}``.
+    """
+    with open(path, newline='', encoding='utf-8') as file:
+        return {
+            int(row['zip_code']): (float(row['latitude']), float(row['longitude']))
+            for row in csv.DictReader(file)
+        }
+
+
+def geocode(zip_code, centroids=None):
+    """
+    Renvoie les coordonnées du centroïde d'un code postal.
+
+    Returns:
+        tuple[float, float] | None: ``(latitude, longitude)``, ou ``None`` si
+        le code postal est absent de la table.
+    """
+    if centroids is None:
+        centroids = load_zip_centroids()
+    return centroids.get(zip_code)
+
+
+def locate(address, centroids=None):
+    """
+    Complète les coordonnées manquantes d'une adresse depuis son code postal
+    et recalcule sa case de la grille.
+
+    Args:
+        address (Address): Adresse, non nécessairement enregistrée.
+        centroids (dict | None): Table de :func:`load_zip_centroids`, par
+            défaut la table embarquée.
+
+    Returns:
+        bool: ``True`` si l'adresse a des coordonnées.
+    """
+    if address.latitude is None or address.longitude is None:
+        point = geocode(address.zip_code, centroids)
+        if point is not None:
+            address.latitude, address.longitude = point
+    address.grid_cell = grid_cell(address.latitude, address.longitude)
+    return address.grid_cell is not None
+
+
+def fill_coordinates(addresses, centroids=None):
+    """
+    Géocode en masse les adresses sans coordonnées, par code postal.
+
+    Une seule requête ``UPDATE`` par code postal connu : aucun modèle n'est
+    chargé et aucun signal n'est émis (à l'appelant d'invalider les caches).
+
+    Args:
+        addresses (QuerySet): Adresses à traiter.
+        centroids (dict | None): Table de :func:`load_zip_centroids`.
+
+    Returns:
+        tuple: ``(nombre d'adresses géocodées, codes postaux inconnus)``.
+    """
+    if centroids is None:
+        centroids = load_zip_centroids()
+    missing = addresses.filter(latitude__isnull=True)
+    updated = 0
+    unknown = []
+    for zip_code in missing.values_list('zip_code', flat=True).distinct().order_by('zip_code'):
+        point = centroids.get(zip_code)
+        if point is None:
+            unknown.append(zip_code)
+            continue
+        latitude, longitude = point
+        updated += missing.filter(zip_code=zip_code).update(
+            latitude=latitude, longitude=longitude, grid_cell=grid_cell(latitude, longitude),
+        )
+    return updated, unknown
+
+
+def _nearest_within(lettings, latitude, longitude, radius_km, limit):
+    """
+    Renvoie les ``limit`` locations les plus proches dans un rayon, en une
+    requête restreinte par l'index de la grille aux cases du cercle.
+    """
+    cells = reduce(or_, (
+        Q(address__grid_cell__range=cell_range)
+        for cell_range in cell_ranges(latitude, longitude, radius_km)
+    ))
+    # Distance équirectangulaire au carré, en degrés de latitude
+    d_lat = F('address__latitude') - latitude
+    d_lon = (F('address__longitude') - longitude) * math.cos(math.radians(latitude))
+    max_degrees = radius_km / KM_PER_DEGREE * APPROXIMATION_MARGIN
+    rows = (
+        lettings.filter(cells)
+        .annotate(distance2=ExpressionWrapper(d_lat * d_lat + d_lon * d_lon,
+                                              output_field=FloatField()))
+        .filter(distance2__lte=max_degrees ** 2)
+        .order_by('distance2', 'id')
+        .values_list('id', 'title', 'address__city', 'address__latitude',
+                     'address__longitude')[:limit]
+    )
+    results = []
+    for letting_id, title, city, lat, lon in rows:
+        distance = haversine_km(latitude, longitude, lat, lon)
+        if distance <= radius_km:
+            results.append({
+                'id': letting_id, 'title': title, 'city': city,
+                'distance_km': round(distance, 2),
+            })
+    results.sort(key=lambda result: (result['distance_km'], result['id']))
+    return results
+
+
+def nearby(lettings, latitude, longitude, radius_km, limit):
+    """
+    Renvoie les locations les plus proches d'un point, dans un rayon.
+
+    La recherche commence sur un huitième du rayon et double jusqu'au rayon
+    demandé, tant qu'elle n'a pas trouvé ``limit`` locations : dans une zone
+    dense, un petit cercle suffit et peu de candidats sont lus ; dans une
+    zone peu dense, chaque cercle ne lit que quelques cases. Chaque étape est
+    une requête (voir :func:`_nearest_within`).
+
+    Args:
+        lettings (QuerySet): Locations parmi lesquelles chercher.
+        latitude (float): Latitude du centre, en degrés.
+        longitude (float): Longitude du centre, en degrés.
+        radius_km (float): Rayon de recherche, en kilomètres.
+        limit (int): Nombre maximal de locations renvoyées.
+
+    Returns:
+        list[dict]: ``id``, ``title``, ``city`` et ``distance_km``, de la plus
+        proche à la plus éloignée.
+    """
+    for step in SEARCH_STEPS:
+        results = _nearest_within(lettings, latitude, longitude, radius_km * step, limit)
+        # Les locations trouvées dans un cercle plus petit sont bien les plus proches
+        if len(results) == limit:
+            break
+    return results
@@ -0,0 +1,91 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lettings import bulk
+from lettings.models import Address, Letting
+from oc_lettings_site.bulk import Throughput
+
+
+class Command(BaseCommand):
+    """
+    Commande qui modifie en masse les locations et leurs adresses.
+
+    Opérations :
+        ``retitle`` : remplace ``--find`` par ``--replace`` dans les titres ;
+        ``normalize`` : normalise la ville, l'état et le code pays des adresses ;
+        ``delete`` : supprime les locations et les adresses qu'elles laissent
+        sans location.
+
+    Les lignes visées sont choisies par ``--ids`` (identifiants de
+    locations), ``--state`` et ``--city`` ; ``delete`` exige l'un d'eux ou
+    ``--all``. Elles sont modifiées par lots de ``--batch-size``, en
+    requêtes ensemblistes (voir :mod:`lettings.bulk`).
+
+    Usage :
+        python manage.py edit_lettings retitle --find Cozy --replace Cosy [--state PA]
+        python manage.py edit_lettings normalize [--batch-size 1000]
+        python manage.py edit_lettings delete --ids 12 13 14
+    """
+
+    help = "Renomme, normalise ou supprime des locations et leurs adresses par lots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('operation', choices=('retitle', 'normalize', 'delete'))
+        parser.add_argument('--find', help="Texte remplacé dans les titres (retitle).")
+        parser.add_argument('--replace', default='',
+                            help="Texte de remplacement (retitle).")
+        parser.add_argument('--ids', nargs='+', type=int, help="Identifiants des locations.")
+        parser.add_argument('--state', help="Code d'état des adresses.")
+        parser.add_argument('--city', help="Ville des adresses.")
+        parser.add_argument('--all', action='store_true',
+                            help="Vise toutes les locations (delete).")
+        parser.add_argument('--batch-size', type=int, default=1000,
+                            help="Nombre de lignes modifiées par requête.")
+
+    def handle(self, *args, **options):
+        operation = options['operation']
+        batch_size = options['batch_size']
+        if batch_size < 1:
+            raise CommandError("--batch-size doit être positif.")
+        lettings = self._select(Letting.objects.all(), 'pk', 'address__', options)
+        throughput = Throughput()
+
+        if operation == 'retitle':
+            if not options['find']:
+                raise CommandError("retitle exige --find.")
+            throughput.add(bulk.retitle_lettings(
+                lettings, options['find'], options['replace'], batch_size
+            ))
+            self.stdout.write(self.style.SUCCESS(f"Titres modifiés : {throughput}."))
+        elif operation == 'normalize':
+            addresses = self._select(Address.objects.all(), 'letting', '', options)
+            counts = bulk.normalize_addresses(addresses, batch_size)
+            throughput.add(sum(counts.values()))
+            details = ', '.join(f"{field} {count}" for field, count in counts.items())
+            self.stdout.write(self.style.SUCCESS(
+                f"Champs d'adresse corrigés : {throughput} ({details})."
+            ))
+        else:
+            if not (options['ids'] or options['state'] or options['city'] or options['all']):
+                raise CommandError("delete exige --ids, --state, --city ou --all.")
+            deleted, orphans = bulk.delete_lettings(lettings, batch_size)
+            throughput.add(deleted + orphans)
+            self.stdout.write(self.style.SUCCESS(
+                f"{deleted} locations et {orphans} adresses supprimées : {throughput}."
+            ))
+
+    @staticmethod
+    def _select(queryset, letting, address, options):
+        """
+        Filtre une requête selon ``--ids``, ``--state`` et ``--city``.
+
+        Args:
+            letting (str): Chemin de la location depuis le modèle filtré.
+            address (str): Préfixe des champs de l'adresse (``address__`` ou vide).
+        """
+        if options['ids']:
+            queryset = queryset.filter(**{f'{letting}__in': options['ids']})
+        if options['state']:
+            queryset = queryset.filter(**{f'{address}state': options['state']})
+        if options['city']:
+            queryset = queryset.filter(**{f'{address}city': options['city']})
+        return queryset
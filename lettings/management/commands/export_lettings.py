@@ -0,0 +1,17 @@
+from oc_lettings_site.bulk import ExportCommand
+
+from lettings import bulk
+
+
+class Command(ExportCommand):
+    """
+    Commande qui exporte toutes les locations et leur adresse.
+
+    Usage :
+        python manage.py export_lettings lettings.jsonl [--batch-size 2000]
+    """
+
+    help = "Exporte les locations vers un fichier CSV ou JSON Lines, en flux."
+
+    fields = bulk.LETTING_FIELDS
+    rows = staticmethod(bulk.iter_lettings)
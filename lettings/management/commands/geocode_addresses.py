@@ -0,0 +1,47 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from lettings import geo
+from lettings.bulk import after_import
+from lettings.models import Address
+
+
+class Command(BaseCommand):
+    """
+    Commande qui géocode hors ligne les adresses sans coordonnées.
+
+    Chaque adresse reçoit le centroïde de son code postal, lu dans la table
+    embarquée ou dans celle de ``--centroids`` (CSV
+    ``zip_code,latitude,longitude``), et sa case de la grille de proximité.
+    Avec ``--reset``, les coordonnées existantes sont d'abord effacées.
+
+    Usage :
+        python manage.py geocode_addresses [--centroids zips.csv] [--reset]
+    """
+
+    help = "Géocode les adresses sans coordonnées depuis une table de centroïdes."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--centroids', help="Table CSV zip_code,latitude,longitude.")
+        parser.add_argument('--reset', action='store_true',
+                            help="Recalcule aussi les adresses déjà géocodées.")
+
+    def handle(self, *args, **options):
+        centroids = geo.load_zip_centroids(options['centroids'] or geo.ZIP_CENTROIDS_PATH)
+        start = time.perf_counter()
+        with transaction.atomic():
+            if options['reset']:
+                Address.objects.update(latitude=None, longitude=None, grid_cell=None)
+            updated, unknown = geo.fill_coordinates(Address.objects.all(), centroids)
+        after_import()
+        elapsed = time.perf_counter() - start
+
+        self.stdout.write(self.style.SUCCESS(
+            f"{updated} adresses géocodées en {elapsed:.2f} s."
+        ))
+        if unknown:
+            self.stdout.write(self.style.WARNING(
+                f"Codes postaux absents de la table : {', '.join(map(str, unknown))}."
+            ))
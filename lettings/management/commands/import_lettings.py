@@ -0,0 +1,18 @@
+from oc_lettings_site.bulk import ImportCommand
+
+from lettings import bulk
+
+
+class Command(ImportCommand):
+    """
+    Commande qui importe des locations et leur adresse par lots.
+
+    Usage :
+        python manage.py import_lettings lettings.csv [--batch-size 1000] [--skip-invalid]
+    """
+
+    help = "Importe des locations depuis un fichier CSV ou JSON Lines, par lots."
+
+    build = staticmethod(bulk.build_letting)
+    write = staticmethod(bulk.write_lettings)
+    after_import = staticmethod(bulk.after_import)
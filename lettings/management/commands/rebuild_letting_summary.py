@@ -0,0 +1,32 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from lettings import summary
+from lettings.bulk import after_import
+from oc_lettings_site.bulk import Throughput
+
+
+class Command(BaseCommand):
+    """
+    Commande qui reconstruit la table des résumés des locations.
+
+    Réécrit le résumé de chaque location depuis la location et son adresse,
+    par lots de ``--batch-size`` locations, chacun dans sa transaction (voir
+    :mod:`lettings.summary`), puis invalide les pages ``lettings``.
+
+    Usage :
+        python manage.py rebuild_letting_summary [--batch-size 2000]
+    """
+
+    help = "Reconstruit la table dénormalisée des résumés de locations, par lots."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000,
+                            help="Nombre de locations réécrites par requête.")
+
+    def handle(self, *args, **options):
+        if options['batch_size'] < 1:
+            raise CommandError("--batch-size doit être positif.")
+        throughput = Throughput()
+        throughput.add(summary.rebuild(options['batch_size']))
+        after_import()
+        self.stdout.write(self.style.SUCCESS(f"Résumés réécrits : {throughput}."))
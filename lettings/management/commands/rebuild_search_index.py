@@ -0,0 +1,29 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from lettings import search
+
+
+class Command(BaseCommand):
+    """
+    Commande qui reconstruit l'index plein texte FTS5 des locations.
+
+    Recrée la table virtuelle et ses triggers s'ils manquent, puis réindexe
+    toutes les locations et optimise l'index.
+
+    Usage :
+        python manage.py rebuild_search_index
+    """
+
+    help = "Reconstruit l'index plein texte (FTS5) des locations."
+
+    def handle(self, *args, **options):
+        if not search.uses_fts():
+            raise CommandError("L'index FTS5 n'est disponible que sous SQLite.")
+        start = time.perf_counter()
+        count = search.rebuild()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f"{count} locations indexées en {elapsed:.2f} s."
+        ))
@@ -1,28 +1,93 @@
+import logging
+import time
+
 from django.db import migrations
 
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+
+ADDRESS_FIELDS = ('id', 'number', 'street', 'city', 'state', 'zip_code', 'country_iso_code')
+LETTING_FIELDS = ('id', 'title', 'address_id')
+
+
+def copy_rows(source, target, fields, using, ignore_conflicts=False):
+    """
+    Copie les lignes de ``source`` vers ``target`` par lots de ``BATCH_SIZE``.
+
+    Les lignes sont lues par un itérateur côté serveur, sous forme de
+    dictionnaires, et insérées par ``bulk_create`` : un aller-retour par lot
+    au lieu d'un par ligne, et jamais plus d'un lot en mémoire. Avec
+    ``ignore_conflicts``, les lignes déjà présentes dans ``target`` sont
+    conservées.
+    """
+    start = time.perf_counter()
+    rows = source.objects.using(using).order_by('id').values(*fields)
+    batch, total = [], 0
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(target(**row))
+        if len(batch) == BATCH_SIZE:
+            target.objects.using(using).bulk_create(batch, ignore_conflicts=ignore_conflicts)
+            total += len(batch)
+            batch = []
+            logger.info("%s : %d lignes copiées...", target.__name__, total)
+    if batch:
+        target.objects.using(using).bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        total += len(batch)
+    logger.info(
+        "%s : %d lignes copiées en %.2f s", target.__name__, total, time.perf_counter() - start
+    )
+
+
+def delete_rows(schema_editor, *models):
+    """Vide les tables des modèles par un ``DELETE`` ensembliste chacune."""
+    quote = schema_editor.quote_name
+    for model in models:
+        start = time.perf_counter()
+        schema_editor.execute(f"DELETE FROM {quote(model._meta.db_table)}")
+        logger.info(
+            "%s : table vidée en %.2f s", model.__name__, time.perf_counter() - start
+        )
+
+
 def migrate_lettings_data(apps, schema_editor):
     OldAddress = apps.get_model('oc_lettings_site', 'Address')
     OldLetting = apps.get_model('oc_lettings_site', 'Letting')
-    
+
     NewAddress = apps.get_model('lettings', 'Address')
     NewLetting = apps.get_model('lettings', 'Letting')
-    
-    for address in OldAddress.objects.all():
-        NewAddress.objects.create(
-            id=address.id,
-            number=address.number,
-            street=address.street,
-            city=address.city,
-            zip_code=address.zip_code,
-            country_iso_code=address.country_iso_code,
-        )
-    
-    for letting in OldLetting.objects.all():
-        NewLetting.objects.create(
-            id=letting.id,
-            title=letting.title,
-            address_id=letting.address_id,
-        )
+
+    using = schema_editor.connection.alias
+    copy_rows(OldAddress, NewAddress, ADDRESS_FIELDS, using)
+    copy_rows(OldLetting, NewLetting, LETTING_FIELDS, using)
+
+
+def unmigrate_lettings_data(apps, schema_editor):
+    """
+    Recopie les adresses et locations dans les anciennes tables, recréées
+    vides par l'annulation de ``oc_lettings_site.0002`` (ou encore remplies
+    si elle n'avait pas été appliquée : les lignes présentes sont gardées),
+    puis vide les nouvelles tables pour qu'une nouvelle migration puisse les
+    recopier.
+    """
+    using = schema_editor.connection.alias
+    copy_rows(
+        apps.get_model('lettings', 'Address'),
+        apps.get_model('oc_lettings_site', 'Address'),
+        ADDRESS_FIELDS, using, ignore_conflicts=True,
+    )
+    copy_rows(
+        apps.get_model('lettings', 'Letting'),
+        apps.get_model('oc_lettings_site', 'Letting'),
+        LETTING_FIELDS, using, ignore_conflicts=True,
+    )
+    # Les locations d'abord : elles référencent les adresses
+    delete_rows(
+        schema_editor,
+        apps.get_model('lettings', 'Letting'),
+        apps.get_model('lettings', 'Address'),
+    )
+
 
 class Migration(migrations.Migration):
     dependencies = [
@@ -30,6 +95,11 @@ class Migration(migrations.Migration):
         ('oc_lettings_site', '0001_initial'),
     ]
 
+    # Les anciennes tables doivent encore exister pendant la copie
+    run_before = [
+        ('oc_lettings_site', '0002_auto_20251016_1313'),
+    ]
+
     operations = [
-        migrations.RunPython(migrate_lettings_data),
+        migrations.RunPython(migrate_lettings_data, unmigrate_lettings_data),
     ]
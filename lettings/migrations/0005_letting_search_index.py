@@ -0,0 +1,73 @@
+from django.db import migrations
+
+# Table virtuelle FTS5 indexant le titre des locations et la rue/ville de leur
+# adresse. Le rowid de chaque entrée est l'id de la location ; les triggers la
+# maintiennent à jour lors des écritures, y compris par bulk_create/update().
+FORWARD_SQL = [
+    """
+    CREATE VIRTUAL TABLE lettings_letting_fts USING fts5(
+        title, street, city, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    """
+    CREATE TRIGGER lettings_letting_fts_insert AFTER INSERT ON lettings_letting BEGIN
+        INSERT INTO lettings_letting_fts (rowid, title, street, city)
+        SELECT NEW.id, NEW.title, a.street, a.city
+        FROM lettings_address a WHERE a.id = NEW.address_id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_letting_fts_update AFTER UPDATE ON lettings_letting BEGIN
+        DELETE FROM lettings_letting_fts WHERE rowid = OLD.id;
+        INSERT INTO lettings_letting_fts (rowid, title, street, city)
+        SELECT NEW.id, NEW.title, a.street, a.city
+        FROM lettings_address a WHERE a.id = NEW.address_id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_letting_fts_delete AFTER DELETE ON lettings_letting BEGIN
+        DELETE FROM lettings_letting_fts WHERE rowid = OLD.id;
+    END
+    """,
+    """
+    CREATE TRIGGER lettings_address_fts_update AFTER UPDATE OF street, city
+    ON lettings_address BEGIN
+        UPDATE lettings_letting_fts SET street = NEW.street, city = NEW.city
+        WHERE rowid IN (SELECT id FROM lettings_letting WHERE address_id = NEW.id);
+    END
+    """,
+    """
+    INSERT INTO lettings_letting_fts (rowid, title, street, city)
+    SELECT l.id, l.title, a.street, a.city
+    FROM lettings_letting l JOIN lettings_address a ON a.id = l.address_id
+    """,
+]
+
+REVERSE_SQL = [
+    "DROP TRIGGER IF EXISTS lettings_address_fts_update",
+    "DROP TRIGGER IF EXISTS lettings_letting_fts_delete",
+    "DROP TRIGGER IF EXISTS lettings_letting_fts_update",
+    "DROP TRIGGER IF EXISTS lettings_letting_fts_insert",
+    "DROP TABLE IF EXISTS lettings_letting_fts",
+]
+
+
+def _run(statements):
+    def operation(apps, schema_editor):
+        # FTS5 est propre à SQLite : les autres moteurs utilisent la recherche de repli
+        if schema_editor.connection.vendor != 'sqlite':
+            return
+        for statement in statements:
+            schema_editor.execute(statement)
+    return operation
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0004_address_indexes'),
+    ]
+
+    operations = [
+        migrations.RunPython(_run(FORWARD_SQL), _run(REVERSE_SQL)),
+    ]
@@ -0,0 +1,78 @@
+import csv
+import math
+from pathlib import Path
+
+import django.core.validators
+from django.db import migrations, models
+
+# Copie figée de lettings.geo à cette migration : table embarquée et grille
+# de 0,1° (1800 rangées × 3600 colonnes)
+ZIP_CENTROIDS_PATH = Path(__file__).resolve().parent.parent / 'data' / 'zip_centroids.csv'
+CELLS_PER_DEGREE = 10
+GRID_ROWS = 180 * CELLS_PER_DEGREE
+GRID_COLUMNS = 360 * CELLS_PER_DEGREE
+
+
+def grid_cell(latitude, longitude):
+    row = min(math.floor((latitude + 90) * CELLS_PER_DEGREE), GRID_ROWS - 1)
+    column = min(math.floor((longitude + 180) * CELLS_PER_DEGREE), GRID_COLUMNS - 1)
+    return row * GRID_COLUMNS + column
+
+
+def fill_coordinates(apps, schema_editor):
+    """
+    Géocode les adresses existantes depuis la table embarquée : un
+    ``UPDATE`` par code postal connu.
+    """
+    Address = apps.get_model('lettings', 'Address')
+    with open(ZIP_CENTROIDS_PATH, newline='', encoding='utf-8') as file:
+        centroids = {
+            int(row['zip_code']): (float(row['latitude']), float(row['longitude']))
+            for row in csv.DictReader(file)
+        }
+    missing = Address.objects.using(schema_editor.connection.alias).filter(latitude__isnull=True)
+    for zip_code in missing.values_list('zip_code', flat=True).distinct().order_by('zip_code'):
+        if zip_code not in centroids:
+            continue
+        latitude, longitude = centroids[zip_code]
+        missing.filter(zip_code=zip_code).update(
+            latitude=latitude, longitude=longitude, grid_cell=grid_cell(latitude, longitude),
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0005_letting_search_index'),
+    ]
+
+    # Colonnes nullables ajoutées par ALTER TABLE : la table n'est pas
+    # reconstruite et les triggers de l'index plein texte sont conservés
+    operations = [
+        migrations.AddField(
+            model_name='address',
+            name='latitude',
+            field=models.FloatField(blank=True, null=True, validators=[
+                django.core.validators.MinValueValidator(-90),
+                django.core.validators.MaxValueValidator(90),
+            ]),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='longitude',
+            field=models.FloatField(blank=True, null=True, validators=[
+                django.core.validators.MinValueValidator(-180),
+                django.core.validators.MaxValueValidator(180),
+            ]),
+        ),
+        migrations.AddField(
+            model_name='address',
+            name='grid_cell',
+            field=models.IntegerField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['grid_cell'], name='address_grid_cell_idx'),
+        ),
+        migrations.RunPython(fill_coordinates, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,40 @@
+from django.db import migrations, models
+
+# Index de la recherche par préfixe de ville de l'admin (lookup istartswith).
+# SQLite n'utilise un index pour « city LIKE 'abc%' » que s'il est insensible
+# à la casse (NOCASE) ; PostgreSQL compare UPPER(city) avec LIKE, qui demande
+# un index de motifs sur cette expression.
+FORWARD_SQL = {
+    'sqlite': "CREATE INDEX address_city_nocase_idx ON lettings_address (city COLLATE NOCASE)",
+    'postgresql': (
+        "CREATE INDEX address_city_nocase_idx "
+        "ON lettings_address (UPPER(city::text) text_pattern_ops)"
+    ),
+}
+REVERSE_SQL = "DROP INDEX IF EXISTS address_city_nocase_idx"
+
+
+def create_index(apps, schema_editor):
+    statement = FORWARD_SQL.get(schema_editor.connection.vendor)
+    if statement:
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in FORWARD_SQL:
+        schema_editor.execute(REVERSE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0006_address_coordinates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='address',
+            index=models.Index(fields=['state'], name='address_state_idx'),
+        ),
+        migrations.RunPython(create_index, drop_index),
+    ]
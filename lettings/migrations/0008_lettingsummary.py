@@ -0,0 +1,67 @@
+import django.db.models.deletion
+from django.db import migrations, models
+
+BATCH_SIZE = 2000
+
+# Copie figée des colonnes de lettings.summary à cette migration : le module
+# peut évoluer, pas le schéma qu'elle crée
+FILL_SQL = """
+    INSERT INTO lettings_lettingsummary (
+        letting_id, title, number, street, city, state, zip_code, country_iso_code
+    )
+    SELECT l.id, l.title, a.number, a.street, a.city, a.state, a.zip_code, a.country_iso_code
+    FROM lettings_letting l JOIN lettings_address a ON a.id = l.address_id
+    WHERE l.id > %s AND l.id <= %s
+"""
+
+
+def fill_summaries(apps, schema_editor):
+    """
+    Remplit la table des résumés depuis les locations existantes, par
+    tranches de ``BATCH_SIZE`` identifiants, en un ``INSERT ... SELECT``
+    chacune.
+    """
+    Letting = apps.get_model('lettings', 'Letting')
+    ids = Letting.objects.using(schema_editor.connection.alias).order_by('id')
+    ids = ids.values_list('id', flat=True)
+    last = 0
+    while True:
+        batch = list(ids.filter(id__gt=last)[:BATCH_SIZE])
+        if not batch:
+            return
+        schema_editor.execute(FILL_SQL, [last, batch[-1]])
+        last = batch[-1]
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('lettings', '0007_address_search_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LettingSummary',
+            fields=[
+                ('letting', models.OneToOneField(
+                    on_delete=django.db.models.deletion.CASCADE, primary_key=True,
+                    related_name='summary', serialize=False, to='lettings.letting',
+                )),
+                ('title', models.CharField(max_length=256)),
+                ('number', models.PositiveIntegerField()),
+                ('street', models.CharField(max_length=64)),
+                ('city', models.CharField(max_length=64)),
+                ('state', models.CharField(max_length=2)),
+                ('zip_code', models.PositiveIntegerField()),
+                ('country_iso_code', models.CharField(max_length=3)),
+            ],
+            options={
+                'verbose_name_plural': 'Letting summaries',
+                'indexes': [
+                    models.Index(fields=['city'], name='letting_summary_city_idx'),
+                    models.Index(fields=['zip_code'], name='letting_summary_zip_idx'),
+                ],
+            },
+        ),
+        migrations.RunPython(fill_summaries, migrations.RunPython.noop),
+    ]
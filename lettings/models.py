@@ -1,5 +1,7 @@
 from django.db import models
-from django.core.validators import MaxValueValidator, MinLengthValidator
+from django.core.validators import MaxValueValidator, MinLengthValidator, MinValueValidator
+
+from . import geo
 
 
 class Address(models.Model):
@@ -25,12 +27,29 @@ class Address(models.Model):
         country_iso_code (CharField) :
             Code ISO du pays, exactement 3 caractères.
 
+        latitude, longitude (FloatField) :
+            Coordonnées en degrés, par défaut celles du centroïde du code postal.
+
+        grid_cell (IntegerField) :
+            Case de la grille de proximité contenant les coordonnées (voir
+            :mod:`lettings.geo`), recalculée à l'enregistrement.
+
         verbose_name_plural :
             Corrige le pluriel de la classe Address.
 
+        indexes :
+            Index des recherches par ville/état, état, code postal, pays et
+            case de la grille (et, hors modèle, préfixe de ville insensible
+            à la casse : migration ``0007_address_search_indexes``).
+
     Méthodes :
         __str__() :
             Retourne une représentation textuelle de l'adresse (numéro + rue).
+
+        save() :
+            Géocode l'adresse depuis son code postal si elle n'a pas de
+            coordonnées, ou si son code postal a changé sans que ses
+            coordonnées soient modifiées, puis recalcule sa case de la grille.
     """
 
     number = models.PositiveIntegerField(validators=[MaxValueValidator(9999)])
@@ -39,13 +58,47 @@ class Address(models.Model):
     state = models.CharField(max_length=2, validators=[MinLengthValidator(2)])
     zip_code = models.PositiveIntegerField(validators=[MaxValueValidator(99999)])
     country_iso_code = models.CharField(max_length=3, validators=[MinLengthValidator(3)])
+    latitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-90), MaxValueValidator(90)]
+    )
+    longitude = models.FloatField(
+        null=True, blank=True, validators=[MinValueValidator(-180), MaxValueValidator(180)]
+    )
+    grid_cell = models.IntegerField(null=True, blank=True, editable=False)
 
     class Meta:
         verbose_name_plural = "Addresses"
+        indexes = [
+            models.Index(fields=['city', 'state'], name='address_city_state_idx'),
+            models.Index(fields=['zip_code'], name='address_zip_code_idx'),
+            models.Index(fields=['country_iso_code'], name='address_country_idx'),
+            models.Index(fields=['grid_cell'], name='address_grid_cell_idx'),
+            models.Index(fields=['state'], name='address_state_idx'),
+        ]
 
     def __str__(self):
         return f'{self.number} {self.street}'
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        loaded = dict(zip(field_names, values))
+        # Code postal et coordonnées lus en base, pour détecter leur modification
+        instance._loaded_location = tuple(
+            loaded.get(name) for name in ('zip_code', 'latitude', 'longitude')
+        )
+        return instance
+
+    def save(self, *args, **kwargs):
+        zip_code, latitude, longitude = getattr(self, '_loaded_location', (None,) * 3)
+        if (zip_code is not None and zip_code != self.zip_code
+                and (self.latitude, self.longitude) == (latitude, longitude)):
+            # Les anciennes coordonnées sont celles de l'ancien code postal
+            self.latitude = self.longitude = None
+        geo.locate(self)
+        super().save(*args, **kwargs)
+        self._loaded_location = (self.zip_code, self.latitude, self.longitude)
+
 
 class Letting(models.Model):
     """
@@ -63,3 +116,45 @@ class Letting(models.Model):
 
     def __str__(self):
         return self.title
+
+
+class LettingSummary(models.Model):
+    """
+    Table de lecture dénormalisée des locations : titre et adresse à plat,
+    une ligne par location, lue sans jointure par les pages de liste et de
+    détail.
+
+    Elle est tenue à jour par les signaux des modèles sources et par les
+    modifications en masse ; ``rebuild_letting_summary`` la reconstruit
+    (voir :mod:`lettings.summary`).
+
+    Attributs :
+        letting (OneToOneField) : Location résumée, clé primaire de la ligne.
+        title, number, street, city, state, zip_code, country_iso_code :
+            Copies des champs de la location et de son adresse, sous les
+            mêmes noms que dans :class:`Address`.
+
+        indexes :
+            Index des filtres par ville et par code postal.
+    """
+
+    letting = models.OneToOneField(
+        Letting, on_delete=models.CASCADE, primary_key=True, related_name='summary'
+    )
+    title = models.CharField(max_length=256)
+    number = models.PositiveIntegerField()
+    street = models.CharField(max_length=64)
+    city = models.CharField(max_length=64)
+    state = models.CharField(max_length=2)
+    zip_code = models.PositiveIntegerField()
+    country_iso_code = models.CharField(max_length=3)
+
+    class Meta:
+        verbose_name_plural = "Letting summaries"
+        indexes = [
+            models.Index(fields=['city'], name='letting_summary_city_idx'),
+            models.Index(fields=['zip_code'], name='letting_summary_zip_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
@@ -0,0 +1,178 @@
+"""
+Recherche plein texte des locations.
+
+Sous SQLite, la recherche s'appuie sur la table virtuelle FTS5
+``lettings_letting_fts`` (titre, rue, ville), créée par la migration
+``0005_letting_search_index`` et tenue à jour par des triggers. Les résultats
+sont classés par ``bm25``, le titre pesant plus que la ville et la rue.
+
+Les autres moteurs utilisent une recherche de repli par ``icontains``.
+"""
+import re
+
+from django.db import connections, router
+from django.db.models import F, Q
+from django.db.models.expressions import RawSQL
+
+from .models import Letting
+
+FTS_TABLE = 'lettings_letting_fts'
+
+# Poids bm25 des colonnes (title, street, city)
+RANK_WEIGHTS = (10.0, 1.0, 2.0)
+
+# Schéma idempotent, réappliqué par ``rebuild_search_index`` au cas où une
+# migration aurait reconstruit une table source et supprimé ses triggers.
+SCHEMA_SQL = [
+    f"""
+    CREATE VIRTUAL TABLE IF NOT EXISTS {FTS_TABLE} USING fts5(
+        title, street, city, tokenize = 'unicode61 remove_diacritics 2'
+    )
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lettings_letting_fts_insert
+    AFTER INSERT ON lettings_letting BEGIN
+        INSERT INTO {FTS_TABLE} (rowid, title, street, city)
+        SELECT NEW.id, NEW.title, a.street, a.city
+        FROM lettings_address a WHERE a.id = NEW.address_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lettings_letting_fts_update
+    AFTER UPDATE ON lettings_letting BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+        INSERT INTO {FTS_TABLE} (rowid, title, street, city)
+        SELECT NEW.id, NEW.title, a.street, a.city
+        FROM lettings_address a WHERE a.id = NEW.address_id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lettings_letting_fts_delete
+    AFTER DELETE ON lettings_letting BEGIN
+        DELETE FROM {FTS_TABLE} WHERE rowid = OLD.id;
+    END
+    """,
+    f"""
+    CREATE TRIGGER IF NOT EXISTS lettings_address_fts_update
+    AFTER UPDATE OF street, city ON lettings_address BEGIN
+        UPDATE {FTS_TABLE} SET street = NEW.street, city = NEW.city
+        WHERE rowid IN (SELECT id FROM lettings_letting WHERE address_id = NEW.id);
+    END
+    """,
+]
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def uses_fts():
+    """Indique si la base de lecture des locations dispose de l'index FTS5."""
+    return connections[Letting.objects.db].vendor == 'sqlite'
+
+
+def match_expression(query):
+    """
+    Transforme la saisie de l'utilisateur en expression ``MATCH`` FTS5.
+
+    Chaque mot devient un préfixe entre guillemets (``"mot"*``), ce qui
+    neutralise la syntaxe FTS5 (opérateurs, colonnes) saisie par l'utilisateur.
+
+    Args:
+        query (str): La recherche saisie.
+
+    Returns:
+        str: L'expression ``MATCH``, vide si la saisie ne contient aucun mot.
+    """
+    return ' '.join(f'"{token}"*' for token in TOKEN_RE.findall(query))
+
+
+def filter_lettings(queryset, query):
+    """
+    Restreint un queryset de locations à celles qui correspondent à une
+    saisie, sans classement (recherche de la liste de l'admin).
+
+    Sous SQLite, les ids sont lus dans l'index FTS5 ; ailleurs, recherche de
+    repli par ``icontains``.
+
+    Args:
+        queryset (QuerySet): Locations à filtrer.
+        query (str): La recherche saisie.
+
+    Returns:
+        QuerySet: Le queryset filtré, vide si la saisie ne contient aucun mot.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return queryset.none()
+    if not uses_fts():
+        return queryset.filter(
+            Q(title__icontains=query)
+            | Q(address__street__icontains=query)
+            | Q(address__city__icontains=query)
+        )
+    return queryset.filter(id__in=RawSQL(
+        f"SELECT rowid FROM {FTS_TABLE} WHERE {FTS_TABLE} MATCH %s", [expression]
+    ))
+
+
+def search(query, offset, limit):
+    """
+    Recherche les locations correspondant à une saisie, par pertinence.
+
+    Args:
+        query (str): La recherche saisie.
+        offset (int): Nombre de résultats à sauter.
+        limit (int): Nombre maximal de résultats à renvoyer.
+
+    Returns:
+        list[Letting]: Les locations trouvées, avec ``id``, ``title`` et ``city``.
+    """
+    expression = match_expression(query)
+    if not expression:
+        return []
+    if not uses_fts():
+        return list(
+            Letting.objects.filter(
+                Q(title__icontains=query)
+                | Q(address__street__icontains=query)
+                | Q(address__city__icontains=query)
+            )
+            .annotate(city=F('address__city'))
+            .only('id', 'title')
+            .order_by('id')[offset:offset + limit]
+        )
+    weights = ', '.join(str(weight) for weight in RANK_WEIGHTS)
+    return list(Letting.objects.raw(
+        f"""
+        SELECT l.id, l.title, a.city
+        FROM {FTS_TABLE} f
+        JOIN lettings_letting l ON l.id = f.rowid
+        JOIN lettings_address a ON a.id = l.address_id
+        WHERE {FTS_TABLE} MATCH %s
+        ORDER BY bm25({FTS_TABLE}, {weights})
+        LIMIT %s OFFSET %s
+        """,
+        [expression, limit, offset],
+    ))
+
+
+def rebuild():
+    """
+    Recrée le schéma FTS5 si nécessaire et réindexe toutes les locations.
+
+    Returns:
+        int: Le nombre de locations indexées.
+    """
+    with connections[router.db_for_write(Letting)].cursor() as cursor:
+        for statement in SCHEMA_SQL:
+            cursor.execute(statement)
+        cursor.execute(f"DELETE FROM {FTS_TABLE}")
+        cursor.execute(
+            f"""
+            INSERT INTO {FTS_TABLE} (rowid, title, street, city)
+            SELECT l.id, l.title, a.street, a.city
+            FROM lettings_letting l JOIN lettings_address a ON a.id = l.address_id
+            """
+        )
+        count = cursor.rowcount
+        cursor.execute(f"INSERT INTO {FTS_TABLE} ({FTS_TABLE}) VALUES ('optimize')")
+    return count
@@ -0,0 +1,45 @@
+"""
+Signaux de l'application ``lettings``.
+
+Tiennent à jour la table des résumés (:mod:`lettings.summary`), invalident
+le cache d'objets des pages de détail et renouvellent la version des pages
+``lettings`` dès qu'une location ou son adresse est enregistrée ou
+supprimée. Le résumé d'une location supprimée disparaît avec elle, par
+cascade.
+"""
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from oc_lettings_site import object_cache, page_cache
+from . import summary
+from .models import Address, Letting
+
+
+@receiver(post_save, sender=Letting)
+def refresh_letting_summary(sender, instance, **kwargs):
+    """Réécrit le résumé de la location enregistrée."""
+    summary.refresh([instance.pk])
+
+
+@receiver(post_save, sender=Address)
+def refresh_address_summary(sender, instance, **kwargs):
+    """
+    Réécrit le résumé de la location qui affiche l'adresse enregistrée. Une
+    location chargée avant son adresse (fixtures) reçoit ainsi son résumé.
+    """
+    summary.refresh(Letting.objects.filter(address_id=instance.pk).values_list('id', flat=True))
+
+
+@receiver([post_save, post_delete], sender=Letting)
+def invalidate_letting(sender, instance, **kwargs):
+    """Supprime du cache la location enregistrée ou supprimée."""
+    object_cache.invalidate('letting', instance.pk)
+    page_cache.bump_version('lettings')
+
+
+@receiver([post_save, post_delete], sender=Address)
+def invalidate_address_letting(sender, instance, **kwargs):
+    """Supprime du cache la location qui affiche l'adresse modifiée."""
+    letting_ids = Letting.objects.filter(address_id=instance.pk).values_list('id', flat=True)
+    object_cache.invalidate('letting', *letting_ids)
+    page_cache.bump_version('lettings')
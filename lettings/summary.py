@@ -0,0 +1,111 @@
+"""
+Table de lecture dénormalisée des locations (:class:`LettingSummary`).
+
+Chaque ligne copie le titre d'une location et son adresse, sous la clé de la
+location : les pages de liste et de détail la lisent sans jointure, sur son
+seul index de clé primaire.
+
+Les lignes sont écrites par un seul ``INSERT ... SELECT ... ON CONFLICT DO
+UPDATE`` par lot (SQLite et PostgreSQL), qui lit la location jointe à son
+adresse et écrit son résumé sans aller-retour par Python :
+
+- :func:`refresh` après l'enregistrement d'une location ou d'une adresse
+  (signaux) et après un import ou une modification en masse ;
+- :func:`rebuild` pour toute la table, par lots (commande
+  ``rebuild_letting_summary``). La migration ``0008_lettingsummary`` remplit
+  la table par sa propre copie de cette requête, figée à son schéma.
+
+La suppression d'une location supprime sa ligne par la cascade de la clé
+étrangère ; les suppressions en masse de :mod:`lettings.bulk` la suppriment
+elles-mêmes.
+"""
+from django.db import connections, router, transaction
+
+from oc_lettings_site.bulk import pk_batches
+from .models import Letting, LettingSummary
+
+# Champ du résumé → chemin ORM depuis la location
+SUMMARY_FIELDS = {
+    'title': 'title',
+    'number': 'address__number',
+    'street': 'address__street',
+    'city': 'address__city',
+    'state': 'address__state',
+    'zip_code': 'address__zip_code',
+    'country_iso_code': 'address__country_iso_code',
+}
+
+
+def _upsert_sql(count, connection):
+    """
+    Renvoie l'``INSERT ... SELECT ... ON CONFLICT DO UPDATE`` qui écrit les
+    résumés de ``count`` locations, d'après les métadonnées des modèles.
+    """
+    quote = connection.ops.quote_name
+    letting = Letting._meta
+    address_field = letting.get_field('address')
+    address = address_field.related_model._meta
+    summary = LettingSummary._meta
+    sources = []
+    for path in SUMMARY_FIELDS.values():
+        if path.startswith('address__'):
+            column = address.get_field(path.removeprefix('address__')).column
+            sources.append(f'a.{quote(column)}')
+        else:
+            sources.append(f'l.{quote(letting.get_field(path).column)}')
+    columns = [quote(summary.get_field(name).column) for name in SUMMARY_FIELDS]
+    key = quote(summary.pk.column)
+    updates = ', '.join(f'{column} = excluded.{column}' for column in columns)
+    return (
+        f"INSERT INTO {quote(summary.db_table)} ({key}, {', '.join(columns)}) "
+        f"SELECT l.{quote(letting.pk.column)}, {', '.join(sources)} "
+        f"FROM {quote(letting.db_table)} l "
+        f"JOIN {quote(address.db_table)} a "
+        f"ON a.{quote(address.pk.column)} = l.{quote(address_field.column)} "
+        f"WHERE l.{quote(letting.pk.column)} IN ({', '.join(['%s'] * count)}) "
+        f"ON CONFLICT ({key}) DO UPDATE SET {updates}"
+    )
+
+
+def _upsert(letting_ids, using):
+    """Écrit en une requête les résumés des locations données ; renvoie leur nombre."""
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        cursor.execute(_upsert_sql(len(letting_ids), connection), letting_ids)
+        return cursor.rowcount
+
+
+def refresh(letting_ids):
+    """
+    Met à jour les résumés de locations, lus et écrits sur la base d'écriture.
+
+    Args:
+        letting_ids (iterable): Identifiants des locations modifiées.
+
+    Returns:
+        int: Nombre de résumés écrits.
+    """
+    letting_ids = list(letting_ids)
+    if not letting_ids:
+        return 0
+    return _upsert(letting_ids, router.db_for_write(LettingSummary))
+
+
+def rebuild(batch_size=2000, using=None):
+    """
+    Réécrit les résumés de toutes les locations, par lots de ``batch_size``
+    locations, chacun dans sa transaction.
+
+    Args:
+        batch_size (int): Nombre de locations par lot.
+        using (str | None): Alias de la base (par défaut, celle d'écriture).
+
+    Returns:
+        int: Nombre de résumés écrits.
+    """
+    using = using or router.db_for_write(LettingSummary)
+    written = 0
+    for ids in pk_batches(Letting.objects.using(using), batch_size):
+        with transaction.atomic(using=using):
+            written += _upsert(ids, using)
+    return written
@@ -1,3 +1,768 @@
-# from django.test import TestCase
+"""
+Module de tests unitaires de l'application ``lettings``.
 
-# Create your tests here.
+Ce module contient des tests pour :
+- La pagination par curseur de la liste des locations
+- Le cache d'objets de la page de détail, son invalidation et les 404
+- La recherche plein texte et la synchronisation de son index
+- L'import et l'export en masse des locations
+- Les vues asynchrones servies en mode ASGI
+- L'API JSON des locations
+- L'export diffusé du catalogue en NDJSON ou CSV
+- Le géocodage des adresses et la recherche de proximité
+- Les modifications en masse (renommage, normalisation, suppression)
+- La table des résumés des locations, sa mise à jour et sa reconstruction
+"""
+
+import math
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncRequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from lettings import api, bulk, geo, search, summary, views
+from lettings.models import Address, Letting, LettingSummary
+from oc_lettings_site import page_cache
+
+
+def create_letting(title, **address_fields):
+    """
+    Crée une location et son adresse pour les besoins des tests.
+
+    :param title: titre de la location.
+    :type title: str
+    :return: la location créée.
+    :rtype: lettings.models.Letting
+    """
+    fields = {
+        "number": 1,
+        "street": "Elm Street",
+        "city": "City",
+        "state": "ST",
+        "zip_code": 12345,
+        "country_iso_code": "USA",
+    }
+    fields.update(address_fields)
+    return Letting.objects.create(title=title, address=Address.objects.create(**fields))
+
+
+# =========================
+# PAGINATION TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_lettings_index_keyset_navigation(client, settings):
+    """
+    Vérifie que les curseurs ``after`` / ``before`` parcourent les pages
+    dans l'ordre des identifiants, sans doublon ni trou.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.LETTINGS_PAGE_SIZE = 2
+    lettings = [create_letting(f"Letting {i}") for i in range(5)]
+
+    first = client.get(reverse("lettings_index")).context["page"]
+    assert [letting["id"] for letting in first] == [lettings[0].id, lettings[1].id]
+    assert not first.has_previous
+    assert first.next_cursor == lettings[1].id
+
+    second = client.get(reverse("lettings_index"), {"after": first.next_cursor}).context["page"]
+    assert [letting["id"] for letting in second] == [lettings[2].id, lettings[3].id]
+    assert second.previous_cursor == lettings[2].id
+
+    back = client.get(reverse("lettings_index"), {"before": second.previous_cursor})
+    assert [letting["id"] for letting in back.context["page"]] == [lettings[0].id, lettings[1].id]
+
+    last = client.get(reverse("lettings_index"), {"after": second.next_cursor}).context["page"]
+    assert [letting["id"] for letting in last] == [lettings[4].id]
+    assert not last.has_next
+
+
+@pytest.mark.django_db
+def test_lettings_index_page_size_is_capped(client, settings):
+    """
+    Vérifie que le paramètre ``size`` ne peut pas dépasser le plafond configuré.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.PAGINATION_MAX_PAGE_SIZE = 3
+    for i in range(5):
+        create_letting(f"Letting {i}")
+
+    response = client.get(reverse("lettings_index"), {"size": 1000})
+    assert len(response.context["page"]) == 3
+
+
+@pytest.mark.django_db
+def test_lettings_index_single_query(client):
+    """
+    Vérifie que la liste ne lance qu'une requête, limitée aux colonnes affichées.
+
+    :param client: client de test Django.
+    """
+    for i in range(3):
+        create_letting(f"Letting {i}")
+
+    with CaptureQueriesContext(connection) as queries:
+        client.get(reverse("lettings_index"))
+
+    letting_queries = [q["sql"] for q in queries if "lettings_letting" in q["sql"]]
+    assert len(letting_queries) == 1
+    assert "address_id" not in letting_queries[0]
+
+
+# =========================
+# DETAIL CACHE TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_letting_detail_is_served_from_cache(client):
+    """
+    Vérifie que le deuxième affichage d'une location ne touche pas la base.
+
+    :param client: client de test Django.
+    """
+    letting = create_letting("Cached Letting")
+    url = reverse("letting", kwargs={"letting_id": letting.id})
+
+    with CaptureQueriesContext(connection) as first:
+        client.get(url)
+    # Force un nouveau rendu de la page pour atteindre le cache d'objets
+    page_cache.bump_version("lettings")
+    with CaptureQueriesContext(connection) as second:
+        response = client.get(url)
+
+    assert len(first) == 1
+    assert len(second) == 0
+    assert b"Cached Letting" in response.content
+
+
+@pytest.mark.django_db
+def test_letting_detail_cache_invalidated_by_address_change(client):
+    """
+    Vérifie que la modification de l'adresse invalide la location en cache.
+
+    :param client: client de test Django.
+    """
+    letting = create_letting("Letting", city="Old Town")
+    url = reverse("letting", kwargs={"letting_id": letting.id})
+    client.get(url)
+
+    letting.address.city = "New Town"
+    letting.address.save()
+
+    assert b"New Town" in client.get(url).content
+
+
+@pytest.mark.django_db
+def test_unknown_letting_is_a_cached_404(client):
+    """
+    Vérifie qu'un identifiant inconnu donne la page 404, que les demandes
+    suivantes ne touchent pas la base, et que la création de la location
+    efface l'absence mémorisée.
+
+    :param client: client de test Django.
+    """
+    url = reverse("letting", kwargs={"letting_id": 4242})
+
+    with CaptureQueriesContext(connection) as first:
+        response = client.get(url)
+    assert response.status_code == 404
+    assert "Page non trouvée" in response.content.decode()
+    with CaptureQueriesContext(connection) as second:
+        assert client.get(url).status_code == 404
+    assert len(first) == 1 and len(second) == 0
+
+    address = Address.objects.create(
+        number=1, street="Elm Street", city="City", state="ST",
+        zip_code=12345, country_iso_code="USA",
+    )
+    Letting.objects.create(id=4242, title="Late Letting", address=address)
+    assert b"Late Letting" in client.get(url).content
+
+
+# =========================
+# SEARCH TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_search_ranks_title_matches_first(client):
+    """
+    Vérifie que la recherche trouve les locations par titre ou par ville et
+    classe en tête celles dont le titre correspond.
+
+    :param client: client de test Django.
+    """
+    in_city = create_letting("Quiet flat", city="Oceanside")
+    in_title = create_letting("Ocean view cottage", city="Inland")
+    create_letting("Mountain cabin", city="Denver")
+
+    response = client.get(reverse("lettings_search"), {"q": "ocean"})
+    assert [letting.id for letting in response.context["results"]] == [in_title.id, in_city.id]
+
+
+@pytest.mark.django_db
+def test_search_index_follows_writes():
+    """
+    Vérifie que les triggers tiennent l'index à jour lors de la modification
+    d'une adresse et de la suppression d'une location.
+    """
+    letting = create_letting("Loft", city="Brunswick")
+    assert [found.id for found in search.search("brunswick", 0, 10)] == [letting.id]
+
+    letting.address.city = "Marquette"
+    letting.address.save()
+    assert search.search("brunswick", 0, 10) == []
+    assert [found.id for found in search.search("marquette", 0, 10)] == [letting.id]
+
+    letting.delete()
+    assert search.search("marquette", 0, 10) == []
+
+
+@pytest.mark.django_db
+def test_search_neutralizes_fts_syntax():
+    """
+    Vérifie que la syntaxe FTS5 saisie par l'utilisateur ne provoque pas
+    d'erreur et reste traitée comme du texte.
+    """
+    create_letting("Studio")
+    assert search.search('" OR title:* NEAR(', 0, 10) == []
+    assert search.match_expression('studio "x"') == '"studio"* "x"*'
+
+
+@pytest.mark.django_db
+def test_rebuild_search_index_command():
+    """
+    Vérifie que la commande ``rebuild_search_index`` réindexe les locations.
+    """
+    letting = create_letting("Underground Hygge")
+    with connection.cursor() as cursor:
+        cursor.execute(f"DELETE FROM {search.FTS_TABLE}")
+    assert search.search("hygge", 0, 10) == []
+
+    call_command("rebuild_search_index", stdout=StringIO())
+    assert [found.id for found in search.search("hygge", 0, 10)] == [letting.id]
+
+
+# =========================
+# BULK IMPORT / EXPORT TESTS
+# =========================
+
+LETTINGS_CSV = """title,number,street,city,state,zip_code,country_iso_code
+Oceanview Retreat,4,Military Street,Willoughby,OH,44094,USA
+Silo Studio,340,Wintergreen Avenue,Newport News,VA,23601,USA
+Underground Hygge,588,Argyle Avenue,East Meadow,NY,11554,USA
+"""
+
+
+@pytest.mark.django_db
+def test_import_then_export_lettings(tmp_path):
+    """
+    Vérifie qu'un import CSV par lots crée les adresses et les locations, puis
+    que l'export JSON Lines restitue les mêmes lignes.
+
+    :param tmp_path: dossier temporaire fourni par Pytest.
+    """
+    source = tmp_path / "lettings.csv"
+    source.write_text(LETTINGS_CSV)
+    call_command("import_lettings", str(source), batch_size=2, stdout=StringIO())
+
+    assert Letting.objects.count() == 3
+    letting = Letting.objects.select_related("address").get(title="Silo Studio")
+    assert letting.address.zip_code == 23601
+    assert [found.id for found in search.search("hygge", 0, 10)] != []
+
+    target = tmp_path / "lettings.jsonl"
+    call_command("export_lettings", str(target), stderr=StringIO())
+    lines = target.read_text().splitlines()
+    assert len(lines) == 3
+    assert '"title":"Oceanview Retreat"' in lines[0]
+    assert '"zip_code":44094' in lines[0]
+
+
+@pytest.mark.django_db
+def test_import_lettings_validates_rows(tmp_path):
+    """
+    Vérifie que les validateurs des modèles s'appliquent aux lignes importées :
+    l'import s'arrête sur une ligne invalide, ou l'ignore avec ``--skip-invalid``.
+
+    :param tmp_path: dossier temporaire fourni par Pytest.
+    """
+    source = tmp_path / "lettings.csv"
+    source.write_text(LETTINGS_CSV + "Bad,99999,Street,City,X,1,USA\n")
+
+    with pytest.raises(CommandError, match="ligne 5"):
+        call_command("import_lettings", str(source), batch_size=10, stdout=StringIO())
+    assert Letting.objects.count() == 0
+
+    call_command(
+        "import_lettings", str(source), skip_invalid=True, stdout=StringIO(), stderr=StringIO()
+    )
+    assert Letting.objects.count() == 3
+
+
+@pytest.mark.django_db
+def test_import_lettings_reports_malformed_json_lines(tmp_path):
+    """
+    Vérifie qu'une ligne JSON malformée, ou qui n'est pas un objet, interrompt
+    l'import avec son numéro de ligne, ou est ignorée avec ``--skip-invalid``.
+
+    :param tmp_path: dossier temporaire fourni par Pytest.
+    """
+    row = (
+        '{"title": "Loft", "number": 1, "street": "Elm Street", "city": "City", '
+        '"state": "ST", "zip_code": 12345, "country_iso_code": "USA"}\n'
+    )
+    source = tmp_path / "lettings.jsonl"
+    source.write_text(row + '{"title": "Broken",\n' + '["not", "an", "object"]\n' + row)
+
+    with pytest.raises(CommandError, match="ligne 2 : JSON invalide"):
+        call_command("import_lettings", str(source), stdout=StringIO())
+
+    errors = StringIO()
+    call_command("import_lettings", str(source), skip_invalid=True,
+                 stdout=StringIO(), stderr=errors)
+    assert "ligne 3 : un objet JSON est attendu" in errors.getvalue()
+    assert Letting.objects.count() == 2
+
+
+# =========================
+# ASYNC VIEWS TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_async_views_render_like_sync_views(client, settings):
+    """
+    Vérifie que les vues asynchrones de liste et de détail produisent les
+    mêmes pages que les vues synchrones, et passent par le cache d'objets.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.LETTINGS_PAGE_SIZE = 2
+    lettings = [create_letting(f"Letting {i}") for i in range(3)]
+    factory = AsyncRequestFactory()
+
+    index = async_to_sync(views.index_async)(factory.get("/lettings/"))
+    assert index.content == client.get(reverse("lettings_index")).content
+    assert f"?after={lettings[1].id}".encode() in index.content
+
+    url = reverse("letting", kwargs={"letting_id": lettings[2].id})
+    detail = async_to_sync(views.letting_async)(factory.get(url), letting_id=lettings[2].id)
+    assert b"Letting 2" in detail.content
+
+    page_cache.bump_version("lettings")
+    with CaptureQueriesContext(connection) as queries:
+        async_to_sync(views.letting_async)(factory.get(url), letting_id=lettings[2].id)
+    assert len(queries) == 0
+
+
+# =========================
+# API TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_lettings_api_list_and_detail(client, settings):
+    """
+    Vérifie la liste paginée et le détail JSON des locations : adresse
+    imbriquée, sélection de champs, liens de pagination, une seule requête
+    SQL et erreurs 400/404.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.LETTINGS_PAGE_SIZE = 2
+    lettings = [create_letting(f"Letting {i}", city=f"City {i}") for i in range(3)]
+
+    with CaptureQueriesContext(connection) as queries:
+        first = client.get(reverse("api_lettings")).json()
+    assert len(queries) == 1
+    assert [row["id"] for row in first["results"]] == [lettings[0].id, lettings[1].id]
+    assert first["results"][0]["address"]["city"] == "City 0"
+    assert first["previous"] is None
+
+    second = client.get(first["next"]).json()
+    assert [row["id"] for row in second["results"]] == [lettings[2].id]
+    assert second["next"] is None
+    assert client.get(second["previous"]).json() == first
+
+    sparse = client.get(reverse("api_lettings"), {"fields": "title"}).json()
+    assert sparse["results"][0] == {"title": "Letting 0"}
+    assert f"fields=title&after={lettings[1].id}" in sparse["next"]
+
+    detail = client.get(reverse("api_letting", args=[lettings[1].id]), {"fields": "address"})
+    assert detail.json() == {"address": {
+        "number": 1, "street": "Elm Street", "city": "City 1", "state": "ST",
+        "zip_code": 12345, "country_iso_code": "USA",
+    }}
+    assert client.get(reverse("api_letting", args=[0])).status_code == 404
+    unknown = client.get(reverse("api_lettings"), {"fields": "title,owner"})
+    assert unknown.status_code == 400
+    assert "owner" in unknown.json()["detail"]
+    assert client.post(reverse("api_lettings")).status_code == 405
+
+
+@pytest.mark.django_db
+def test_lettings_api_unknown_letting_is_a_cached_404(client):
+    """
+    Vérifie que le détail JSON d'un identifiant inconnu est une erreur 404,
+    que les demandes suivantes ne touchent pas la base, et que la création
+    de la location efface l'absence mémorisée.
+
+    :param client: client de test Django.
+    """
+    url = reverse("api_letting", args=[4242])
+
+    with CaptureQueriesContext(connection) as first:
+        response = client.get(url)
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Location introuvable."}
+    with CaptureQueriesContext(connection) as second:
+        assert client.get(url).status_code == 404
+    assert len(first) == 1 and len(second) == 0
+
+    address = Address.objects.create(
+        number=1, street="Elm Street", city="City", state="ST",
+        zip_code=12345, country_iso_code="USA",
+    )
+    Letting.objects.create(id=4242, title="Late Letting", address=address)
+    assert client.get(url, {"fields": "id,title"}).json() == {"id": 4242, "title": "Late Letting"}
+
+
+@pytest.mark.django_db
+def test_lettings_api_conditional_and_compressed(client):
+    """
+    Vérifie que l'API renvoie un JSON compact, compressé par gzip si le
+    client l'accepte (au-delà de 200 octets), et répond 304 à une requête
+    conditionnelle à jour, jusqu'à la modification d'une location.
+
+    :param client: client de test Django.
+    """
+    import gzip
+    import json
+
+    letting = create_letting("Compact Loft")
+    for i in range(3):
+        create_letting(f"Letting {i}")
+    url = reverse("api_lettings")
+
+    plain = client.get(url)
+    assert b", " not in plain.content and b": " not in plain.content
+    response = client.get(url, HTTP_ACCEPT_ENCODING="gzip")
+    assert response["Content-Encoding"] == "gzip"
+    assert json.loads(gzip.decompress(response.content)) == plain.json()
+
+    etag = response["ETag"]
+    assert client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT_ENCODING="gzip").status_code == 304
+    letting.title = "Renamed Loft"
+    letting.save()
+    refreshed = client.get(url, HTTP_IF_NONE_MATCH=etag, HTTP_ACCEPT_ENCODING="gzip")
+    assert refreshed.status_code == 200
+
+
+# =========================
+# EXPORT TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_lettings_export_streams_catalogue(client, settings):
+    """
+    Vérifie que l'export diffuse tout le catalogue en NDJSON, CSV ou gzip,
+    par une seule requête SQL lancée à la lecture du corps, et refuse un
+    format inconnu.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    import gzip
+    import json
+
+    settings.EXPORT_CHUNK_SIZE = 2
+    for i in range(5):
+        create_letting(f"Letting {i}", city=f"City {i}")
+    url = reverse("api_lettings_export")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url)
+        assert response.streaming
+        assert len(queries) == 0
+        body = b"".join(response.streaming_content)
+    assert len(queries) == 1
+    assert response["Content-Type"] == "application/x-ndjson; charset=utf-8"
+    assert response["Content-Disposition"] == 'attachment; filename="lettings.ndjson"'
+    rows = [json.loads(line) for line in body.decode().splitlines()]
+    assert [row["title"] for row in rows] == [f"Letting {i}" for i in range(5)]
+    assert rows[3]["city"] == "City 3"
+
+    csv_body = b"".join(client.get(url, {"format": "csv"}).streaming_content).decode()
+    lines = csv_body.splitlines()
+    assert lines[0].startswith("title,number,street,city")
+    assert lines[1].startswith("Letting 0,1,Elm Street,City 0")
+    assert len(lines) == 6
+
+    compressed = client.get(url, {"format": "csv", "compress": "gzip"})
+    assert compressed["Content-Type"] == "application/gzip"
+    assert 'filename="lettings.csv.gz"' in compressed["Content-Disposition"]
+    assert gzip.decompress(b"".join(compressed.streaming_content)).decode() == csv_body
+
+    assert client.get(url, {"format": "xml"}).status_code == 400
+    assert client.get(url, {"compress": "zip"}).status_code == 400
+
+
+@pytest.mark.django_db(transaction=True)
+def test_lettings_export_async_matches_sync(client, settings):
+    """
+    Vérifie que la version asynchrone de l'export diffuse le même fichier,
+    par un générateur asynchrone.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.EXPORT_CHUNK_SIZE = 2
+    for i in range(5):
+        create_letting(f"Letting {i}")
+    expected = b"".join(client.get(reverse("api_lettings_export")).streaming_content)
+
+    async def export():
+        request = AsyncRequestFactory().get("/api/lettings/export/")
+        response = await api.export_async(request)
+        assert response.is_async
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    assert async_to_sync(export)() == expected
+
+
+# =========================
+# GEO TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_addresses_geocoded_from_zip_centroids():
+    """
+    Vérifie que les adresses reçoivent le centroïde de leur code postal et
+    leur case de grille, à l'enregistrement comme par ``geocode_addresses``,
+    et que les codes postaux inconnus sont signalés.
+    """
+    address = create_letting("Brunswick Cottage", zip_code=31525).address
+    assert (address.latitude, address.longitude) == geo.geocode(31525)
+    assert address.grid_cell == geo.grid_cell(address.latitude, address.longitude)
+    create_letting("Nowhere Shack", zip_code=99999)
+
+    Address.objects.update(latitude=None, longitude=None, grid_cell=None)
+    out = StringIO()
+    call_command("geocode_addresses", stdout=out)
+    assert "1 adresses géocodées" in out.getvalue()
+    assert "99999" in out.getvalue()
+    address.refresh_from_db()
+    assert address.grid_cell == geo.grid_cell(*geo.geocode(31525))
+
+
+def test_grid_cell_ranges_cover_radius():
+    """
+    Vérifie que les plages de cases recouvrent tous les points du rayon,
+    une plage par rangée de la grille.
+    """
+    ranges = geo.cell_ranges(40.0, -75.0, 25)
+    assert len(ranges) == 6
+    for bearing in range(0, 360, 15):
+        lat = 40.0 + 24.9 / geo.KM_PER_DEGREE * math.cos(math.radians(bearing))
+        lon = -75.0 + (24.9 / geo.KM_PER_DEGREE * math.sin(math.radians(bearing))
+                       / math.cos(math.radians(40.0)))
+        assert geo.haversine_km(40.0, -75.0, lat, lon) < 25
+        cell = geo.grid_cell(lat, lon)
+        assert any(first <= cell <= last for first, last in ranges)
+
+
+@pytest.mark.django_db
+def test_lettings_nearby_view(client):
+    """
+    Vérifie que la recherche de proximité renvoie les ``k`` locations les
+    plus proches dans le rayon, triées par distance, en élargissant le cercle
+    jusqu'à les trouver, autour de coordonnées ou du centroïde d'un code postal.
+
+    :param client: client de test Django.
+    """
+    for index, km in enumerate((30, 2, 12, 70)):
+        create_letting(f"Letting {index}", latitude=40.0 + km / geo.KM_PER_DEGREE,
+                       longitude=-75.0)
+    url = reverse("lettings_nearby")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(url, {"lat": "40", "lon": "-75", "radius": "50", "k": "2"})
+    # Cercles de 6,25 km (une location) puis de 12,5 km (deux)
+    assert len(queries) == 2
+    results = response.context["results"]
+    assert [result["title"] for result in results] == ["Letting 1", "Letting 2"]
+    assert results[0]["distance_km"] == pytest.approx(2, abs=0.01)
+
+    everything = client.get(url, {"lat": "40", "lon": "-75", "radius": "50"}).context["results"]
+    assert [result["title"] for result in everything] == ["Letting 1", "Letting 2", "Letting 0"]
+
+    create_letting("Austin Loft", zip_code=78701)
+    by_zip = client.get(url, {"zip": "78701"}).context["results"]
+    assert [result["title"] for result in by_zip] == ["Austin Loft"]
+    assert by_zip[0]["distance_km"] == 0
+
+    unknown = client.get(url, {"zip": "99999"})
+    assert not unknown.context["located"] and b"Unknown location" in unknown.content
+
+    # Un rayon nul est ramené au minimum, pas au rayon par défaut
+    tiny = client.get(url, {"lat": "40", "lon": "-75", "radius": "0"}).context
+    assert tiny["radius"] == 0.1 and tiny["results"] == []
+
+
+@pytest.mark.django_db
+def test_address_is_geocoded_again_when_its_zip_code_changes():
+    """
+    Vérifie qu'une adresse dont le code postal change est géocodée à nouveau,
+    sauf si ses coordonnées sont modifiées en même temps.
+    """
+    address = create_letting("Loft", zip_code=31525).address
+    address = Address.objects.get(pk=address.pk)
+    address.zip_code = 78701
+    address.save()
+    assert (address.latitude, address.longitude) == geo.geocode(78701)
+    assert address.grid_cell == geo.grid_cell(*geo.geocode(78701))
+
+    address = Address.objects.get(pk=address.pk)
+    address.zip_code = 31525
+    address.latitude, address.longitude = 30.0, -97.0
+    address.save()
+    address.refresh_from_db()
+    assert (address.latitude, address.longitude) == (30.0, -97.0)
+
+    address.city = "Austin"
+    address.save()
+    assert (address.latitude, address.longitude) == (30.0, -97.0)
+
+
+# =========================
+# BULK EDIT TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_edit_lettings_command(client):
+    """
+    Vérifie les opérations de ``edit_lettings`` par lots d'une ligne :
+    renommage (cache et index plein texte à jour), normalisation des
+    adresses et suppression des locations avec leur adresse.
+
+    :param client: client de test Django.
+    """
+    studio = create_letting("Silo Studio", city="NEWPORT  NEWS", state="va")
+    create_letting("Studio Loft", city="McAllen", state="TX")
+    Address.objects.filter(pk=studio.address_id).update(country_iso_code="us")
+    url = reverse("letting", kwargs={"letting_id": studio.id})
+    client.get(url)
+
+    out = StringIO()
+    call_command("edit_lettings", "retitle", find="Studio", replace="Barn",
+                 state="va", batch_size=1, stdout=out)
+    assert "1 lignes" in out.getvalue()
+    assert b"Silo Barn" in client.get(url).content
+    assert [found.title for found in search.search("barn", 0, 10)] == ["Silo Barn"]
+
+    out = StringIO()
+    call_command("edit_lettings", "normalize", batch_size=1, stdout=out)
+    assert "city 1, state 1, country_iso_code 1" in out.getvalue()
+    address = Address.objects.get(pk=studio.address_id)
+    assert (address.city, address.state, address.country_iso_code) == ("Newport News", "VA", "USA")
+    assert Address.objects.get(city="McAllen").state == "TX"
+
+    with pytest.raises(CommandError):
+        call_command("edit_lettings", "delete", stdout=StringIO())
+    call_command("edit_lettings", "delete", state="VA", stdout=StringIO())
+    assert list(Letting.objects.values_list("title", flat=True)) == ["Studio Loft"]
+    assert not Address.objects.filter(pk=studio.address_id).exists()
+    assert search.search("barn", 0, 10) == []
+
+
+@pytest.mark.django_db
+def test_retitle_lettings_is_case_sensitive():
+    """
+    Vérifie que le renommage en masse ne retient que les titres contenant le
+    texte avec sa casse, les seuls que ``REPLACE`` modifie : les autres ne
+    sont ni comptés ni invalidés.
+    """
+    loft = create_letting("Sunny Loft")
+    version = page_cache.get_version("lettings")
+
+    assert bulk.retitle_lettings(Letting.objects.all(), "loft", "Flat") == 0
+    assert page_cache.get_version("lettings") == version
+    assert bulk.retitle_lettings(Letting.objects.all(), "Loft", "Flat") == 1
+    assert Letting.objects.get(pk=loft.pk).title == "Sunny Flat"
+    assert page_cache.get_version("lettings") > version
+
+
+# =========================
+# SUMMARY TESTS
+# =========================
+
+def summary_rows():
+    """Renvoie les résumés des locations, et les valeurs jointes qu'ils doivent copier."""
+    rows = LettingSummary.objects.order_by("pk").values_list("pk", *summary.SUMMARY_FIELDS)
+    expected = Letting.objects.order_by("pk").values_list(
+        "pk", *summary.SUMMARY_FIELDS.values()
+    )
+    return list(rows), list(expected)
+
+
+@pytest.mark.django_db
+def test_letting_summary_follows_saves_and_bulk_edits():
+    """
+    Vérifie que les résumés suivent l'enregistrement des locations et des
+    adresses, l'import, les modifications en masse et les suppressions.
+    """
+    loft = create_letting("Loft", city="PORTLAND", state="or")
+    create_letting("Barn")
+    loft.title = "Sunny Loft"
+    loft.save()
+    loft.address.street = "Oak Street"
+    loft.address.save()
+    bulk.write_lettings([bulk.build_letting(1, {
+        "title": "Imported", "number": 2, "street": "Pine Street", "city": "Dover",
+        "state": "DE", "zip_code": 19901, "country_iso_code": "USA",
+    })])
+    bulk.retitle_lettings(Letting.objects.all(), "Loft", "Flat")
+    bulk.normalize_addresses(Address.objects.all())
+    rows, expected = summary_rows()
+    assert len(rows) == 3 and rows == expected
+    assert LettingSummary.objects.get(pk=loft.pk).city == "Portland"
+
+    assert bulk.delete_lettings(Letting.objects.filter(title="Barn")) == (1, 1)
+    assert bulk.delete_addresses(Address.objects.filter(city="Dover")) == (1, 1)
+    Letting.objects.get(pk=loft.pk).delete()
+    assert summary_rows() == ([], [])
+
+
+@pytest.mark.django_db
+def test_rebuild_letting_summary_command(client):
+    """
+    Vérifie que ``rebuild_letting_summary`` réécrit les résumés par lots et
+    que la page de détail est lue en une requête, sans jointure.
+
+    :param client: client de test Django.
+    """
+    lettings = [create_letting(f"Letting {i}") for i in range(3)]
+    Address.objects.update(city="Stale")
+    LettingSummary.objects.filter(pk=lettings[0].pk).delete()
+
+    out = StringIO()
+    call_command("rebuild_letting_summary", batch_size=2, stdout=out)
+    assert "3 lignes" in out.getvalue()
+    rows, expected = summary_rows()
+    assert len(rows) == 3 and rows == expected
+    with pytest.raises(CommandError):
+        call_command("rebuild_letting_summary", batch_size=0, stdout=StringIO())
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("letting", kwargs={"letting_id": lettings[0].pk}))
+    assert b"Stale" in response.content
+    assert len(queries) == 1 and "JOIN" not in queries[0]["sql"]
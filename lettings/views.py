@@ -1,38 +1,211 @@
+import math
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.db.models import F
+from django.http import Http404
 from django.shortcuts import render
-from .models import Letting
+from oc_lettings_site import object_cache
+from oc_lettings_site.db_routing import use_read_database
+from oc_lettings_site.page_cache import cached_page
+from oc_lettings_site.pagination import apaginate, paginate
+from oc_lettings_site.rate_limit import rate_limited
+from . import geo
+from .models import Letting, LettingSummary
+from .search import search as search_lettings
+
+# Lignes de la liste des locations : dictionnaires lus dans la table des
+# résumés, sans instancier de modèle (son initialisation coûtait plus que la
+# requête elle-même)
+LIST_ROWS = LettingSummary.objects.values('title', id=F('letting_id'))
 
 
+@cached_page('lettings')
+@use_read_database
 def index(request):
     """
-    Vue qui affiche la liste de toutes les locations.
+    Vue qui affiche la liste paginée des locations.
+
+    Les locations sont lues dans la table des résumés, paginées par curseur
+    sur leur identifiant (paramètres ``after`` / ``before``), en
+    dictionnaires ``id`` / ``title`` (voir :data:`LIST_ROWS`).
 
     Args:
         request (HttpRequest): La requête HTTP reçue.
 
     Returns:
         HttpResponse: La réponse contenant le template 'lettings/index.html'
-                      avec le contexte {'lettings_list': lettings_list}.
+                      avec le contexte {'lettings_list': ..., 'page': page}.
     """
-    lettings_list = Letting.objects.all()
-    context = {'lettings_list': lettings_list}
+    page = paginate(LIST_ROWS, request, settings.LETTINGS_PAGE_SIZE)
+    context = {'lettings_list': page.object_list, 'page': page}
     return render(request, 'lettings/index.html', context)
 
 
+@rate_limited('letting')
+@cached_page('lettings')
+@use_read_database
 def letting(request, letting_id):
     """
     Vue qui affiche les détails d'une location spécifique.
 
+    La location et son adresse sont lues dans la table des résumés, sur sa
+    clé primaire et sans jointure, puis servies par le cache d'objets tant
+    qu'elles ne sont pas modifiées. Un identifiant
+    inconnu donne la page 404, et son absence reste brièvement en cache.
+
     Args:
         request (HttpRequest): La requête HTTP reçue.
         letting_id (int): L'identifiant de la location.
 
     Returns:
         HttpResponse: La réponse contenant le template 'lettings/letting.html'
-                      avec le contexte {'title': letting.title, 'address': letting.address}.
+                      avec le contexte {'title': summary.title, 'address': summary}.
+
+    Raises:
+        Http404: Si la location n'existe pas.
     """
-    letting = Letting.objects.get(id=letting_id)
+    try:
+        summary = object_cache.get_or_load(
+            'letting', letting_id, lambda: LettingSummary.objects.get(pk=letting_id),
+        )
+    except ObjectDoesNotExist:
+        raise Http404("Location introuvable.")
+    # Le résumé porte les champs de l'adresse sous les mêmes noms
     context = {
-        'title': letting.title,
-        'address': letting.address,
+        'title': summary.title,
+        'address': summary,
     }
     return render(request, 'lettings/letting.html', context)
+
+
+@cached_page('lettings')
+@use_read_database
+async def index_async(request):
+    """
+    Version asynchrone de :func:`index`, servie en mode ASGI.
+
+    Le queryset est évalué par itération asynchrone de l'ORM.
+    """
+    page = await apaginate(LIST_ROWS, request, settings.LETTINGS_PAGE_SIZE)
+    context = {'lettings_list': page.object_list, 'page': page}
+    return render(request, 'lettings/index.html', context)
+
+
+@rate_limited('letting')
+@cached_page('lettings')
+@use_read_database
+async def letting_async(request, letting_id):
+    """
+    Version asynchrone de :func:`letting`, servie en mode ASGI.
+
+    Le résumé de la location est chargé par ``aget`` en cas d'absence du
+    cache d'objets.
+    """
+    try:
+        summary = await object_cache.aget_or_load(
+            'letting', letting_id, lambda: LettingSummary.objects.aget(pk=letting_id),
+        )
+    except ObjectDoesNotExist:
+        raise Http404("Location introuvable.")
+    # Le résumé porte les champs de l'adresse sous les mêmes noms
+    context = {
+        'title': summary.title,
+        'address': summary,
+    }
+    return render(request, 'lettings/letting.html', context)
+
+
+@cached_page('lettings')
+@use_read_database
+def search(request):
+    """
+    Vue de recherche plein texte des locations (titre, rue, ville).
+
+    Les résultats sont classés par pertinence et paginés par numéro de page,
+    dans la limite de ``SEARCH_MAX_PAGES`` pages.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue, avec ``q`` et ``page``.
+
+    Returns:
+        HttpResponse: La réponse contenant le template 'lettings/search.html'
+                      avec le contexte {'query': ..., 'results': ..., ...}.
+    """
+    query = request.GET.get('q', '').strip()[:settings.SEARCH_MAX_QUERY_LENGTH]
+    try:
+        page_number = int(request.GET.get('page', 1))
+    except ValueError:
+        page_number = 1
+    page_number = max(1, min(page_number, settings.SEARCH_MAX_PAGES))
+    size = settings.SEARCH_PAGE_SIZE
+
+    results = search_lettings(query, (page_number - 1) * size, size + 1)
+    context = {
+        'query': query,
+        'results': results[:size],
+        'page_number': page_number,
+        'has_previous': page_number > 1,
+        'has_next': len(results) > size and page_number < settings.SEARCH_MAX_PAGES,
+    }
+    return render(request, 'lettings/search.html', context)
+
+
+def _float_param(request, name):
+    """Renvoie un paramètre de requête décimal, ou ``None`` s'il est absent ou invalide."""
+    try:
+        value = float(request.GET[name])
+    except (KeyError, ValueError):
+        return None
+    return value if math.isfinite(value) else None
+
+
+@cached_page('lettings')
+@use_read_database
+def nearby(request):
+    """
+    Vue qui affiche les locations les plus proches d'un point.
+
+    Le point est donné par ``lat`` et ``lon``, ou par le centroïde du code
+    postal ``zip``. Seules les cases de la grille de proximité qui recouvrent
+    le rayon demandé sont lues, en une requête (voir :mod:`lettings.geo`).
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue, avec ``lat``/``lon`` ou
+            ``zip``, ``radius`` (km, au plus ``NEARBY_MAX_RADIUS_KM``) et
+            ``k`` (au plus ``NEARBY_MAX_RESULTS``).
+
+    Returns:
+        HttpResponse: La réponse contenant le template 'lettings/nearby.html'
+                      avec le contexte {'results': ..., 'radius': ..., ...}.
+    """
+    latitude, longitude = _float_param(request, 'lat'), _float_param(request, 'lon')
+    zip_code = request.GET.get('zip', '').strip()
+    if (latitude is None or longitude is None) and zip_code.isdigit():
+        latitude, longitude = geo.geocode(int(zip_code)) or (None, None)
+    radius = _float_param(request, 'radius')
+    if radius is None:
+        radius = settings.NEARBY_DEFAULT_RADIUS_KM
+    radius = min(max(radius, 0.1), settings.NEARBY_MAX_RADIUS_KM)
+    try:
+        limit = int(request.GET.get('k', settings.NEARBY_DEFAULT_RESULTS))
+    except ValueError:
+        limit = settings.NEARBY_DEFAULT_RESULTS
+    limit = min(max(limit, 1), settings.NEARBY_MAX_RESULTS)
+
+    located = (
+        latitude is not None and longitude is not None
+        and -90 <= latitude <= 90 and -180 <= longitude <= 180
+    )
+    results = geo.nearby(Letting.objects, latitude, longitude, radius, limit) if located else []
+    context = {
+        'results': results,
+        'located': located,
+        'searched': bool(request.GET),
+        'latitude': latitude if located else None,
+        'longitude': longitude if located else None,
+        'zip_code': zip_code,
+        'radius': radius,
+        'limit': limit,
+    }
+    return render(request, 'lettings/nearby.html', context)
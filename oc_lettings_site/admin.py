@@ -1,10 +1,168 @@
+"""
+Administration des locations, adresses et profils.
+
+Les listes de l'admin restent rapides sur de grandes tables :
+
+- les objets liés affichés par chaque ligne sont lus par jointure
+  (``list_select_related``) au lieu d'une requête par ligne ;
+- la recherche et les filtres n'utilisent que des colonnes indexées :
+  index plein texte des locations, préfixe de ville (index insensible à la
+  casse), code postal exact, état ;
+- le nombre total de lignes n'est pas recompté (``show_full_result_count``)
+  et, sur une grande table non filtrée, il est estimé
+  (:class:`oc_lettings_site.pagination.EstimatedCountPaginator`) ;
+- les formulaires choisissent l'adresse ou l'utilisateur par identifiant
+  (``raw_id_fields``) au lieu de charger toute la table dans une liste.
+
+Les actions de masse (renommage des locations, normalisation des adresses)
+et les suppressions passent par les requêtes ensemblistes par lots de
+:mod:`lettings.bulk`. Supprimer une location supprime aussi son adresse.
+"""
+import time
+
+from django import forms
 from django.contrib import admin
+from django.template.response import TemplateResponse
 
-from lettings.models import Letting
-from lettings.models import Address
+from lettings import bulk, search
+from lettings.models import Address, Letting
+from oc_lettings_site.pagination import EstimatedCountPaginator
 from profiles.models import Profile
 
 
-admin.site.register(Letting)
-admin.site.register(Address)
-admin.site.register(Profile)
+class LargeTableAdmin(admin.ModelAdmin):
+    """``ModelAdmin`` dont la liste ne compte pas toute la table."""
+
+    paginator = EstimatedCountPaginator
+    show_full_result_count = False
+
+
+class StateListFilter(admin.SimpleListFilter):
+    """
+    Filtre par état, dont les choix sont lus sur l'index de
+    ``lettings_address.state`` sans joindre la table filtrée.
+    """
+
+    title = 'state'
+    parameter_name = 'state'
+    field_path = 'state'
+
+    def lookups(self, request, model_admin):
+        states = Address.objects.order_by('state').values_list('state', flat=True).distinct()
+        return [(state, state) for state in states]
+
+    def queryset(self, request, queryset):
+        if self.value():
+            return queryset.filter(**{self.field_path: self.value()})
+        return queryset
+
+
+class LettingStateListFilter(StateListFilter):
+    field_path = 'address__state'
+
+
+class RetitleForm(forms.Form):
+    """Texte à remplacer dans le titre des locations sélectionnées."""
+
+    find = forms.CharField(label="Remplacer", max_length=256)
+    replace = forms.CharField(label="par", max_length=256, required=False, strip=False)
+
+
+def _elapsed_ms(start):
+    return (time.perf_counter() - start) * 1000
+
+
+@admin.register(Letting)
+class LettingAdmin(LargeTableAdmin):
+    list_display = ('title', 'city', 'state')
+    list_select_related = ('address',)
+    list_filter = (LettingStateListFilter,)
+    # Recherche de repli hors SQLite (voir get_search_results)
+    search_fields = ('title', 'address__street', 'address__city')
+    raw_id_fields = ('address',)
+    actions = ('retitle',)
+
+    @admin.display(ordering='address__city')
+    def city(self, letting):
+        return letting.address.city
+
+    @admin.display(ordering='address__state')
+    def state(self, letting):
+        return letting.address.state
+
+    def get_search_results(self, request, queryset, search_term):
+        """Recherche dans l'index plein texte des locations (titre, rue, ville)."""
+        if not search_term.strip():
+            return queryset, False
+        return search.filter_lettings(queryset, search_term), False
+
+    @admin.action(description="Remplacer un texte dans le titre", permissions=('change',))
+    def retitle(self, request, queryset):
+        """
+        Renomme les locations sélectionnées, après une page de saisie du
+        texte à remplacer.
+        """
+        form = RetitleForm(request.POST if 'apply' in request.POST else None)
+        if form.is_valid():
+            start = time.perf_counter()
+            updated = bulk.retitle_lettings(
+                queryset, form.cleaned_data['find'], form.cleaned_data['replace']
+            )
+            self.message_user(
+                request, f"{updated} location(s) renommée(s) en {_elapsed_ms(start):.0f} ms."
+            )
+            return None
+        return TemplateResponse(request, 'admin/lettings/letting/retitle.html', {
+            **self.admin_site.each_context(request),
+            'title': "Remplacer un texte dans le titre",
+            'opts': self.opts,
+            'form': form,
+            'queryset': queryset,
+            'selected': request.POST.getlist(admin.helpers.ACTION_CHECKBOX_NAME),
+            'select_across': request.POST.get('select_across', '0'),
+        })
+
+    def delete_model(self, request, obj):
+        bulk.delete_lettings(Letting.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        bulk.delete_lettings(queryset)
+
+
+@admin.register(Address)
+class AddressAdmin(LargeTableAdmin):
+    list_display = ('__str__', 'city', 'state', 'zip_code', 'country_iso_code')
+    list_filter = (StateListFilter,)
+    # Préfixe de ville : index address_city_nocase_idx
+    search_fields = ('^city',)
+    actions = ('normalize',)
+
+    def get_search_results(self, request, queryset, search_term):
+        """Un code postal est cherché exactement, sur son index."""
+        if search_term.strip().isdigit():
+            return queryset.filter(zip_code=int(search_term)), False
+        return super().get_search_results(request, queryset, search_term)
+
+    @admin.action(description="Normaliser ville, état et code pays", permissions=('change',))
+    def normalize(self, request, queryset):
+        start = time.perf_counter()
+        counts = bulk.normalize_addresses(queryset)
+        details = ', '.join(f"{field} : {count}" for field, count in counts.items())
+        self.message_user(
+            request, f"Champs corrigés ({details}) en {_elapsed_ms(start):.0f} ms."
+        )
+
+    def delete_model(self, request, obj):
+        bulk.delete_addresses(Address.objects.filter(pk=obj.pk))
+
+    def delete_queryset(self, request, queryset):
+        bulk.delete_addresses(queryset)
+
+
+@admin.register(Profile)
+class ProfileAdmin(LargeTableAdmin):
+    list_display = ('__str__', 'favorite_city')
+    list_select_related = ('user',)
+    # Préfixe du nom d'utilisateur : index auth_user_username_nocase_idx
+    search_fields = ('^user__username',)
+    raw_id_fields = ('user',)
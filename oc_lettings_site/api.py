@@ -0,0 +1,135 @@
+"""
+Outils communs de l'API JSON en lecture seule (``/api/...``).
+
+Les champs exposés par une ressource sont décrits par un dictionnaire :
+nom public → chemin ORM, ou nom public → dictionnaire de sous-champs pour un
+objet imbriqué (l'adresse d'une location). Les lignes sont lues par
+``.values()`` sur les seuls chemins des champs demandés, sans instancier de
+modèle, puis remises en forme par :func:`shape`.
+
+Paramètres de requête reconnus :
+    ``fields`` : champs à renvoyer, séparés par des virgules (par défaut tous).
+    ``after`` / ``before`` / ``size`` : pagination par curseur des listes
+    (voir :mod:`oc_lettings_site.pagination`).
+
+Les réponses sont du JSON compact, compressé par gzip lorsque le client
+l'accepte ; les vues sont décorées par ``cached_page`` pour le cache et les
+requêtes conditionnelles (``ETag``, 304).
+"""
+from functools import wraps
+
+from django.http import JsonResponse
+from django.views.decorators.gzip import gzip_page
+from django.views.decorators.http import require_safe
+
+# JSON sans espaces superflus
+COMPACT_JSON = {'separators': (',', ':')}
+
+
+class FieldSelectionError(ValueError):
+    """Le paramètre ``fields`` désigne un champ inconnu."""
+
+
+def json_response(data, status=200):
+    """Renvoie une réponse JSON compacte."""
+    return JsonResponse(data, status=status, json_dumps_params=COMPACT_JSON)
+
+
+def json_error(message, status):
+    """Renvoie une erreur JSON ``{"detail": message}``."""
+    return json_response({'detail': message}, status=status)
+
+
+def select_fields(request, fields):
+    """
+    Restreint les champs d'une ressource à ceux du paramètre ``fields``.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue.
+        fields (dict): Champs de la ressource (nom public → chemin ORM ou
+            dictionnaire de sous-champs).
+
+    Returns:
+        dict: Les champs demandés, dans l'ordre de la ressource.
+
+    Raises:
+        FieldSelectionError: Si un nom demandé n'est pas un champ de la ressource.
+    """
+    requested = request.GET.get('fields')
+    if not requested:
+        return fields
+    names = {name.strip() for name in requested.split(',') if name.strip()}
+    unknown = sorted(names - fields.keys())
+    if unknown:
+        raise FieldSelectionError(
+            f"Champs inconnus : {', '.join(unknown)}. "
+            f"Champs disponibles : {', '.join(fields)}."
+        )
+    return {name: path for name, path in fields.items() if name in names}
+
+
+def orm_paths(fields):
+    """Renvoie les chemins ORM à lire pour des champs, sans doublon."""
+    paths = []
+    for path in fields.values():
+        paths.extend(path.values() if isinstance(path, dict) else [path])
+    return list(dict.fromkeys(paths))
+
+
+def shape(row, fields):
+    """
+    Met en forme une ligne de ``.values()`` selon les champs demandés.
+
+    Args:
+        row (dict): Ligne indexée par chemin ORM.
+        fields (dict): Champs demandés.
+
+    Returns:
+        dict: L'objet JSON de la ressource.
+    """
+    return {
+        name: {sub: row[sub_path] for sub, sub_path in path.items()}
+        if isinstance(path, dict) else row[path]
+        for name, path in fields.items()
+    }
+
+
+def page_links(request, page):
+    """
+    Renvoie les URLs des pages voisines d'une page par curseur, en conservant
+    les autres paramètres de la requête (``fields``, ``size``).
+
+    Returns:
+        dict: ``{'next': url ou None, 'previous': url ou None}``.
+    """
+    def link(param, cursor):
+        if cursor is None:
+            return None
+        query = request.GET.copy()
+        query.pop('after', None)
+        query.pop('before', None)
+        query[param] = cursor
+        return f'{request.path}?{query.urlencode()}'
+
+    return {
+        'next': link('after', page.next_cursor),
+        'previous': link('before', page.previous_cursor),
+    }
+
+
+def api_view(view):
+    """
+    Décorateur des vues de l'API : méthodes ``GET``/``HEAD`` seules,
+    compression gzip, et erreur 400 sur une sélection de champs invalide.
+
+    À placer au-dessus de ``cached_page``, pour que le cache garde le corps
+    non compressé et serve tous les clients.
+    """
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except FieldSelectionError as error:
+            return json_error(str(error), status=400)
+
+    return require_safe(gzip_page(wrapper))
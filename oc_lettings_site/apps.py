@@ -1,5 +1,11 @@
 from django.apps import AppConfig
+from django.db.backends.signals import connection_created
 
 
 class OCLettingsSiteConfig(AppConfig):
     name = 'oc_lettings_site'
+
+    def ready(self):
+        from .timing import install_query_timer
+
+        connection_created.connect(install_query_timer, dispatch_uid='request_timing')
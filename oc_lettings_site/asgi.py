@@ -1,7 +1,80 @@
-import os
+"""
+Point d'entrée ASGI, servi par des workers uvicorn sous gunicorn.
+
+Le module positionne ``SERVER_MODE=asgi`` avant le chargement des réglages :
+les routes de données utilisent alors les vues asynchrones. WhiteNoise n'ayant
+pas de chemin asynchrone, les fichiers statiques collectés sont servis par
+``starlette.staticfiles`` sans traverser Django, comme le ferait WhiteNoise :
+versions brotli ou gzip écrites au build et cache ``immutable`` des fichiers
+empreintés (voir :mod:`oc_lettings_site.assets`).
 
-from django.core.asgi import get_asgi_application
+Les templates du projet sont compilés au chargement du module.
+"""
+import os
+import re
+from mimetypes import guess_type
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'oc_lettings_site.settings')
+os.environ.setdefault('SERVER_MODE', 'asgi')
+
+from django.conf import settings  # noqa: E402
+from django.core.asgi import get_asgi_application  # noqa: E402
+from starlette.datastructures import Headers  # noqa: E402
+from starlette.responses import FileResponse  # noqa: E402
+from starlette.staticfiles import NotModifiedResponse, StaticFiles  # noqa: E402
+
+from oc_lettings_site.template_loading import warm_template_cache  # noqa: E402
+
+# Versions précompressées, par ordre de préférence
+PRECOMPRESSED = (('br', '.br'), ('gzip', '.gz'))
+# Nom empreinté par ManifestStaticFilesStorage : styles.3f2a9c1b7d4e.css
+HASHED_NAME_RE = re.compile(r'\.[0-9a-f]{12}\.\w+$')
+IMMUTABLE_CACHE_CONTROL = 'max-age=315360000, public, immutable'
+
+
+class PrecompressedStaticFiles(StaticFiles):
+    """
+    ``StaticFiles`` qui sert la version brotli ou gzip d'un fichier aux
+    clients qui l'acceptent, et dont les fichiers empreintés sont mis en
+    cache sans limite par les navigateurs.
+    """
+
+    def file_response(self, full_path, stat_result, scope, status_code=200):
+        request_headers = Headers(scope=scope)
+        accepted = request_headers.get('accept-encoding', '')
+        path, encoding = full_path, None
+        for name, suffix in PRECOMPRESSED:
+            if name in accepted and os.path.isfile(f'{full_path}{suffix}'):
+                path, encoding = f'{full_path}{suffix}', name
+                stat_result = os.stat(path)
+                break
+        response = FileResponse(
+            path, status_code=status_code, stat_result=stat_result,
+            media_type=guess_type(str(full_path))[0] or 'text/plain',
+        )
+        response.headers['Vary'] = 'Accept-Encoding'
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        if HASHED_NAME_RE.search(str(full_path)):
+            response.headers['Cache-Control'] = IMMUTABLE_CACHE_CONTROL
+        if self.is_not_modified(response.headers, request_headers):
+            return NotModifiedResponse(response.headers)
+        return response
+
+
+django_application = get_asgi_application()
+warm_template_cache()
+static_files = PrecompressedStaticFiles(directory=settings.STATIC_ROOT, check_dir=False)
+
 
-application = get_asgi_application()
+async def application(scope, receive, send):
+    """
+    Application ASGI : les chemins sous ``STATIC_URL`` sont servis par
+    :class:`PrecompressedStaticFiles`, toutes les autres connexions par Django.
+    """
+    static_prefix = settings.STATIC_URL.rstrip('/')
+    if scope['type'] == 'http' and scope['path'].startswith(static_prefix + '/'):
+        scope = dict(scope, path=scope['path'][len(static_prefix):])
+        await static_files(scope, receive, send)
+        return
+    await django_application(scope, receive, send)
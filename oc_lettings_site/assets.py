@@ -0,0 +1,247 @@
+"""
+Chaîne de construction des fichiers statiques.
+
+Les sources sont dans ``static/`` (``STATICFILES_DIRS``) ; ``build_assets``
+les collecte dans ``STATIC_ROOT`` au build de l'image, via
+:class:`AssetStorage` :
+
+- les feuilles de style et scripts du projet (``css/``, ``js/``) sont
+  minifiés avant d'être empreintés ;
+- chaque fichier est copié sous un nom contenant l'empreinte de son contenu
+  (``styles.3f2a9c1b7d4e.css``, manifeste ``staticfiles.json``), servi avec
+  ``Cache-Control: immutable`` ;
+- WhiteNoise en écrit des versions gzip et brotli, servies sans compression
+  à la volée aux clients qui les acceptent.
+
+Les bibliothèques tierces chargées jusque-là depuis des CDN sont copiées
+dans ``static/vendor/`` par ``build_assets --vendor`` (voir
+:data:`VENDOR_ASSETS`) : même origine que la page, pas de connexion à un
+autre hôte. Tant qu'elles ne sont pas copiées, les templates pointent vers
+le CDN.
+
+Le build enregistre l'empreinte des sources collectées
+(:data:`BUILD_STAMP`) : au démarrage du conteneur,
+``build_assets --if-stale`` ne relance ``collectstatic`` que si elles ont
+changé depuis.
+"""
+import hashlib
+import json
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.contrib.staticfiles import finders
+from django.templatetags.static import static
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+# Bibliothèques copiées dans static/vendor/ : nom → (URL du CDN, empreinte SRI)
+VENDOR_ASSETS = {
+    'aos.css': ('https://unpkg.com/aos@next/dist/aos.css', None),
+    'aos.js': ('https://unpkg.com/aos@next/dist/aos.js', None),
+    'fontawesome.min.js': (
+        'https://cdnjs.cloudflare.com/ajax/libs/font-awesome/5.15.1/js/all.min.js', None,
+    ),
+    'feather.min.js': (
+        'https://cdnjs.cloudflare.com/ajax/libs/feather-icons/4.24.1/feather.min.js', None,
+    ),
+    'bootstrap.bundle.min.js': (
+        'https://cdn.jsdelivr.net/npm/bootstrap@5.1.3/dist/js/bootstrap.bundle.min.js', None,
+    ),
+    'sentry.min.js': (
+        'https://browser.sentry-cdn.com/7.120.0/bundle.min.js',
+        'sha384-+BrPn6dF6DgVbc+yzDJcq9spZbEoyLU5uP7CRe2XtyjhtOka3v2h89+Yp6fwP7EV',
+    ),
+}
+VENDOR_PREFIX = 'vendor/'
+
+# Dossiers des sources du projet minifiées au build
+MINIFIED_PREFIXES = ('css/', 'js/')
+
+# Empreinte des sources du dernier build, dans STATIC_ROOT
+BUILD_STAMP = 'assets-build.json'
+
+# Chaînes et commentaires d'une feuille de style
+CSS_TOKEN_RE = re.compile(
+    r'(?P<string>"(?:\\.|[^"\\])*"|\'(?:\\.|[^\'\\])*\')|(?P<comment>/\*.*?\*/)',
+    re.S,
+)
+
+
+def minify_css(source):
+    """
+    Minifie une feuille de style : commentaires retirés (sauf les licences
+    ``/*! ... */``), espaces réduits, aucun espace autour de ``{};,>`` ni
+    après ``:``, pas de ``;`` avant ``}``. Les chaînes sont laissées telles
+    quelles. Appliquée deux fois, elle ne change plus rien.
+    """
+    parts = []
+    code = []
+    position = 0
+    for match in CSS_TOKEN_RE.finditer(source):
+        code.append(source[position:match.start()])
+        position = match.end()
+        token = match.group(0)
+        if match.group('comment') and not token.startswith('/*!'):
+            # Un commentaire retiré sépare deux morceaux de code
+            code.append(' ')
+            continue
+        parts.append(_compact_css(''.join(code), parts))
+        code = []
+        parts.append(token + '\n' if match.group('comment') else token)
+    code.append(source[position:])
+    parts.append(_compact_css(''.join(code), parts))
+    return ''.join(parts).strip() + '\n'
+
+
+def _compact_css(code, previous):
+    """Compacte les espaces d'un morceau de CSS situé hors chaînes et commentaires."""
+    code = re.sub(r'\s+', ' ', code)
+    code = re.sub(r' ?([{};,>]) ?', r'\1', code)
+    code = code.replace(': ', ':').replace(';}', '}')
+    # Après une licence, la ligne commence sans espace
+    return code.lstrip() if previous and previous[-1].endswith('\n') else code
+
+
+def minify_js(source):
+    """
+    Minifie prudemment un script : indentation et lignes vides retirées,
+    ainsi que les lignes de commentaire ``//`` et les blocs ``/* ... */``
+    qui commencent une ligne (sauf les licences ``/*! ... */``). Les fins de
+    ligne sont conservées, l'insertion automatique des points-virgules reste
+    donc inchangée ; les littéraux de gabarit multilignes ne sont pas touchés.
+    """
+    output = []
+    in_template = False
+    in_comment = False
+    for line in source.splitlines():
+        if in_template:
+            output.append(line)
+            in_template = line.count('`') % 2 == 0
+            continue
+        stripped = line.strip()
+        if in_comment:
+            in_comment = '*/' not in stripped
+            continue
+        if stripped.startswith('/*') and not stripped.startswith('/*!'):
+            in_comment = '*/' not in stripped
+            continue
+        if not stripped or stripped.startswith('//'):
+            continue
+        output.append(stripped)
+        in_template = stripped.count('`') % 2 == 1
+    return '\n'.join(output) + '\n'
+
+
+def minifier(name):
+    """Renvoie la fonction de minification d'un fichier source, ou ``None``."""
+    if not name.startswith(MINIFIED_PREFIXES) or '.min.' in name:
+        return None
+    if name.endswith('.css'):
+        return minify_css
+    if name.endswith('.js'):
+        return minify_js
+    return None
+
+
+class AssetStorage(CompressedManifestStaticFilesStorage):
+    """
+    Stockage des fichiers statiques collectés : minification des sources du
+    projet, puis empreinte et compression de WhiteNoise.
+
+    Un fichier introuvable garde son nom d'origine au lieu de lever une
+    erreur : hors build (développement, tests), et pour les images que la
+    feuille de style du thème référence sans que le projet les fournisse.
+    """
+
+    manifest_strict = False
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            paths = dict(paths)
+            for name in paths:
+                minify = minifier(name)
+                if minify is None:
+                    continue
+                with self.open(name) as file:
+                    source = file.read().decode('utf-8')
+                minified = minify(source)
+                if minified != source:
+                    with open(self.path(name), 'w', encoding='utf-8') as file:
+                        file.write(minified)
+                # L'empreinte est calculée sur la copie minifiée
+                paths[name] = (self, name)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def hashed_name(self, name, content=None, filename=None):
+        try:
+            return super().hashed_name(name, content, filename)
+        except ValueError:
+            if content is not None:
+                raise
+            return name
+
+
+def source_digest():
+    """
+    Renvoie l'empreinte SHA-256 des fichiers trouvés par les finders de
+    ``collectstatic`` (chemins et contenus) et de la liste des bibliothèques
+    tierces.
+    """
+    digest = hashlib.sha256(json.dumps(sorted(VENDOR_ASSETS)).encode())
+    files = {}
+    for finder in finders.get_finders():
+        for path, storage in finder.list(['CVS', '.*', '*~']):
+            # Comme collectstatic, le premier fichier trouvé l'emporte
+            files.setdefault(path, storage)
+    for path in sorted(files):
+        digest.update(path.encode() + b'\0')
+        with files[path].open(path) as file:
+            for block in iter(lambda: file.read(1 << 16), b''):
+                digest.update(block)
+    return digest.hexdigest()
+
+
+def build_is_current(digest=None):
+    """
+    Indique si ``STATIC_ROOT`` contient un build des sources actuelles : le
+    manifeste existe et l'empreinte enregistrée au build est la même.
+    """
+    root = settings.STATIC_ROOT
+    stamp = root / BUILD_STAMP
+    if not (root / 'staticfiles.json').is_file() or not stamp.is_file():
+        return False
+    recorded = json.loads(stamp.read_text(encoding='utf-8')).get('sources')
+    return recorded == (digest or source_digest())
+
+
+def write_build_stamp(digest):
+    """Enregistre l'empreinte des sources du build dans ``STATIC_ROOT``."""
+    (settings.STATIC_ROOT / BUILD_STAMP).write_text(
+        json.dumps({'sources': digest}), encoding='utf-8'
+    )
+
+
+@lru_cache(maxsize=None)
+def vendor_url(name):
+    """
+    Renvoie l'URL d'une bibliothèque tierce : la copie de ``static/vendor/``
+    si elle existe, sinon le CDN d'origine.
+    """
+    if finders.find(VENDOR_PREFIX + name):
+        return static(VENDOR_PREFIX + name)
+    return VENDOR_ASSETS[name][0]
+
+
+@lru_cache(maxsize=None)
+def preload_header():
+    """
+    Renvoie la valeur de l'en-tête ``Link`` des ressources critiques de
+    ``PRELOAD_ASSETS``, résolue une fois par processus (les URLs empreintées
+    ne changent qu'avec un nouveau déploiement).
+    """
+    links = []
+    for name, kind in settings.PRELOAD_ASSETS:
+        url = vendor_url(name) if name in VENDOR_ASSETS else static(name)
+        crossorigin = '; crossorigin' if url.startswith(('http:', 'https:')) else ''
+        links.append(f'<{url}>; rel=preload; as={kind}{crossorigin}')
+    return ', '.join(links)
@@ -0,0 +1,29 @@
+"""
+Appels au cache Django depuis le code asynchrone.
+
+L'API asynchrone des backends de Django (``aget``, ``aset``...) délègue à
+l'API synchrone via ``sync_to_async`` : chaque appel coûte un passage par le
+pool de threads. Les backends en mémoire du processus ne font aucune
+entrée/sortie et sont donc appelés directement depuis la boucle
+d'événements ; les autres passent par l'API asynchrone pour ne pas la bloquer.
+"""
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+
+IN_PROCESS_BACKENDS = (LocMemCache, DummyCache)
+
+
+async def call(cache, method, *args, **kwargs):
+    """
+    Appelle une méthode du cache depuis une coroutine.
+
+    Args:
+        cache (BaseCache): Le backend de cache.
+        method (str): Nom de la méthode synchrone (``'get'``, ``'set'``...).
+
+    Returns:
+        object: Le résultat de la méthode.
+    """
+    if isinstance(cache, IN_PROCESS_BACKENDS):
+        return getattr(cache, method)(*args, **kwargs)
+    return await getattr(cache, f'a{method}')(*args, **kwargs)
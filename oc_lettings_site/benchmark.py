@@ -0,0 +1,348 @@
+"""
+Outils de mesure de performance pour les commandes de benchmark.
+
+Deux modes de mesure sont proposés :
+
+- dans le processus, avec le client de test Django (:func:`measure_client`) :
+  latence de la vue et nombre de requêtes SQL, sans réseau ;
+- contre un vrai serveur lancé par ``serve.sh``, exactement comme en
+  production, et soumis à une charge en boucle fermée (:func:`run_load`) :
+  chaque client virtuel (un thread, avec sa propre connexion keep-alive)
+  enchaîne les requêtes pendant une durée donnée.
+
+:func:`compare` confronte un rapport à une référence enregistrée et liste les
+régressions au-delà des seuils tolérés.
+"""
+import http.client
+import math
+import os
+import signal
+import socket
+import subprocess
+import threading
+import time
+from contextlib import ExitStack, contextmanager
+
+from django.conf import settings
+from django.db import connections
+from django.test.utils import override_settings
+
+
+def free_port():
+    """Renvoie un port TCP local libre."""
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def start_server(mode, port, workers, env=None):
+    """
+    Lance ``serve.sh`` dans le mode demandé.
+
+    Args:
+        mode (str): ``'wsgi'`` ou ``'asgi'``.
+        port (int): Port d'écoute.
+        workers (int | None): Nombre de workers gunicorn (``None`` : celui
+            calculé par ``gunicorn.conf.py``).
+        env (dict | None): Variables d'environnement supplémentaires.
+
+    Returns:
+        subprocess.Popen: Le processus maître gunicorn.
+    """
+    server_env = dict(os.environ)
+    server_env.update({
+        'SERVER_MODE': mode,
+        'PORT': str(port),
+        'ALLOWED_HOSTS': '127.0.0.1,localhost',
+        'DEBUG': 'False',
+        # Toute la charge vient d'une seule adresse
+        'RATE_LIMIT_REQUESTS': '0',
+    })
+    if workers is not None:
+        server_env['WEB_CONCURRENCY'] = str(workers)
+    else:
+        server_env.pop('WEB_CONCURRENCY', None)
+    server_env.update(env or {})
+    return subprocess.Popen(
+        [str(settings.BASE_DIR / 'serve.sh')],
+        cwd=settings.BASE_DIR,
+        env=server_env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+        start_new_session=True,
+    )
+
+
+def stop_server(process):
+    """Arrête le serveur et ses workers."""
+    if process.poll() is None:
+        os.killpg(process.pid, signal.SIGTERM)
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            os.killpg(process.pid, signal.SIGKILL)
+            process.wait()
+
+
+def wait_ready(process, port, path='/', timeout=30.0, interval=0.2):
+    """
+    Attend que le serveur lancé par :func:`start_server` réponde sur ``path``,
+    en l'interrogeant toutes les ``interval`` secondes.
+
+    Raises:
+        RuntimeError: Si le serveur s'arrête ou ne répond pas avant ``timeout`` secondes.
+    """
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if process.poll() is not None:
+            raise RuntimeError(f"Le serveur s'est arrêté (code {process.returncode}).")
+        try:
+            connection = http.client.HTTPConnection('127.0.0.1', port, timeout=1)
+            connection.request('GET', path)
+            connection.getresponse().read()
+            connection.close()
+            return
+        except OSError:
+            time.sleep(interval)
+    raise RuntimeError(f"Le serveur du port {port} n'a pas répondu en {timeout:.0f} s.")
+
+
+def child_pids(pid):
+    """Renvoie les processus enfants directs d'un processus (Linux, ``/proc``)."""
+    children = []
+    for entry in os.scandir('/proc'):
+        if not entry.name.isdigit():
+            continue
+        try:
+            with open(f'/proc/{entry.name}/stat', encoding='ascii', errors='replace') as file:
+                # Le nom du processus, entre parenthèses, peut contenir des espaces
+                fields = file.read().rsplit(')', 1)[1].split()
+        except OSError:
+            continue
+        if int(fields[1]) == pid:
+            children.append(int(entry.name))
+    return sorted(children)
+
+
+def process_memory(pid):
+    """
+    Renvoie la mémoire d'un processus (Linux, ``/proc``), en mégaoctets.
+
+    La RSS compte en entier les pages partagées avec d'autres processus ; la
+    PSS ne compte que sa part de chacune, et se somme donc sur les processus
+    d'un serveur.
+
+    Returns:
+        dict: ``{'rss_mb', 'pss_mb'}`` (``None`` si la valeur est indisponible).
+    """
+    memory = {'rss_mb': None, 'pss_mb': None}
+    for path, field, key in ((f'/proc/{pid}/status', 'VmRSS:', 'rss_mb'),
+                             (f'/proc/{pid}/smaps_rollup', 'Pss:', 'pss_mb')):
+        try:
+            with open(path, encoding='ascii') as file:
+                for line in file:
+                    if line.startswith(field):
+                        memory[key] = int(line.split()[1]) / 1024
+                        break
+        except OSError:
+            pass
+    return memory
+
+
+def percentile(values, rank):
+    """
+    Renvoie le percentile ``rank`` (0-100) d'une liste triée, par rang le plus proche.
+    """
+    if not values:
+        return 0.0
+    index = max(0, math.ceil(rank / 100 * len(values)) - 1)
+    return values[index]
+
+
+def summarize(latencies, errors, elapsed):
+    """
+    Résume une série de mesures.
+
+    Args:
+        latencies (list[float]): Latences des requêtes réussies, en secondes.
+        errors (int): Nombre de requêtes en erreur.
+        elapsed (float): Durée de la mesure, en secondes.
+
+    Returns:
+        dict: ``requests``, ``errors``, ``rps`` et percentiles en millisecondes.
+    """
+    latencies = sorted(latencies)
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'rps': len(latencies) / elapsed if elapsed else 0.0,
+        'p50_ms': percentile(latencies, 50) * 1000,
+        'p95_ms': percentile(latencies, 95) * 1000,
+        'p99_ms': percentile(latencies, 99) * 1000,
+    }
+
+
+def run_load(port, paths, concurrency, duration):
+    """
+    Soumet le serveur à une charge en boucle fermée.
+
+    Args:
+        port (int): Port du serveur.
+        paths (list[str]): Chemins demandés à tour de rôle.
+        concurrency (int): Nombre de clients simultanés.
+        duration (float): Durée de la mesure, en secondes.
+
+    Returns:
+        dict: Le résumé produit par :func:`summarize`.
+    """
+    deadline = time.monotonic() + duration
+    results = []
+    lock = threading.Lock()
+
+    def client(offset):
+        latencies, errors = [], 0
+        connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+        position = offset
+        while time.monotonic() < deadline:
+            path = paths[position % len(paths)]
+            position += 1
+            start = time.perf_counter()
+            try:
+                connection.request('GET', path)
+                response = connection.getresponse()
+                response.read()
+            except (OSError, http.client.HTTPException):
+                errors += 1
+                connection.close()
+                connection = http.client.HTTPConnection('127.0.0.1', port, timeout=30)
+                continue
+            if response.status >= 400:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+        connection.close()
+        with lock:
+            results.append((latencies, errors))
+
+    start = time.monotonic()
+    threads = [threading.Thread(target=client, args=(i,)) for i in range(concurrency)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    elapsed = time.monotonic() - start
+    latencies = [latency for series, _ in results for latency in series]
+    return summarize(latencies, sum(errors for _, errors in results), elapsed)
+
+
+@contextmanager
+def count_queries():
+    """
+    Compte les requêtes SQL émises sur toutes les connexions.
+
+    Yields:
+        list: Liste dont la longueur est le nombre de requêtes émises.
+    """
+    queries = []
+
+    def wrapper(execute, sql, params, many, context):
+        queries.append(sql)
+        return execute(sql, params, many, context)
+
+    with ExitStack() as stack:
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(wrapper))
+        yield queries
+
+
+def dummy_caches():
+    """Renvoie une configuration ``CACHES`` qui désactive tous les caches."""
+    return {
+        alias: {'BACKEND': 'django.core.cache.backends.dummy.DummyCache'}
+        for alias in settings.CACHES
+    }
+
+
+def query_count(client, path, data):
+    """
+    Renvoie le nombre de requêtes SQL d'une route, caches désactivés.
+
+    Raises:
+        RuntimeError: Si la route répond par une erreur.
+    """
+    with override_settings(CACHES=dummy_caches()), count_queries() as queries:
+        response = client.get(path, data)
+    if response.status_code >= 400:
+        raise RuntimeError(f"{path} a répondu {response.status_code}")
+    return len(queries)
+
+
+def measure_client(client, path, data, requests):
+    """
+    Mesure une route avec le client de test Django, requête après requête.
+
+    Args:
+        client (Client): Le client de test.
+        path (str): Chemin de la route.
+        data (dict): Paramètres de requête.
+        requests (int): Nombre de requêtes mesurées.
+
+    Returns:
+        dict: Le résumé produit par :func:`summarize`.
+
+    Raises:
+        RuntimeError: Si la route répond par une erreur.
+    """
+    latencies = []
+    start = time.perf_counter()
+    for _ in range(requests):
+        request_start = time.perf_counter()
+        response = client.get(path, data)
+        latencies.append(time.perf_counter() - request_start)
+        if response.status_code >= 400:
+            raise RuntimeError(f"{path} a répondu {response.status_code}")
+    return summarize(latencies, 0, time.perf_counter() - start)
+
+
+def compare(report, baseline, max_latency_increase, max_throughput_drop,
+            max_query_increase, latency_floor_ms=1.0):
+    """
+    Compare un rapport de benchmark à une référence.
+
+    Seules les routes et les modes de mesure présents dans les deux rapports
+    sont comparés. Une hausse de latence n'est une régression que si elle
+    dépasse aussi ``latency_floor_ms``, pour ignorer le bruit des routes très
+    rapides.
+
+    Args:
+        report (dict): Le rapport mesuré.
+        baseline (dict): Le rapport de référence.
+        max_latency_increase (float): Hausse tolérée de p95 et p99, en %.
+        max_throughput_drop (float): Baisse tolérée du débit, en %.
+        max_query_increase (int): Requêtes SQL supplémentaires tolérées par vue.
+        latency_floor_ms (float): Hausse de latence ignorée en dessous de ce seuil.
+
+    Returns:
+        list[str]: Les régressions constatées, vide si aucune.
+    """
+    regressions = []
+    for name, phases in report['routes'].items():
+        reference_phases = baseline.get('routes', {}).get(name, {})
+        for phase, result in phases.items():
+            reference = reference_phases.get(phase)
+            if not isinstance(result, dict) or not isinstance(reference, dict):
+                continue
+            label = f"{name} [{phase}]"
+            for metric in ('p95_ms', 'p99_ms'):
+                before, after = reference[metric], result[metric]
+                if (after > before * (1 + max_latency_increase / 100)
+                        and after - before > latency_floor_ms):
+                    regressions.append(f"{label} {metric} : {before:.1f} -> {after:.1f}")
+            if result['rps'] < reference['rps'] * (1 - max_throughput_drop / 100):
+                regressions.append(
+                    f"{label} req/s : {reference['rps']:.0f} -> {result['rps']:.0f}"
+                )
+        before, after = reference_phases.get('queries'), phases.get('queries')
+        if before is not None and after is not None and after > before + max_query_increase:
+            regressions.append(f"{name} requêtes SQL : {before} -> {after}")
+    return regressions
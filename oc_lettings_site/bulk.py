@@ -0,0 +1,341 @@
+"""
+Outils communs aux commandes d'import/export en masse.
+
+Les lignes sont lues et écrites en flux (CSV ou JSON Lines) par des
+générateurs, puis regroupées en lots de taille fixe : la mémoire utilisée ne
+dépend que de la taille d'un lot, jamais de celle du fichier. Chaque lot est
+écrit par ``bulk_create`` dans sa propre transaction.
+
+Les applications fournissent leurs fonctions de construction et d'écriture
+des objets (voir ``lettings.bulk`` et ``profiles.bulk``) et déclarent leurs
+commandes en héritant de :class:`ImportCommand` et :class:`ExportCommand`.
+Les vues d'export diffusé encodent leurs lots par :class:`ChunkEncoder`.
+
+Les modifications en masse parcourent les lignes visées par lots de clés
+primaires (:func:`pk_batches`) et les modifient par ``update()`` ou
+``DELETE`` ensemblistes, lot par lot.
+"""
+import csv
+import io
+import json
+import sys
+import time
+import zlib
+from itertools import islice
+
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.db import IntegrityError, transaction
+
+FORMATS = ('csv', 'jsonl')
+
+
+def detect_format(path, fmt=None):
+    """
+    Détermine le format d'un fichier d'après l'option ``--format`` ou son extension.
+
+    Args:
+        path (str): Chemin du fichier, ou ``-`` pour l'entrée/sortie standard.
+        fmt (str | None): Format imposé.
+
+    Returns:
+        str: ``'csv'`` ou ``'jsonl'``.
+    """
+    if fmt:
+        return fmt
+    if path.endswith(('.jsonl', '.ndjson')):
+        return 'jsonl'
+    if path.endswith('.csv'):
+        return 'csv'
+    raise CommandError(f"Format de {path} inconnu : utiliser --format {{{','.join(FORMATS)}}}.")
+
+
+class InvalidRow(str):
+    """Ligne illisible, remplacée par la raison de son rejet."""
+
+
+def read_rows(stream, fmt):
+    """
+    Lit les lignes d'un flux CSV (avec en-tête) ou JSON Lines.
+
+    Une ligne JSON malformée, ou qui n'est pas un objet, est remplacée par une
+    :class:`InvalidRow` : la lecture continue et l'appelant décide de
+    l'ignorer ou d'interrompre l'import.
+
+    Yields:
+        tuple: ``(numéro de ligne, dict des valeurs ou InvalidRow)``.
+    """
+    if fmt == 'csv':
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for line_number, line in enumerate(stream, start=1):
+        line = line.strip()
+        if not line:
+            continue
+        try:
+            row = json.loads(line)
+        except json.JSONDecodeError as error:
+            row = InvalidRow(f"JSON invalide ({error.msg}, colonne {error.colno})")
+        else:
+            if not isinstance(row, dict):
+                row = InvalidRow("un objet JSON est attendu")
+        yield line_number, row
+
+
+def batched(iterable, size):
+    """
+    Regroupe un itérable en listes d'au plus ``size`` éléments.
+
+    Yields:
+        list: Le lot suivant.
+    """
+    iterator = iter(iterable)
+    while True:
+        batch = list(islice(iterator, size))
+        if not batch:
+            return
+        yield batch
+
+
+def pk_batches(queryset, size):
+    """
+    Parcourt les clés primaires d'une requête par lots, dans l'ordre croissant.
+
+    Chaque lot est lu par curseur (``pk > dernière clé``) : une ligne que le
+    lot précédent a modifiée au point de ne plus correspondre au filtre ne
+    décale pas les suivants.
+
+    Yields:
+        list: Au plus ``size`` clés primaires.
+    """
+    queryset = queryset.order_by('pk').values_list('pk', flat=True)
+    last = None
+    while True:
+        page = queryset if last is None else queryset.filter(pk__gt=last)
+        ids = list(page[:size])
+        if not ids:
+            return
+        yield ids
+        last = ids[-1]
+
+
+class RowWriter:
+    """
+    Écrit des lignes (tuples de valeurs) au format CSV ou JSON Lines.
+
+    Args:
+        stream: Flux texte de destination.
+        fields (tuple[str]): Noms des colonnes, dans l'ordre des valeurs.
+        fmt (str): ``'csv'`` ou ``'jsonl'``.
+    """
+
+    def __init__(self, stream, fields, fmt):
+        self.stream = stream
+        self.fields = fields
+        self.fmt = fmt
+        self._csv = csv.writer(stream) if fmt == 'csv' else None
+
+    def header(self):
+        """Écrit l'en-tête CSV (rien en JSON Lines)."""
+        if self._csv:
+            self._csv.writerow(self.fields)
+
+    def write(self, values):
+        """Écrit une ligne."""
+        if self._csv:
+            self._csv.writerow(values)
+        else:
+            self.stream.write(
+                json.dumps(dict(zip(self.fields, values)), separators=(',', ':')) + '\n'
+            )
+
+
+class ChunkEncoder:
+    """
+    Encode des lots de lignes en morceaux d'octets CSV ou JSON Lines, pour
+    une réponse diffusée, compressés au fil de l'eau par gzip si demandé.
+
+    Args:
+        fields (tuple[str]): Noms des colonnes, dans l'ordre des valeurs.
+        fmt (str): ``'csv'`` ou ``'jsonl'``.
+        compress (bool): Produit un flux gzip.
+    """
+
+    def __init__(self, fields, fmt, compress=False):
+        self._buffer = io.StringIO()
+        self._writer = RowWriter(self._buffer, fields, fmt)
+        # wbits=31 : flux zlib avec en-tête et pied gzip
+        self._compressor = zlib.compressobj(wbits=31) if compress else None
+
+    def _drain(self):
+        data = self._buffer.getvalue().encode()
+        self._buffer.seek(0)
+        self._buffer.truncate()
+        return self._compressor.compress(data) if self._compressor else data
+
+    def header(self):
+        """Renvoie l'en-tête encodé (vide en JSON Lines)."""
+        self._writer.header()
+        return self._drain()
+
+    def encode(self, rows):
+        """Renvoie un lot de lignes encodé ; peut être vide, gzip retenant des données."""
+        for values in rows:
+            self._writer.write(values)
+        return self._drain()
+
+    def finish(self):
+        """Renvoie la fin du flux (données retenues et pied gzip)."""
+        return self._compressor.flush() if self._compressor else b''
+
+
+def validate(instance, line_number, exclude=None):
+    """
+    Valide les champs d'une instance avec les validateurs du modèle.
+
+    ``clean_fields`` convertit aussi les valeurs lues (chaînes CSV) vers le
+    type Python du champ, sans lancer de requête d'unicité par ligne.
+
+    Raises:
+        ValidationError: Avec le numéro de ligne en préfixe des messages.
+    """
+    try:
+        instance.clean_fields(exclude=exclude)
+    except ValidationError as error:
+        details = '; '.join(f"{field}: {' '.join(messages)}"
+                            for field, messages in error.message_dict.items())
+        raise ValidationError(f"ligne {line_number} : {details}")
+
+
+class Throughput:
+    """Mesure le nombre de lignes traitées et leur débit."""
+
+    def __init__(self):
+        self.count = 0
+        self.start = time.perf_counter()
+
+    def add(self, count):
+        self.count += count
+
+    @property
+    def elapsed(self):
+        return time.perf_counter() - self.start
+
+    def __str__(self):
+        elapsed = self.elapsed
+        rate = self.count / elapsed if elapsed else 0.0
+        return f"{self.count} lignes en {elapsed:.2f} s ({rate:,.0f} lignes/s)"
+
+
+class ImportCommand(BaseCommand):
+    """
+    Commande de base d'import en masse.
+
+    Les sous-classes définissent, sous forme de ``staticmethod`` :
+        build : ``build(line_number, row)`` renvoie les objets validés d'une
+            ligne, ou lève ``ValidationError``.
+        write : ``write(objets)`` écrit un lot par ``bulk_create``.
+        after_import (optionnelle) : appelée une fois l'import terminé, ou
+            interrompu après l'écriture de lots.
+    """
+
+    build = None
+    write = None
+    after_import = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier CSV ou JSON Lines à importer, ou - (stdin).")
+        parser.add_argument('--format', choices=FORMATS, help="Format du fichier.")
+        parser.add_argument(
+            '--batch-size', type=int, default=1000, help="Lignes écrites par transaction."
+        )
+        parser.add_argument(
+            '--skip-invalid', action='store_true',
+            help="Ignore les lignes invalides au lieu d'interrompre l'import.",
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(path, options['format'] or ('csv' if path == '-' else None))
+        if path == '-':
+            self._import(sys.stdin, fmt, options)
+        else:
+            with open(path, newline='', encoding='utf-8') as stream:
+                self._import(stream, fmt, options)
+
+    def _valid_objects(self, rows, options):
+        """Construit et valide les objets de chaque ligne, en flux."""
+        for line_number, row in rows:
+            try:
+                if isinstance(row, InvalidRow):
+                    raise ValidationError(f"ligne {line_number} : {row}")
+                yield self.build(line_number, row)
+            except ValidationError as error:
+                if not options['skip_invalid']:
+                    raise CommandError(f"Import interrompu, {' '.join(error.messages)}")
+                self.skipped += 1
+                self.stderr.write(f"Ignorée, {' '.join(error.messages)}")
+
+    def _import(self, stream, fmt, options):
+        self.skipped = 0
+        throughput = Throughput()
+        objects = self._valid_objects(read_rows(stream, fmt), options)
+        try:
+            for batch in batched(objects, options['batch_size']):
+                try:
+                    with transaction.atomic():
+                        self.write(batch)
+                except IntegrityError as error:
+                    raise CommandError(
+                        f"Lot rejeté après {throughput.count} lignes importées : {error}"
+                    )
+                throughput.add(len(batch))
+                if options['verbosity'] >= 2:
+                    self.stdout.write(f"... {throughput}")
+        finally:
+            # Les lots déjà validés restent en base, même si l'import est interrompu
+            if self.after_import:
+                self.after_import()
+        self.stdout.write(self.style.SUCCESS(f"Importé : {throughput}, {self.skipped} ignorées."))
+
+
+class ExportCommand(BaseCommand):
+    """
+    Commande de base d'export en masse.
+
+    Les sous-classes définissent :
+        fields (tuple[str]) : noms des colonnes exportées.
+        rows (staticmethod) : ``rows(chunk_size)`` renvoie un itérateur de tuples.
+    """
+
+    fields = ()
+    rows = None
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help="Fichier CSV ou JSON Lines à écrire, ou - (stdout).")
+        parser.add_argument('--format', choices=FORMATS, help="Format du fichier.")
+        parser.add_argument(
+            '--batch-size', type=int, default=2000, help="Lignes lues par aller-retour en base."
+        )
+
+    def handle(self, *args, **options):
+        path = options['path']
+        fmt = detect_format(path, options['format'] or ('csv' if path == '-' else None))
+        if path == '-':
+            throughput = self._export(sys.stdout, fmt, options)
+        else:
+            with open(path, 'w', newline='', encoding='utf-8') as stream:
+                throughput = self._export(stream, fmt, options)
+        self.stderr.write(f"Exporté : {throughput}")
+
+    def _export(self, stream, fmt, options):
+        throughput = Throughput()
+        writer = RowWriter(stream, self.fields, fmt)
+        writer.header()
+        for values in self.rows(options['batch_size']):
+            writer.write(values)
+            throughput.add(1)
+        stream.flush()
+        return throughput
@@ -0,0 +1,131 @@
+"""
+Configuration des bases de données à partir d'URLs (``DATABASE_URL``).
+
+:func:`parse_database_url` traduit une URL ``sqlite:///chemin`` ou
+``postgres://utilisateur:mot-de-passe@hôte:port/base?sslmode=require`` en
+entrée de ``DATABASES`` ; :func:`database_settings` y ajoute les réglages du
+projet propres à chaque moteur :
+
+- SQLite : pragmas appliqués à l'ouverture de chaque connexion (voir
+  ``SQLITE_PRAGMAS``) et connexions persistantes ;
+- PostgreSQL : pool de connexions natif de Django (psycopg 3), ou connexions
+  persistantes si le pool est désactivé.
+
+Une base en lecture seule (réplica) est ouverte en ``mode=ro`` sous SQLite et
+en transactions en lecture seule sous PostgreSQL. En test, elle se confond
+avec ``default`` (``TEST['MIRROR']``).
+
+Ce module est importé par ``settings.py`` : il ne dépend pas des réglages
+Django.
+"""
+from urllib.parse import parse_qsl, unquote, urlsplit
+
+from django.core.exceptions import ImproperlyConfigured
+
+SQLITE_ENGINE = 'django.db.backends.sqlite3'
+POSTGRESQL_ENGINE = 'django.db.backends.postgresql'
+
+ENGINES = {
+    'sqlite': SQLITE_ENGINE,
+    'postgres': POSTGRESQL_ENGINE,
+    'postgresql': POSTGRESQL_ENGINE,
+    'postgresql+psycopg': POSTGRESQL_ENGINE,
+    'pgsql': POSTGRESQL_ENGINE,
+}
+
+
+def sqlite_init_command(pragmas):
+    """Construit l'init_command SQLite appliquant une liste de pragmas."""
+    return ';'.join(f'PRAGMA {name}={value}' for name, value in pragmas.items())
+
+
+def parse_database_url(url):
+    """
+    Traduit une URL de base de données en entrée de ``DATABASES``.
+
+    Les paramètres de la chaîne de requête sont passés tels quels dans
+    ``OPTIONS`` (par exemple ``sslmode`` pour PostgreSQL).
+
+    Args:
+        url (str): ``sqlite:///chemin/relatif``, ``sqlite:////chemin/absolu``,
+            ``sqlite://:memory:`` ou ``postgres://...``.
+
+    Returns:
+        dict: ``ENGINE``, ``NAME``, ``USER``, ``PASSWORD``, ``HOST``,
+        ``PORT`` et ``OPTIONS``.
+
+    Raises:
+        ImproperlyConfigured: Si le schéma n'est pas pris en charge.
+    """
+    parts = urlsplit(url)
+    engine = ENGINES.get(parts.scheme)
+    if engine is None:
+        raise ImproperlyConfigured(f"Schéma de base de données non pris en charge : {url!r}")
+    options = dict(parse_qsl(parts.query))
+
+    if engine == SQLITE_ENGINE:
+        name = unquote(parts.netloc or parts.path[1:])
+        return {'ENGINE': engine, 'NAME': name, 'OPTIONS': options}
+
+    return {
+        'ENGINE': engine,
+        'NAME': unquote(parts.path.lstrip('/')),
+        'USER': unquote(parts.username or ''),
+        'PASSWORD': unquote(parts.password or ''),
+        'HOST': parts.hostname or '',
+        'PORT': str(parts.port or ''),
+        'OPTIONS': options,
+    }
+
+
+def database_settings(url, *, conn_max_age=0, pool=None, sqlite_pragmas=None,
+                      read_only=False):
+    """
+    Renvoie l'entrée de ``DATABASES`` d'une URL, avec les réglages du projet.
+
+    Args:
+        url (str): URL de la base (voir :func:`parse_database_url`).
+        conn_max_age (int): Durée de vie des connexions persistantes, en
+            secondes, hors pool.
+        pool (dict | None): Paramètres du pool psycopg (``min_size``,
+            ``max_size``, ``timeout``) ; ``None`` pour s'en passer. Ignoré
+            sous SQLite.
+        sqlite_pragmas (dict | None): Pragmas appliqués à chaque connexion
+            SQLite.
+        read_only (bool): Ouvre la base en lecture seule, en miroir de
+            ``default`` pendant les tests.
+
+    Returns:
+        dict: L'entrée de ``DATABASES``.
+    """
+    config = parse_database_url(url)
+    config['CONN_HEALTH_CHECKS'] = True
+    config['CONN_MAX_AGE'] = conn_max_age
+    options = config['OPTIONS']
+
+    if config['ENGINE'] == SQLITE_ENGINE:
+        pragmas = dict(sqlite_pragmas or {})
+        if read_only:
+            # Le mode de journal appartient au fichier : pas de changement
+            # possible depuis une connexion en lecture seule
+            pragmas.pop('journal_mode', None)
+            pragmas.pop('synchronous', None)
+            pragmas['query_only'] = 1
+            config['NAME'] = f"file:{config['NAME']}?mode=ro"
+        else:
+            # Prend le verrou d'écriture dès BEGIN : pas d'échec de promotion
+            # d'un verrou de lecture en verrou d'écriture
+            options.setdefault('transaction_mode', 'IMMEDIATE')
+        if pragmas:
+            options.setdefault('init_command', sqlite_init_command(pragmas))
+    else:
+        if pool:
+            # Le pool remplace les connexions persistantes, incompatibles
+            options['pool'] = dict(pool)
+            config['CONN_MAX_AGE'] = 0
+        if read_only:
+            options.setdefault('options', '-c default_transaction_read_only=on')
+
+    if read_only:
+        config['TEST'] = {'MIRROR': 'default'}
+    return config
@@ -0,0 +1,82 @@
+"""
+Routage des lectures des vues publiques vers une base de lecture.
+
+Les vues décorées par :func:`use_read_database` s'exécutent avec un alias de
+lecture, choisi parmi ``READ_DATABASE_ALIASES`` et gardé dans une variable de
+contexte pour toute la durée de la vue (y compris dans le pool de threads des
+vues asynchrones). :class:`ReadDatabaseRouter` y envoie alors les lectures ;
+les écritures, et les lectures hors de ces vues (administration, sessions,
+authentification), restent sur ``default``.
+
+Les alias de lecture sont les réplicas de ``DATABASE_REPLICA_URLS`` et,
+sous SQLite, la connexion en lecture seule de ``SQLITE_READ_ONLY`` (voir
+:mod:`oc_lettings_site.db_config`). Une vue lit sur un seul alias, tiré au
+hasard, ce qui répartit la charge entre les réplicas sans mélanger deux
+états de réplication dans une même page. Sans alias de lecture configuré,
+le décorateur n'a aucun effet.
+"""
+import random
+from contextvars import ContextVar
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+
+_read_alias = ContextVar('read_database_alias', default=None)
+
+
+def _choose_alias():
+    """Choisit l'alias de lecture d'une vue, ou ``None`` s'il n'y en a pas."""
+    aliases = settings.READ_DATABASE_ALIASES
+    return random.choice(aliases) if aliases else None
+
+
+def use_read_database(view):
+    """
+    Décorateur de vue : les lectures de la vue passent par un alias de lecture.
+
+    Args:
+        view (callable): Vue synchrone ou asynchrone.
+
+    Returns:
+        callable: La vue décorée.
+    """
+    if iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            token = _read_alias.set(_choose_alias())
+            try:
+                return await view(request, *args, **kwargs)
+            finally:
+                _read_alias.reset(token)
+
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        token = _read_alias.set(_choose_alias())
+        try:
+            return view(request, *args, **kwargs)
+        finally:
+            _read_alias.reset(token)
+
+    return wrapper
+
+
+class ReadDatabaseRouter:
+    """Routeur qui envoie les lectures des vues publiques vers leur alias."""
+
+    def db_for_read(self, model, **hints):
+        return _read_alias.get()
+
+    def db_for_write(self, model, **hints):
+        return None
+
+    def allow_relation(self, obj1, obj2, **hints):
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Les alias de lecture partagent le schéma de « default »
+        if db in settings.READ_DATABASE_ALIASES:
+            return False
+        return None
@@ -0,0 +1,180 @@
+import json
+import os
+import platform
+from urllib.parse import urlencode
+
+import django
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import override_settings
+
+from lettings.models import Letting
+from oc_lettings_site import benchmark
+from oc_lettings_site.routes import iter_route_urls, make_client
+from profiles.models import Profile
+
+SERVER_MODES = ('wsgi', 'asgi')
+
+
+class Command(BaseCommand):
+    """
+    Commande qui mesure les performances de chaque route publique.
+
+    Chaque route de ``urlpatterns`` (hors administration) est mesurée :
+
+    - avec le client de test Django, requête après requête (``client``) ;
+    - contre un serveur gunicorn lancé par ``serve.sh`` dans chaque mode de
+      ``--servers``, sous ``--concurrency`` clients simultanés.
+
+    Le rapport JSON donne, par route, le débit, les latences p50/p95/p99 de
+    chaque mode et le nombre de requêtes SQL de la vue (caches désactivés).
+    Avec ``--baseline``, il est comparé à une référence et la commande échoue
+    si un seuil est dépassé ; ``--save-baseline`` enregistre la référence.
+
+    La base mesurée est celle de ``SQLITE_PATH`` (voir ``seed_benchmark_data``).
+
+    Usage :
+        python manage.py benchmark [--servers wsgi asgi] [--requests 200]
+            [--concurrency 32] [--duration 5] [--output rapport.json]
+            [--baseline reference.json [--save-baseline]]
+    """
+
+    help = "Mesure débit, latences et requêtes SQL de chaque route publique."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--servers', nargs='*', choices=SERVER_MODES,
+                            default=list(SERVER_MODES),
+                            help="Modes de serveur mesurés (aucun : client de test seul).")
+        parser.add_argument('--requests', type=int, default=200,
+                            help="Requêtes par route avec le client de test.")
+        parser.add_argument('--concurrency', type=int, default=32,
+                            help="Clients simultanés contre le serveur.")
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help="Durée de mesure par route et par serveur, en secondes.")
+        parser.add_argument('--workers', type=int, default=3, help="Workers gunicorn.")
+        parser.add_argument('--no-cache', action='store_true',
+                            help="Désactive les caches de pages et d'objets.")
+        parser.add_argument('--output', default='benchmark-report.json',
+                            help="Fichier du rapport JSON.")
+        parser.add_argument('--baseline', help="Rapport de référence à comparer.")
+        parser.add_argument('--save-baseline', action='store_true',
+                            help="Enregistre le rapport comme référence au lieu de comparer.")
+        parser.add_argument('--max-latency-increase', type=float, default=25.0,
+                            help="Hausse tolérée de p95/p99, en %%.")
+        parser.add_argument('--max-throughput-drop', type=float, default=25.0,
+                            help="Baisse tolérée du débit, en %%.")
+        parser.add_argument('--max-query-increase', type=int, default=0,
+                            help="Requêtes SQL supplémentaires tolérées par vue.")
+
+    def handle(self, *args, **options):
+        if options['save_baseline'] and not options['baseline']:
+            raise CommandError("--save-baseline nécessite --baseline.")
+        routes = []
+        for name, path, data, missing in iter_route_urls():
+            if missing:
+                self.stderr.write(f"{name}: ignorée, pas de donnée pour {missing}")
+            else:
+                routes.append((name, path, data))
+
+        report = {'meta': self._meta(options), 'routes': {}}
+        client_settings = {'RATE_LIMIT_REQUESTS': 0}
+        if options['no_cache']:
+            client_settings['CACHES'] = benchmark.dummy_caches()
+        client = make_client()
+        with override_settings(**client_settings):
+            for name, path, data in routes:
+                url = f"{path}?{urlencode(data)}" if data else path
+                try:
+                    queries = benchmark.query_count(client, path, data)
+                    client.get(path, data)
+                    measured = benchmark.measure_client(client, path, data, options['requests'])
+                except RuntimeError as error:
+                    raise CommandError(f"{name}: {error}")
+                report['routes'][name] = {'url': url, 'queries': queries, 'client': measured}
+
+        for mode in options['servers']:
+            self._measure_server(mode, report, options)
+
+        for name, result in report['routes'].items():
+            self.stdout.write(self._format(name, result, ['client', *options['servers']]))
+        with open(options['output'], 'w', encoding='utf-8') as stream:
+            json.dump(report, stream, indent=2)
+        self.stdout.write(f"Rapport écrit dans {options['output']}")
+
+        if options['baseline']:
+            self._check_baseline(report, options)
+
+    def _meta(self, options):
+        return {
+            'lettings': Letting.objects.count(),
+            'profiles': Profile.objects.count(),
+            'database': str(connection.settings_dict['NAME']),
+            'release': os.getenv('GITHUB_SHA', 'local-dev'),
+            'python': platform.python_version(),
+            'django': django.get_version(),
+            'cache': not options['no_cache'],
+            'requests': options['requests'],
+            'concurrency': options['concurrency'],
+            'duration': options['duration'],
+            'workers': options['workers'],
+        }
+
+    def _measure_server(self, mode, report, options):
+        """Lance le serveur dans un mode et y mesure chaque route."""
+        env = {}
+        if options['no_cache']:
+            env['CACHE_BACKEND'] = 'django.core.cache.backends.dummy.DummyCache'
+        port = benchmark.free_port()
+        process = benchmark.start_server(mode, port, options['workers'], env)
+        try:
+            benchmark.wait_ready(process, port)
+            for result in report['routes'].values():
+                paths = [result['url']]
+                benchmark.run_load(port, paths, options['concurrency'], 0.5)
+                result[mode] = benchmark.run_load(
+                    port, paths, options['concurrency'], options['duration']
+                )
+        except RuntimeError as error:
+            raise CommandError(f"{mode}: {error}")
+        finally:
+            benchmark.stop_server(process)
+
+    def _check_baseline(self, report, options):
+        """Enregistre la référence, ou compare le rapport à celle-ci."""
+        if options['save_baseline']:
+            with open(options['baseline'], 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, indent=2)
+            self.stdout.write(f"Référence enregistrée dans {options['baseline']}")
+            return
+        try:
+            with open(options['baseline'], encoding='utf-8') as stream:
+                baseline = json.load(stream)
+        except FileNotFoundError:
+            raise CommandError(f"Référence introuvable : {options['baseline']}")
+        for key in ('lettings', 'profiles', 'cache'):
+            if baseline['meta'].get(key) != report['meta'][key]:
+                self.stderr.write(
+                    f"Attention : {key} = {report['meta'][key]}, "
+                    f"{baseline['meta'].get(key)} dans la référence."
+                )
+        regressions = benchmark.compare(
+            report, baseline,
+            options['max_latency_increase'],
+            options['max_throughput_drop'],
+            options['max_query_increase'],
+        )
+        if regressions:
+            raise CommandError("Régressions détectées : " + ', '.join(regressions))
+        self.stdout.write(self.style.SUCCESS("Aucune régression par rapport à la référence."))
+
+    @staticmethod
+    def _format(name, result, phases):
+        parts = [f"{name} ({result['url']}, {result['queries']} requêtes SQL)"]
+        for phase in phases:
+            measured = result.get(phase)
+            if measured:
+                parts.append(
+                    f"  {phase}: {measured['rps']:,.0f} req/s, p50 {measured['p50_ms']:.1f} ms, "
+                    f"p95 {measured['p95_ms']:.1f} ms, p99 {measured['p99_ms']:.1f} ms"
+                )
+        return '\n'.join(parts)
@@ -0,0 +1,171 @@
+import json
+import os
+import re
+import tempfile
+import time
+
+from django.core.cache.backends.dummy import DummyCache
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site import benchmark
+from oc_lettings_site.management.commands.benchmark_servers import benchmark_paths
+from oc_lettings_site.server_config import server_settings
+
+# ``mode``, ``mode:workers`` ou ``mode:workersxthreads`` (``wsgi:2x4``)
+CONFIG_RE = re.compile(r'^(wsgi|asgi)(?::(\d+)(?:x(\d+))?)?$')
+
+
+def parse_config(text):
+    """
+    Lit une configuration de la ligne de commande.
+
+    Returns:
+        dict: ``mode``, ``workers`` et ``threads`` (``None`` : valeur calculée
+        par ``gunicorn.conf.py``).
+
+    Raises:
+        CommandError: Si le texte n'est pas de la forme ``wsgi:3`` ou ``wsgi:2x4``.
+    """
+    match = CONFIG_RE.match(text)
+    if match is None:
+        raise CommandError(
+            f"Configuration invalide : {text!r} (attendu : wsgi, asgi:2, wsgi:2x4...)."
+        )
+    mode, workers, threads = match.groups()
+    return {
+        'mode': mode,
+        'workers': int(workers) if workers else None,
+        'threads': int(threads) if threads else None,
+    }
+
+
+def default_configs():
+    """
+    Renvoie les configurations comparées par défaut : celles calculées pour
+    cette machine en WSGI et en ASGI, puis un seul worker et des workers
+    ``gthread`` de 4 threads.
+    """
+    workers = server_settings({'SERVER_MODE': 'wsgi'})['workers']
+    return ['wsgi', 'wsgi:1', f'wsgi:{max(1, workers // 2)}x4', 'asgi']
+
+
+def read_stats_log(path):
+    """
+    Totalise les résumés écrits par les workers à leur arrêt dans le fichier
+    ``GUNICORN_STATS_LOG``.
+
+    Returns:
+        dict: ``workers`` (résumés lus) et ``requests`` (requêtes servies par
+        chacun).
+    """
+    with open(path, encoding='utf-8') as file:
+        summaries = [json.loads(line) for line in file if line.strip()]
+    return {
+        'workers': len(summaries),
+        'requests': sorted(summary['requests'] for summary in summaries),
+    }
+
+
+def measure_config(config, paths, concurrency, duration, warmup, env):
+    """
+    Lance le serveur dans une configuration, le charge, puis relève sa
+    mémoire et les compteurs de ses workers.
+
+    Returns:
+        dict: Le résumé de :func:`oc_lettings_site.benchmark.run_load`,
+        complété de ``total_pss_mb`` et ``worker_requests``.
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as stats_log:
+        pass
+    server_env = dict(env, GUNICORN_STATS_LOG=stats_log.name,
+                      GUNICORN_THREADS=str(config['threads'] or ''))
+    port = benchmark.free_port()
+    process = benchmark.start_server(config['mode'], port, config['workers'], server_env)
+    try:
+        benchmark.wait_ready(process, port)
+        if warmup:
+            benchmark.run_load(port, paths, concurrency, warmup)
+        result = benchmark.run_load(port, paths, concurrency, duration)
+        pids = [process.pid, *benchmark.child_pids(process.pid)]
+        pss = [benchmark.process_memory(pid)['pss_mb'] for pid in pids]
+        result['total_pss_mb'] = sum(pss) if None not in pss else None
+    finally:
+        benchmark.stop_server(process)
+        # Les workers écrivent leur résumé en s'arrêtant
+        time.sleep(0.2)
+        stats = read_stats_log(stats_log.name)
+        os.unlink(stats_log.name)
+    result['worker_requests'] = stats['requests']
+    return result
+
+
+class Command(BaseCommand):
+    """
+    Commande qui compare des configurations de gunicorn sous charge.
+
+    Chaque configuration (mode, nombre de workers et de threads ; les valeurs
+    omises sont celles calculées par ``gunicorn.conf.py``) est lancée par
+    ``serve.sh`` sur un port libre puis chargée en boucle fermée, comme dans
+    ``benchmark_servers``. Sont relevés le débit, les latences, la PSS totale
+    du serveur et la répartition des requêtes entre workers, lue dans les
+    résumés qu'ils écrivent à leur arrêt.
+
+    Usage :
+        python manage.py benchmark_gunicorn [--configs wsgi wsgi:1 wsgi:2x4 asgi]
+            [--concurrency 50] [--duration 10] [--no-cache] [--json rapport.json]
+    """
+
+    help = "Compare le débit, la latence et la mémoire de configurations de gunicorn."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--configs', nargs='+',
+                            help="Configurations (wsgi, wsgi:3, wsgi:2x4, asgi:1...).")
+        parser.add_argument('--concurrency', type=int, default=50, help="Clients simultanés.")
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help="Durée de mesure par configuration, en secondes.")
+        parser.add_argument('--warmup', type=float, default=2.0,
+                            help="Durée de chauffe non mesurée, en secondes.")
+        parser.add_argument('--samples', type=int, default=20,
+                            help="Locations et profils distincts demandés.")
+        parser.add_argument('--no-cache', action='store_true',
+                            help="Désactive les caches de pages et d'objets du serveur.")
+        parser.add_argument('--json', help="Écrit les résultats dans ce fichier JSON.")
+
+    def handle(self, *args, **options):
+        configs = options['configs'] or default_configs()
+        parsed = [parse_config(config) for config in configs]
+        paths = benchmark_paths(options['samples'])
+        env = {}
+        if options['no_cache']:
+            env['CACHE_BACKEND'] = f'{DummyCache.__module__}.{DummyCache.__name__}'
+
+        results = {}
+        for name, config in zip(configs, parsed):
+            try:
+                results[name] = measure_config(
+                    config, paths, options['concurrency'], options['duration'],
+                    options['warmup'], env,
+                )
+            except RuntimeError as error:
+                raise CommandError(f"{name}: {error}")
+            self.stdout.write(self._format(name, results[name]))
+
+        if options['json']:
+            report = {
+                'concurrency': options['concurrency'],
+                'duration': options['duration'],
+                'cache': not options['no_cache'],
+                'results': results,
+            }
+            with open(options['json'], 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, indent=2)
+
+    @staticmethod
+    def _format(name, result):
+        line = (
+            f"{name}: {result['rps']:,.0f} req/s, p50 {result['p50_ms']:.1f} ms, "
+            f"p99 {result['p99_ms']:.1f} ms, {result['errors']} erreurs"
+        )
+        if result['total_pss_mb'] is not None:
+            line += f", PSS {result['total_pss_mb']:.1f} Mo"
+        return line + f", requêtes par worker {result['worker_requests']}"
@@ -0,0 +1,97 @@
+import json
+
+from django.core.cache.backends.dummy import DummyCache
+from django.core.management.base import BaseCommand, CommandError
+
+from lettings.models import Letting
+from oc_lettings_site import benchmark
+from profiles.models import Profile
+
+MODES = ('wsgi', 'asgi')
+
+
+def benchmark_paths(samples):
+    """
+    Construit la liste des chemins demandés : accueil, listes et pages de
+    détail de ``samples`` locations et profils lus en base.
+    """
+    letting_ids = Letting.objects.order_by('id').values_list('id', flat=True)[:samples]
+    usernames = Profile.objects.order_by('id').values_list('user__username', flat=True)[:samples]
+    paths = ['/', '/lettings/', '/profiles/']
+    paths += [f'/lettings/{letting_id}/' for letting_id in letting_ids]
+    paths += [f'/profiles/{username}/' for username in usernames]
+    return paths
+
+
+class Command(BaseCommand):
+    """
+    Commande qui compare les modes de service WSGI et ASGI sous forte concurrence.
+
+    Chaque mode est lancé par ``serve.sh`` sur un port libre, contre la base
+    SQLite configurée, puis chargé en boucle fermée par ``--concurrency``
+    clients keep-alive. Le client de charge tourne dans ce processus : au-delà
+    de quelques milliers de requêtes par seconde, c'est lui qui plafonne.
+
+    Usage :
+        python manage.py benchmark_servers [--modes wsgi asgi] [--concurrency 100]
+            [--duration 10] [--workers 3] [--no-cache] [--json rapport.json]
+    """
+
+    help = "Compare le débit et la latence p99 des modes WSGI et ASGI."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--modes', nargs='+', choices=MODES, default=list(MODES))
+        parser.add_argument('--concurrency', type=int, default=100,
+                            help="Clients simultanés.")
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help="Durée de mesure par mode, en secondes.")
+        parser.add_argument('--warmup', type=float, default=2.0,
+                            help="Durée de chauffe non mesurée, en secondes.")
+        parser.add_argument('--workers', type=int, default=3, help="Workers gunicorn.")
+        parser.add_argument('--samples', type=int, default=20,
+                            help="Locations et profils distincts demandés.")
+        parser.add_argument('--no-cache', action='store_true',
+                            help="Désactive les caches de pages et d'objets du serveur.")
+        parser.add_argument('--json', help="Écrit les résultats dans ce fichier JSON.")
+
+    def handle(self, *args, **options):
+        paths = benchmark_paths(options['samples'])
+        env = {}
+        if options['no_cache']:
+            env['CACHE_BACKEND'] = f'{DummyCache.__module__}.{DummyCache.__name__}'
+
+        results = {}
+        for mode in options['modes']:
+            port = benchmark.free_port()
+            process = benchmark.start_server(mode, port, options['workers'], env)
+            try:
+                benchmark.wait_ready(process, port)
+                if options['warmup']:
+                    benchmark.run_load(port, paths, options['concurrency'], options['warmup'])
+                results[mode] = benchmark.run_load(
+                    port, paths, options['concurrency'], options['duration']
+                )
+            except RuntimeError as error:
+                raise CommandError(f"{mode}: {error}")
+            finally:
+                benchmark.stop_server(process)
+            self.stdout.write(self._format(mode, results[mode]))
+
+        if options['json']:
+            report = {
+                'concurrency': options['concurrency'],
+                'duration': options['duration'],
+                'workers': options['workers'],
+                'cache': not options['no_cache'],
+                'results': results,
+            }
+            with open(options['json'], 'w', encoding='utf-8') as stream:
+                json.dump(report, stream, indent=2)
+
+    @staticmethod
+    def _format(mode, result):
+        return (
+            f"{mode}: {result['rps']:,.0f} req/s, p50 {result['p50_ms']:.1f} ms, "
+            f"p95 {result['p95_ms']:.1f} ms, p99 {result['p99_ms']:.1f} ms, "
+            f"{result['requests']} requêtes, {result['errors']} erreurs"
+        )
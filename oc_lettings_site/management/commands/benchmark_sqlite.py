@@ -0,0 +1,194 @@
+import json
+import multiprocessing
+import random
+import shutil
+import sqlite3
+import tempfile
+import time
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from lettings.models import Letting, LettingSummary
+from lettings.views import LIST_ROWS
+from oc_lettings_site import benchmark
+
+# Réglages comparés : journal par défaut de SQLite, puis pragmas du projet
+CONFIGURATIONS = {
+    'rollback': {'journal_mode': 'DELETE', 'busy_timeout': 5000},
+    'tuned': None,
+}
+
+
+def _connect(path, pragmas):
+    """Ouvre une connexion au fichier et lui applique des pragmas."""
+    db = sqlite3.connect(path, timeout=0, isolation_level=None)
+    for name, value in pragmas.items():
+        db.execute(f'PRAGMA {name}={value}')
+    return db
+
+
+def _read_statements():
+    """
+    Renvoie le SQL des deux lectures des vues de locations, dans la table des
+    résumés : une page de la liste et le détail d'une location.
+    """
+    page = LIST_ROWS.order_by('id')[:settings.LETTINGS_PAGE_SIZE]
+    detail = LettingSummary.objects.filter(pk=0)
+    page_sql, page_params = page.query.sql_with_params()
+    detail_sql, _ = detail.query.sql_with_params()
+    # Paramètres au format du module sqlite3 (le backend Django convertit %s)
+    return (page_sql.replace('%s', '?'), page_params), detail_sql.replace('%s', '?')
+
+
+def _reader(path, pragmas, statements, ids, deadline, results):
+    """Processus lecteur : enchaîne les lectures jusqu'à l'échéance."""
+    (page_sql, page_params), detail_sql = statements
+    db = _connect(path, pragmas)
+    rng = random.Random()
+    latencies, errors = [], 0
+    while time.monotonic() < deadline:
+        start = time.perf_counter()
+        try:
+            if rng.random() < 0.5:
+                db.execute(page_sql, page_params).fetchall()
+            else:
+                db.execute(detail_sql, (rng.choice(ids),)).fetchall()
+        except sqlite3.OperationalError:
+            errors += 1
+            continue
+        latencies.append(time.perf_counter() - start)
+    db.close()
+    results.put((latencies, errors))
+
+
+def _writer(path, pragmas, ids, interval, deadline, results):
+    """Processus écrivain : renomme une location par transaction."""
+    db = _connect(path, pragmas)
+    rng = random.Random()
+    writes, errors = 0, 0
+    while time.monotonic() < deadline:
+        letting_id = rng.choice(ids)
+        try:
+            db.execute('BEGIN IMMEDIATE')
+            db.execute(
+                'UPDATE lettings_letting SET title = title WHERE id = ?', (letting_id,)
+            )
+            db.execute('COMMIT')
+            writes += 1
+        except sqlite3.OperationalError:
+            if db.in_transaction:
+                db.execute('ROLLBACK')
+            errors += 1
+        time.sleep(interval)
+    db.close()
+    results.put((writes, errors))
+
+
+class Command(BaseCommand):
+    """
+    Commande qui mesure le débit de lecture concurrent de SQLite.
+
+    Des processus lecteurs, comme les workers gunicorn, exécutent les
+    requêtes des vues de locations pendant qu'un processus écrivain modifie
+    des locations en continu. La mesure est faite sur une copie de la base
+    pour chaque configuration :
+
+    - ``rollback`` : journal par défaut de SQLite, où chaque écriture bloque
+      les lectures ;
+    - ``tuned`` : pragmas du projet (``SQLITE_PRAGMAS``) et journal WAL
+      (``SQLITE_JOURNAL_MODE``).
+
+    La base copiée est celle de ``SQLITE_PATH`` (voir ``seed_benchmark_data``).
+
+    Usage :
+        python manage.py benchmark_sqlite [--readers 4] [--duration 5]
+            [--write-interval 0.005] [--json]
+    """
+
+    help = "Compare le débit de lecture concurrent de SQLite avec et sans réglages."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--readers', type=int, default=4,
+                            help="Processus lecteurs simultanés.")
+        parser.add_argument('--duration', type=float, default=5.0,
+                            help="Durée de mesure par configuration, en secondes.")
+        parser.add_argument('--write-interval', type=float, default=0.005,
+                            help="Pause de l'écrivain entre deux écritures, en secondes.")
+        parser.add_argument('--json', action='store_true', help="Sortie au format JSON.")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError("La base par défaut n'est pas une base SQLite.")
+        ids = list(Letting.objects.values_list('id', flat=True)[:10000])
+        if not ids:
+            raise CommandError("Aucune location en base : voir seed_benchmark_data.")
+        statements = _read_statements()
+        source = Path(connection.settings_dict['NAME'])
+        connection.close()
+
+        results = {}
+        with tempfile.TemporaryDirectory() as directory:
+            for name, pragmas in CONFIGURATIONS.items():
+                path = str(Path(directory) / f'{name}.sqlite3')
+                shutil.copyfile(source, path)
+                pragmas = pragmas or {
+                    'journal_mode': settings.SQLITE_JOURNAL_MODE, **settings.SQLITE_PRAGMAS,
+                }
+                # Le mode de journal est enregistré dans le fichier
+                _connect(path, pragmas).close()
+                results[name] = self._measure(path, pragmas, statements, ids, options)
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for name, result in results.items():
+            self.stdout.write(
+                f"{name}: {result['reads_per_second']:,.0f} lectures/s, "
+                f"p50 {result['p50_ms']:.2f} ms, p99 {result['p99_ms']:.2f} ms, "
+                f"{result['read_errors']} lectures en échec, "
+                f"{result['writes']} écritures ({result['write_errors']} en échec)"
+            )
+        baseline = results['rollback']['reads_per_second']
+        if baseline:
+            gain = results['tuned']['reads_per_second'] / baseline
+            self.stdout.write(self.style.SUCCESS(f"Débit de lecture : x{gain:.2f}"))
+
+    def _measure(self, path, pragmas, statements, ids, options):
+        """Lance lecteurs et écrivain sur une copie de la base et agrège leurs mesures."""
+        context = multiprocessing.get_context('fork')
+        results = context.Queue()
+        writer_results = context.Queue()
+        deadline = time.monotonic() + options['duration']
+        processes = [
+            context.Process(
+                target=_reader, args=(path, pragmas, statements, ids, deadline, results)
+            )
+            for _ in range(options['readers'])
+        ]
+        processes.append(context.Process(
+            target=_writer,
+            args=(path, pragmas, ids, options['write_interval'], deadline, writer_results),
+        ))
+        for process in processes:
+            process.start()
+        latencies, read_errors = [], 0
+        for _ in range(options['readers']):
+            reader_latencies, errors = results.get()
+            latencies.extend(reader_latencies)
+            read_errors += errors
+        writes, write_errors = writer_results.get()
+        for process in processes:
+            process.join()
+
+        summary = benchmark.summarize(latencies, read_errors, options['duration'])
+        return {
+            'reads_per_second': summary['rps'],
+            'p50_ms': summary['p50_ms'],
+            'p99_ms': summary['p99_ms'],
+            'read_errors': summary['errors'],
+            'writes': writes,
+            'write_errors': write_errors,
+        }
@@ -0,0 +1,157 @@
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site import benchmark
+
+MODES = ('wsgi', 'asgi')
+
+
+def time_command(args, runs):
+    """
+    Renvoie la durée médiane, en secondes, d'une commande de gestion lancée
+    dans un interpréteur neuf.
+    """
+    durations = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        process = subprocess.run(
+            [sys.executable, 'manage.py', *args],
+            cwd=settings.BASE_DIR, capture_output=True, text=True,
+        )
+        durations.append(time.perf_counter() - start)
+        if process.returncode:
+            raise CommandError(f"manage.py {' '.join(args)} : {process.stderr[-2000:]}")
+    return statistics.median(durations)
+
+
+def read_boot_log(path, workers, timeout=30.0):
+    """
+    Attend que ``workers`` workers aient consigné leur démarrage dans le
+    fichier ``GUNICORN_BOOT_LOG`` et renvoie leurs entrées.
+    """
+    deadline = time.monotonic() + timeout
+    while True:
+        with open(path, encoding='utf-8') as file:
+            entries = [json.loads(line) for line in file if line.strip()]
+        if len(entries) >= workers:
+            return entries
+        if time.monotonic() > deadline:
+            raise RuntimeError(f"{len(entries)}/{workers} workers démarrés en {timeout:.0f} s.")
+        time.sleep(0.02)
+
+
+def measure_server(mode, workers, preload):
+    """
+    Lance le serveur puis mesure son démarrage et sa mémoire.
+
+    Returns:
+        dict: ``first_response_s`` (lancement → première réponse),
+        ``all_workers_s`` (lancement → dernier worker prêt), ``worker_boot_ms``
+        (``fork`` → application prête, moyenne par worker), RSS du maître et
+        moyenne des workers, PSS totale du serveur.
+    """
+    with tempfile.NamedTemporaryFile('w', suffix='.jsonl', delete=False) as boot_log:
+        pass
+    env = {'GUNICORN_PRELOAD': str(preload), 'GUNICORN_BOOT_LOG': boot_log.name}
+    port = benchmark.free_port()
+    launched = time.time()
+    start = time.perf_counter()
+    process = benchmark.start_server(mode, port, workers, env)
+    try:
+        benchmark.wait_ready(process, port, interval=0.01)
+        first_response = time.perf_counter() - start
+        entries = read_boot_log(boot_log.name, workers)
+        # Laisse les workers terminer leurs allocations de démarrage
+        time.sleep(0.5)
+        master = benchmark.process_memory(process.pid)
+        children = [benchmark.process_memory(pid) for pid in benchmark.child_pids(process.pid)]
+    finally:
+        benchmark.stop_server(process)
+        os.unlink(boot_log.name)
+
+    def mean(values):
+        values = [value for value in values if value is not None]
+        return statistics.mean(values) if values else None
+
+    pss = [memory['pss_mb'] for memory in [master, *children]]
+    return {
+        'first_response_s': first_response,
+        'all_workers_s': max(entry['started'] + entry['boot_ms'] / 1000 for entry in entries)
+        - launched,
+        'worker_boot_ms': mean(entry['boot_ms'] for entry in entries),
+        'master_rss_mb': master['rss_mb'],
+        'worker_rss_mb': mean(memory['rss_mb'] for memory in children),
+        'total_pss_mb': sum(pss) if None not in pss else None,
+    }
+
+
+class Command(BaseCommand):
+    """
+    Commande qui mesure le temps de démarrage et la mémoire du projet.
+
+    Sont mesurés, chacun dans des processus neufs :
+
+    - une commande de gestion courte (``manage.py check``), qui paie
+      l'import des réglages et de Django ;
+    - le serveur lancé par ``serve.sh``, sans puis avec préchargement de
+      l'application (``GUNICORN_PRELOAD``) : délai de la première réponse et
+      du dernier worker prêt, démarrage moyen d'un worker, RSS du maître et
+      des workers et PSS totale (part de chaque processus dans les pages
+      partagées, sous Linux).
+
+    Chaque mesure est la médiane de ``--runs`` lancements.
+
+    Usage :
+        python manage.py benchmark_startup [--mode wsgi] [--workers 3] [--runs 3] [--json]
+    """
+
+    help = "Mesure le démarrage des commandes et des workers, et leur mémoire."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', choices=MODES, default='wsgi', help="Mode de service.")
+        parser.add_argument('--workers', type=int, default=3, help="Workers gunicorn.")
+        parser.add_argument('--runs', type=int, default=3, help="Lancements par mesure.")
+        parser.add_argument('--json', action='store_true', help="Sortie au format JSON.")
+
+    def handle(self, *args, **options):
+        results = {'command_s': time_command(['check'], options['runs'])}
+        for preload in (False, True):
+            runs = []
+            for _ in range(options['runs']):
+                try:
+                    runs.append(measure_server(options['mode'], options['workers'], preload))
+                except RuntimeError as error:
+                    raise CommandError(f"{options['mode']}: {error}")
+            results['preload' if preload else 'no_preload'] = {
+                key: statistics.median(run[key] for run in runs)
+                if None not in (run[key] for run in runs) else None
+                for key in runs[0]
+            }
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        self.stdout.write(f"manage.py check : {results['command_s'] * 1000:.0f} ms")
+        for config in ('no_preload', 'preload'):
+            result = results[config]
+            line = (
+                f"{config} : première réponse {result['first_response_s'] * 1000:.0f} ms, "
+                f"workers prêts {result['all_workers_s'] * 1000:.0f} ms, "
+                f"démarrage d'un worker {result['worker_boot_ms']:.0f} ms"
+            )
+            if result['worker_rss_mb'] is not None:
+                line += (
+                    f", RSS maître {result['master_rss_mb']:.1f} Mo, "
+                    f"RSS worker {result['worker_rss_mb']:.1f} Mo"
+                )
+            if result['total_pss_mb'] is not None:
+                line += f", PSS totale {result['total_pss_mb']:.1f} Mo"
+            self.stdout.write(line)
@@ -0,0 +1,141 @@
+import json
+import time
+from copy import deepcopy
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.template.backends.django import DjangoTemplates
+from django.test.utils import (
+    ContextList, override_settings, setup_test_environment, teardown_test_environment,
+)
+
+from oc_lettings_site import benchmark
+from oc_lettings_site.routes import iter_route_urls, make_client
+
+LOCMEM_CACHE = 'django.core.cache.backends.locmem.LocMemCache'
+DUMMY_CACHE = 'django.core.cache.backends.dummy.DummyCache'
+
+# Configurations comparées : (loader en cache, cache de fragments)
+CONFIGURATIONS = {
+    'uncached': (False, False),
+    'cached_loader': (True, False),
+    'fragments': (True, True),
+}
+
+
+def build_engine(cached_loader):
+    """
+    Construit un moteur de templates sur le modèle de ``TEMPLATES``, avec ou
+    sans loader en cache.
+    """
+    params = deepcopy(settings.TEMPLATES[0])
+    loaders = settings.TEMPLATE_LOADERS
+    if cached_loader:
+        loaders = [('django.template.loaders.cached.Loader', loaders)]
+    params['OPTIONS']['loaders'] = loaders
+    params.pop('BACKEND')
+    params.update(NAME='benchmark', APP_DIRS=False)
+    return DjangoTemplates(params)
+
+
+def capture_renders():
+    """
+    Appelle chaque route publique, caches désactivés, et relève le template
+    principal de la page avec son contexte.
+
+    Returns:
+        list[tuple]: ``(nom de la route, nom du template, contexte, requête)``.
+    """
+    client = make_client()
+    renders = []
+    try:
+        # Instrumente le rendu pour que les réponses exposent templates et contexte
+        setup_test_environment()
+        instrumented = True
+    except RuntimeError:
+        # Déjà fait, la commande est appelée depuis les tests
+        instrumented = False
+    try:
+        with override_settings(CACHES=benchmark.dummy_caches()):
+            for name, path, data, missing in iter_route_urls():
+                if missing:
+                    continue
+                response = client.get(path, data)
+                if not response.templates:
+                    continue
+                context = response.context
+                if isinstance(context, ContextList):
+                    context = context[0]
+                renders.append((
+                    name, response.templates[0].name, context.flatten(), response.wsgi_request,
+                ))
+    finally:
+        if instrumented:
+            teardown_test_environment()
+    return renders
+
+
+def measure(engine, template_name, context, request, iterations):
+    """
+    Mesure le rendu d'un template, chargement compris comme dans une vue.
+
+    Returns:
+        float: Durée moyenne d'un rendu, en microsecondes.
+    """
+    engine.get_template(template_name).render(context, request)
+    start = time.perf_counter()
+    for _ in range(iterations):
+        engine.get_template(template_name).render(context, request)
+    return (time.perf_counter() - start) / iterations * 1_000_000
+
+
+class Command(BaseCommand):
+    """
+    Commande qui mesure le temps de rendu du template de chaque page publique.
+
+    Le template principal de chaque route et son contexte sont relevés en
+    appelant la route, puis le rendu (chargement du template compris) est
+    répété dans trois configurations :
+
+    - ``uncached`` : templates relus et compilés à chaque rendu, sans cache
+      de fragments ;
+    - ``cached_loader`` : loader en cache de la production ;
+    - ``fragments`` : loader en cache et fragments ``{% cache %}``.
+
+    Usage :
+        python manage.py benchmark_templates [--iterations 500] [--json]
+    """
+
+    help = "Mesure le temps de rendu du template de chaque page publique."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--iterations', type=int, default=500,
+                            help="Rendus mesurés par template et par configuration.")
+        parser.add_argument('--json', action='store_true', help="Sortie au format JSON.")
+
+    def handle(self, *args, **options):
+        renders = capture_renders()
+        if not renders:
+            raise CommandError("Aucune page rendue par un template.")
+
+        results = {}
+        for config, (cached_loader, fragments) in CONFIGURATIONS.items():
+            engine = build_engine(cached_loader)
+            backend = LOCMEM_CACHE if fragments else DUMMY_CACHE
+            caches = dict(settings.CACHES, template_fragments={
+                'BACKEND': backend, 'LOCATION': 'benchmark-template-fragments',
+            })
+            with override_settings(CACHES=caches):
+                for route, template_name, context, request in renders:
+                    result = results.setdefault(route, {'template': template_name})
+                    result[config] = measure(
+                        engine, template_name, context, request, options['iterations']
+                    )
+
+        if options['json']:
+            self.stdout.write(json.dumps(results, indent=2))
+            return
+        for route, result in results.items():
+            timings = ', '.join(f"{config} {result[config]:.0f} µs" for config in CONFIGURATIONS)
+            gain = result['uncached'] / result['fragments']
+            self.stdout.write(f"{route} ({result['template']}) : {timings} (x{gain:.1f})")
@@ -0,0 +1,104 @@
+import base64
+import hashlib
+import time
+import urllib.request
+
+from django.conf import settings
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site.assets import (
+    VENDOR_ASSETS, VENDOR_PREFIX, build_is_current, source_digest, write_build_stamp,
+)
+
+VENDOR_DIR = settings.BASE_DIR / 'static' / VENDOR_PREFIX
+
+
+def check_integrity(content, integrity):
+    """
+    Vérifie le contenu d'un fichier téléchargé contre son empreinte SRI
+    (``sha384-...``).
+
+    Raises:
+        CommandError: Si l'empreinte ne correspond pas.
+    """
+    algorithm, expected = integrity.split('-', 1)
+    actual = base64.b64encode(hashlib.new(algorithm, content).digest()).decode()
+    if actual != expected:
+        raise CommandError(f"Empreinte {algorithm} inattendue : {actual}")
+
+
+def download_vendor_assets(force=False, timeout=30):
+    """
+    Copie dans ``static/vendor/`` les bibliothèques de :data:`VENDOR_ASSETS`
+    qui n'y sont pas encore (toutes avec ``force``).
+
+    Returns:
+        list[str]: Noms des fichiers téléchargés.
+
+    Raises:
+        CommandError: Si un téléchargement échoue.
+    """
+    VENDOR_DIR.mkdir(parents=True, exist_ok=True)
+    downloaded = []
+    for name, (url, integrity) in VENDOR_ASSETS.items():
+        target = VENDOR_DIR / name
+        if target.is_file() and not force:
+            continue
+        try:
+            with urllib.request.urlopen(url, timeout=timeout) as response:
+                content = response.read()
+        except OSError as error:
+            raise CommandError(f"Téléchargement de {url} impossible : {error}")
+        if integrity:
+            check_integrity(content, integrity)
+        target.write_bytes(content)
+        downloaded.append(name)
+    return downloaded
+
+
+class Command(BaseCommand):
+    """
+    Commande qui construit les fichiers statiques servis en production.
+
+    - ``--vendor`` copie d'abord les bibliothèques tierces dans
+      ``static/vendor/`` (build de l'image, avec accès réseau) ;
+    - ``collectstatic`` minifie les sources du projet, empreinte les fichiers
+      et en écrit les versions gzip et brotli (voir
+      :mod:`oc_lettings_site.assets`) ;
+    - l'empreinte des sources est enregistrée : avec ``--if-stale``, la
+      commande ne fait rien si ``STATIC_ROOT`` est à jour, ce qui évite de
+      recollecter les fichiers à chaque démarrage du conteneur.
+
+    Usage :
+        python manage.py build_assets [--vendor [--refresh-vendor]] [--if-stale]
+    """
+
+    help = "Minifie, empreinte et précompresse les fichiers statiques."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--vendor', action='store_true',
+                            help="Télécharge les bibliothèques tierces manquantes.")
+        parser.add_argument('--refresh-vendor', action='store_true',
+                            help="Retélécharge toutes les bibliothèques tierces.")
+        parser.add_argument('--if-stale', action='store_true',
+                            help="Ne reconstruit que si les sources ont changé.")
+
+    def handle(self, *args, **options):
+        if options['vendor'] or options['refresh_vendor']:
+            downloaded = download_vendor_assets(force=options['refresh_vendor'])
+            self.stdout.write(f"{len(downloaded)} bibliothèque(s) tierce(s) téléchargée(s).")
+
+        start = time.perf_counter()
+        digest = source_digest()
+        if options['if_stale'] and build_is_current(digest):
+            self.stdout.write(
+                f"Fichiers statiques à jour ({(time.perf_counter() - start) * 1000:.0f} ms)."
+            )
+            return
+        call_command('collectstatic', interactive=False, verbosity=0)
+        write_build_stamp(digest)
+        self.stdout.write(self.style.SUCCESS(
+            f"Fichiers statiques construits dans {settings.STATIC_ROOT} "
+            f"en {time.perf_counter() - start:.1f} s."
+        ))
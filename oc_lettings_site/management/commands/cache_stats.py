@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from oc_lettings_site import object_cache
+
+
+class Command(BaseCommand):
+    """
+    Commande qui affiche les compteurs du cache d'objets des pages de détail.
+
+    Les compteurs sont lus dans le cache : la commande exige un cache partagé
+    entre les workers (``SHARED_CACHE``). Avec le cache par défaut, propre à
+    chaque processus, elle ne verrait que le sien, vide ; chaque worker
+    journalise alors ses compteurs à son arrêt (voir
+    :mod:`oc_lettings_site.worker_stats`).
+
+    Usage :
+        python manage.py cache_stats [--reset]
+    """
+
+    help = "Affiche les hits/misses du cache d'objets des pages de détail."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset', action='store_true', help="Remet les compteurs à zéro après affichage."
+        )
+
+    def handle(self, *args, **options):
+        if not settings.SHARED_CACHE:
+            raise CommandError(
+                "Le cache d'objets est propre à chaque worker (CACHE_BACKEND non partagé) : "
+                "ses compteurs sont journalisés par chaque worker à son arrêt. "
+                "Configurez un cache partagé (Redis, Memcached) pour les lire ici."
+            )
+        counters = object_cache.stats()
+        self.stdout.write(
+            f"hits={counters['hits']} misses={counters['misses']} "
+            f"hit_ratio={counters['hit_ratio']:.2%}"
+        )
+        if options['reset']:
+            object_cache.reset_stats()
+            self.stdout.write("Compteurs remis à zéro.")
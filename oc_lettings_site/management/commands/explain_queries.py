@@ -0,0 +1,132 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.test.utils import override_settings
+
+from oc_lettings_site.benchmark import dummy_caches
+from oc_lettings_site.routes import iter_route_urls, make_client
+
+SCAN_RE = re.compile(r'^SCAN (?!.*(USING (COVERING )?INDEX|VIRTUAL TABLE))')
+LIMIT_RE = re.compile(r'\bLIMIT\b', re.IGNORECASE)
+ORDER_BY_RE = re.compile(r'\bORDER BY\b', re.IGNORECASE)
+# Clauses qui filtrent ou regroupent les lignes lues : le parcours ne s'arrête
+# plus après LIMIT lignes
+FILTER_RE = re.compile(r'\b(WHERE|GROUP BY|HAVING)\b', re.IGNORECASE)
+
+
+def full_scans(vendor, sql, plan):
+    """
+    Relève les parcours complets de table d'un plan d'exécution.
+
+    Sous SQLite, un ``SCAN`` dans l'ordre d'un index (``USING INDEX``) n'est
+    pas signalé. Un ``SCAN`` sans index ne l'est que s'il lit la table dans
+    l'ordre de sa clé primaire et s'arrête après ``LIMIT`` lignes : requête
+    triée (``ORDER BY``) sans B-tree temporaire, bornée par ``LIMIT``, et
+    sans ``WHERE`` ni regroupement. C'est la première page d'une pagination
+    par curseur ; les pages suivantes sont des ``SEARCH`` sur la clé. Tout
+    autre ``SCAN`` est signalé, ``LIMIT`` ou non (``get()``, ``first()`` ou
+    ``[:n]`` filtrés sur une colonne non indexée).
+
+    Args:
+        vendor (str): Moteur de base de données (``connection.vendor``).
+        sql (str): La requête analysée.
+        plan (list[str]): Les lignes du plan d'exécution.
+
+    Returns:
+        list[str]: Les lignes du plan correspondant à un parcours complet.
+    """
+    if vendor == 'postgresql':
+        return [line for line in plan if 'Seq Scan on' in line]
+    scans = [line for line in plan if SCAN_RE.match(line)]
+    key_ordered = (
+        ORDER_BY_RE.search(sql) and LIMIT_RE.search(sql) and not FILTER_RE.search(sql)
+        and not any('TEMP B-TREE' in line for line in plan)
+    )
+    return [] if key_ordered else scans
+
+
+def explain(connection, sql, params):
+    """
+    Renvoie le plan d'exécution d'une requête sous forme de lignes de texte.
+    """
+    with connection.cursor() as cursor:
+        if connection.vendor == 'sqlite':
+            cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+            return [row[-1] for row in cursor.fetchall()]
+        if connection.vendor == 'postgresql':
+            cursor.execute(f'EXPLAIN {sql}', params)
+            return [row[0] for row in cursor.fetchall()]
+    raise CommandError(f"Moteur non pris en charge : {connection.vendor}")
+
+
+class Command(BaseCommand):
+    """
+    Commande qui vérifie le plan d'exécution des requêtes de chaque vue.
+
+    Chaque route publique est appelée avec le client de test, caches
+    désactivés, en enregistrant les requêtes ``SELECT`` émises sur toutes les
+    connexions. Leur plan est obtenu par ``EXPLAIN QUERY PLAN`` (SQLite) ou
+    ``EXPLAIN`` (PostgreSQL) ; la commande échoue si l'une d'elles parcourt
+    une table entière.
+
+    Usage :
+        python manage.py explain_queries [--verbose-plans]
+    """
+
+    help = "Échoue si une requête d'une vue publique parcourt une table entière."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--verbose-plans', action='store_true', help="Affiche le plan de chaque requête."
+        )
+
+    def handle(self, *args, **options):
+        client = make_client()
+        violations = []
+
+        with override_settings(CACHES=dummy_caches()):
+            for name, url, data, missing in iter_route_urls():
+                if missing:
+                    self.stderr.write(f"{name}: ignorée, pas de donnée pour {missing}")
+                    continue
+                for alias, sql, query_params in self._capture(client, url, data):
+                    connection = connections[alias]
+                    plan = explain(connection, sql, query_params)
+                    scans = full_scans(connection.vendor, sql, plan)
+                    if options['verbose_plans'] or scans:
+                        self.stdout.write(f"[{name}] {sql}")
+                        for line in plan:
+                            self.stdout.write(f"    {line}")
+                    violations.extend((name, line) for line in scans)
+
+        if violations:
+            details = ', '.join(f"{name}: {line}" for name, line in violations)
+            raise CommandError(f"Parcours complets de table détectés : {details}")
+        self.stdout.write(self.style.SUCCESS("Aucun parcours complet de table."))
+
+    def _capture(self, client, url, data):
+        """Appelle une URL et renvoie les requêtes SELECT émises."""
+        queries = []
+
+        def make_wrapper(alias):
+            def wrapper(execute, sql, params, many, context):
+                if sql.lstrip().upper().startswith('SELECT'):
+                    queries.append((alias, sql, params))
+                return execute(sql, params, many, context)
+            return wrapper
+
+        wrappers = [
+            connection.execute_wrapper(make_wrapper(connection.alias))
+            for connection in connections.all()
+        ]
+        for wrapper in wrappers:
+            wrapper.__enter__()
+        try:
+            response = client.get(url, data)
+        finally:
+            for wrapper in reversed(wrappers):
+                wrapper.__exit__(None, None, None)
+        if response.status_code >= 400:
+            raise CommandError(f"{url} a répondu {response.status_code}")
+        return queries
@@ -0,0 +1,116 @@
+import json
+import os
+import re
+import subprocess
+import sys
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# Ligne de ``python -X importtime`` : self | cumulé | module, indenté selon la profondeur
+IMPORTTIME_RE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+
+def run_importtime(module, env=None):
+    """
+    Importe un module dans un interpréteur neuf lancé avec ``-X importtime``.
+
+    Args:
+        module (str): Module à importer (``oc_lettings_site.wsgi``...).
+        env (dict | None): Variables d'environnement supplémentaires.
+
+    Returns:
+        tuple: ``(lignes [(module, self µs, cumulé µs, profondeur)], durée en s)``.
+
+    Raises:
+        CommandError: Si l'import échoue.
+    """
+    process_env = dict(os.environ)
+    process_env.setdefault('DJANGO_SETTINGS_MODULE', 'oc_lettings_site.settings')
+    process_env.update(env or {})
+    start = time.perf_counter()
+    process = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=settings.BASE_DIR, env=process_env, capture_output=True, text=True,
+    )
+    elapsed = time.perf_counter() - start
+    if process.returncode:
+        raise CommandError(f"Échec de l'import de {module} :\n{process.stderr[-2000:]}")
+    rows = []
+    for line in process.stderr.splitlines():
+        match = IMPORTTIME_RE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            rows.append((name, int(self_us), int(cumulative_us), len(indent) // 2))
+    return rows, elapsed
+
+
+def summarize(rows, group):
+    """
+    Totalise le temps d'import propre des modules, par module ou par paquet
+    de premier niveau (``django``, ``sentry_sdk``, ``lettings``...).
+
+    Returns:
+        dict: ``{nom: {'self_ms', 'modules'}}``, du plus coûteux au moins coûteux.
+    """
+    totals = {}
+    for name, self_us, _, _ in rows:
+        key = name.split('.')[0] if group == 'package' else name
+        total = totals.setdefault(key, {'self_ms': 0.0, 'modules': 0})
+        total['self_ms'] += self_us / 1000
+        total['modules'] += 1
+    return dict(sorted(totals.items(), key=lambda item: item[1]['self_ms'], reverse=True))
+
+
+class Command(BaseCommand):
+    """
+    Commande qui profile le temps d'import d'un module du projet.
+
+    Le module est importé dans un interpréteur neuf lancé avec
+    ``python -X importtime`` ; le temps propre de chaque module importé est
+    totalisé par paquet de premier niveau (ou par module avec
+    ``--group module``), pour repérer les dépendances qui ralentissent le
+    démarrage des commandes et des workers.
+
+    Usage :
+        python manage.py profile_imports [--module oc_lettings_site.wsgi]
+            [--group package|module] [--top 20] [--json]
+    """
+
+    help = "Profile le temps d'import d'un module, par paquet ou par module."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--module', default='oc_lettings_site.wsgi',
+                            help="Module importé (par défaut l'application WSGI).")
+        parser.add_argument('--group', choices=('package', 'module'), default='package',
+                            help="Regroupement des temps d'import.")
+        parser.add_argument('--top', type=int, default=20, help="Nombre de lignes affichées.")
+        parser.add_argument('--json', action='store_true', help="Sortie au format JSON.")
+
+    def handle(self, *args, **options):
+        rows, elapsed = run_importtime(options['module'])
+        totals = summarize(rows, options['group'])
+        top = dict(list(totals.items())[:options['top']])
+        imports_ms = sum(self_us for _, self_us, _, _ in rows) / 1000
+
+        if options['json']:
+            self.stdout.write(json.dumps({
+                'module': options['module'],
+                'wall_ms': elapsed * 1000,
+                'imports_ms': imports_ms,
+                'modules': len(rows),
+                options['group']: top,
+            }, indent=2))
+            return
+        self.stdout.write(
+            f"{options['module']} : {len(rows)} modules importés en {imports_ms:.0f} ms "
+            f"({elapsed * 1000:.0f} ms avec le démarrage de l'interpréteur)"
+        )
+        width = max(len(name) for name in top)
+        for name, total in top.items():
+            share = total['self_ms'] / imports_ms * 100 if imports_ms else 0
+            self.stdout.write(
+                f"  {name:<{width}}  {total['self_ms']:8.1f} ms  {share:5.1f} %  "
+                f"({total['modules']} modules)"
+            )
@@ -0,0 +1,154 @@
+import random
+import re
+
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+
+from lettings import geo
+from lettings.bulk import after_import as after_lettings_import, write_lettings
+from lettings.models import Address, Letting
+from oc_lettings_site.bulk import Throughput, batched
+from profiles.bulk import after_import as after_profiles_import, write_profiles
+from profiles.models import Profile
+
+ADJECTIVES = (
+    'Cozy', 'Sunny', 'Quiet', 'Rustic', 'Modern', 'Ocean', 'Hillside', 'Garden',
+    'Historic', 'Lakeside', 'Desert', 'Forest',
+)
+KINDS = (
+    'Cottage', 'Loft', 'Studio', 'Cabin', 'Villa', 'Bungalow', 'Retreat', 'House',
+    'Farmhouse', 'Apartment', 'Treehouse', 'Dome',
+)
+STREETS = (
+    'Elm Street', 'Oak Avenue', 'Military Street', 'Wintergreen Avenue', 'Argyle Avenue',
+    'Maple Road', 'Pine Lane', 'Cedar Court', 'Lake Drive', 'Hill Road',
+)
+CITIES = (
+    ('Brunswick', 'GA', 31525),
+    ('Willoughby', 'OH', 44094),
+    ('Newport News', 'VA', 23601),
+    ('Marquette', 'MI', 49855),
+    ('Aliquippa', 'PA', 15001),
+    ('East Meadow', 'NY', 11554),
+    ('Joshua Tree', 'CA', 92252),
+    ('Austin', 'TX', 78701),
+)
+FIRST_NAMES = ('Alex', 'Sam', 'Jordan', 'Taylor', 'Morgan', 'Casey', 'Riley', 'Jamie')
+LAST_NAMES = ('Smith', 'Garcia', 'Chen', 'Martin', 'Okafor', 'Novak', 'Silva', 'Dubois')
+
+SIZE_RE = re.compile(r'^(\d+)([kKmM]?)$')
+SIZE_UNITS = {'': 1, 'k': 1_000, 'm': 1_000_000}
+
+
+def parse_size(value):
+    """
+    Convertit une taille de jeu de données (``1000``, ``100k``, ``1M``) en entier.
+
+    Raises:
+        CommandError: Si la valeur n'est pas une taille valide.
+    """
+    match = SIZE_RE.match(value)
+    if not match:
+        raise CommandError(f"Taille invalide : {value} (ex. 1000, 100k, 1M).")
+    return int(match.group(1)) * SIZE_UNITS[match.group(2).lower()]
+
+
+def generate_lettings(rng, count):
+    """
+    Génère ``count`` couples ``(Address, Letting)`` non enregistrés.
+
+    Les adresses sont dispersées dans un rayon d'environ 20 km autour du
+    centroïde de leur code postal, pour donner de la matière aux recherches
+    de proximité.
+
+    Yields:
+        tuple: ``(Address, Letting)``.
+    """
+    for index in range(1, count + 1):
+        city, state, zip_code = rng.choice(CITIES)
+        address = Address(
+            number=rng.randint(1, 9999),
+            street=rng.choice(STREETS),
+            city=city,
+            state=state,
+            zip_code=zip_code,
+            country_iso_code='USA',
+        )
+        latitude, longitude = geo.geocode(zip_code)
+        address.latitude = latitude + rng.uniform(-0.2, 0.2)
+        address.longitude = longitude + rng.uniform(-0.2, 0.2)
+        geo.locate(address)
+        title = f"{rng.choice(ADJECTIVES)} {rng.choice(KINDS)} {index}"
+        yield address, Letting(title=title)
+
+
+def generate_profiles(rng, count):
+    """
+    Génère ``count`` couples ``(User, Profile)`` non enregistrés.
+
+    Les utilisateurs reçoivent un mot de passe inutilisable.
+
+    Yields:
+        tuple: ``(User, Profile)``.
+    """
+    for index in range(1, count + 1):
+        username = f'user{index:07d}'
+        user = User(
+            username=username,
+            first_name=rng.choice(FIRST_NAMES),
+            last_name=rng.choice(LAST_NAMES),
+            email=f'{username}@example.com',
+        )
+        user.set_unusable_password()
+        yield user, Profile(favorite_city=rng.choice(CITIES)[0])
+
+
+class Command(BaseCommand):
+    """
+    Commande qui peuple une base vide d'un jeu de données de benchmark.
+
+    Les données sont générées à partir d'une graine fixe : une même taille et
+    une même graine produisent toujours les mêmes lignes. L'écriture passe par
+    les fonctions d'import en masse, par lots transactionnels.
+
+    La commande refuse d'écrire dans une base contenant déjà des locations ou
+    des profils : utiliser une base dédiée, désignée par ``SQLITE_PATH``.
+
+    Usage :
+        SQLITE_PATH=/tmp/bench-100k.sqlite3 python manage.py migrate
+        SQLITE_PATH=/tmp/bench-100k.sqlite3 python manage.py seed_benchmark_data 100k
+    """
+
+    help = "Peuple une base vide d'un jeu de données de benchmark déterministe."
+
+    def add_arguments(self, parser):
+        parser.add_argument('size', help="Nombre de locations (ex. 1000, 100k, 1M).")
+        parser.add_argument('--profiles', help="Nombre de profils (par défaut : size).")
+        parser.add_argument('--seed', type=int, default=42, help="Graine du générateur.")
+        parser.add_argument('--batch-size', type=int, default=5000,
+                            help="Lignes écrites par transaction.")
+
+    def handle(self, *args, **options):
+        if Letting.objects.exists() or Profile.objects.exists():
+            raise CommandError(
+                "La base contient déjà des données : utiliser une base dédiée (SQLITE_PATH)."
+            )
+        lettings = parse_size(options['size'])
+        profiles = parse_size(options['profiles'] or options['size'])
+        rng = random.Random(options['seed'])
+
+        self._write("locations", generate_lettings(rng, lettings), write_lettings, options)
+        after_lettings_import()
+        self._write("profils", generate_profiles(rng, profiles), write_profiles, options)
+        after_profiles_import()
+
+    def _write(self, label, objects, write, options):
+        throughput = Throughput()
+        for batch in batched(objects, options['batch_size']):
+            with transaction.atomic():
+                write(batch)
+            throughput.add(len(batch))
+            if options['verbosity'] >= 2:
+                self.stdout.write(f"... {label} : {throughput}")
+        self.stdout.write(self.style.SUCCESS(f"{label.capitalize()} : {throughput}"))
@@ -0,0 +1,33 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+
+class Command(BaseCommand):
+    """
+    Commande qui passe la base SQLite par défaut au mode de journal du projet
+    (``SQLITE_JOURNAL_MODE``, WAL par défaut).
+
+    Le mode de journal est enregistré dans le fichier : il suffit de l'appliquer
+    une fois, au déploiement (voir ``entrypoint.sh``), plutôt qu'à chaque
+    connexion. La base du dépôt, ouverte en développement, reste ainsi dans
+    son mode d'origine. Sans effet sur une autre base que SQLite.
+
+    Usage :
+        python manage.py set_journal_mode [--mode WAL]
+    """
+
+    help = "Applique le mode de journal du projet à la base SQLite par défaut."
+
+    def add_arguments(self, parser):
+        parser.add_argument('--mode', default=settings.SQLITE_JOURNAL_MODE,
+                            help="Mode de journal (WAL, DELETE...).")
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            self.stdout.write("Base non SQLite : mode de journal inchangé.")
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"PRAGMA journal_mode={options['mode']}")
+            mode = cursor.fetchone()[0]
+        self.stdout.write(f"journal_mode={mode}")
@@ -0,0 +1,140 @@
+"""
+Middlewares de Django adaptés au mode ASGI.
+
+Sous ASGI, ``MiddlewareMixin`` exécute ``process_request`` et
+``process_response`` dans le pool de threads (``sync_to_async``) : deux
+passages de thread par middleware et par requête, soit l'essentiel du coût
+d'une page servie depuis le cache. Les middlewares ci-dessous n'effectuent
+aucune entrée/sortie dans ces méthodes ; :class:`InlineHooksMixin` les appelle
+directement depuis la boucle d'événements. :class:`SessionMiddleware` ne passe
+par le pool de threads que lorsque la session doit être écrite en base.
+
+En mode WSGI, ces classes se comportent exactement comme celles de Django.
+
+Dans les deux modes, :class:`SessionlessPathsMixin` fait passer les pages
+publiques en lecture seule (``SESSIONLESS_PATHS``) devant les middlewares de
+session, d'authentification et de messages sans qu'ils les traitent : ces
+pages n'ont ni utilisateur ni session, et un cookie de session envoyé par un
+membre de l'équipe n'y provoque aucune lecture de la session.
+
+:class:`PreloadLinkMiddleware`, propre au projet, sert dans les deux modes.
+"""
+import re
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import middleware as auth
+from django.contrib.messages import middleware as messages
+from django.contrib.sessions import middleware as sessions
+from django.middleware import clickjacking, common, csrf, security
+from django.utils.deprecation import MiddlewareMixin
+
+from oc_lettings_site.assets import preload_header
+
+
+class InlineHooksMixin:
+    """
+    Appelle ``process_request``, ``process_view`` et ``process_response``
+    sans changer de thread lorsque la chaîne de middlewares est asynchrone.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode and hasattr(self, 'process_view'):
+            # Le gestionnaire de Django enveloppe dans sync_to_async toute
+            # méthode process_view qui n'est pas une coroutine
+            process_view = self.process_view
+
+            async def aprocess_view(request, view_func, view_args, view_kwargs):
+                return process_view(request, view_func, view_args, view_kwargs)
+
+            self.process_view = aprocess_view
+
+    async def __acall__(self, request):
+        response = None
+        if hasattr(self, 'process_request'):
+            response = self.process_request(request)
+        response = response or await self.get_response(request)
+        if hasattr(self, 'process_response'):
+            response = self.process_response(request, response)
+        return response
+
+
+class SessionlessPathsMixin:
+    """
+    Transmet directement au middleware suivant les requêtes dont le chemin
+    correspond à ``SESSIONLESS_PATHS`` (expression régulière ; vide : aucun).
+
+    Les vues de ces pages ne lisent ni ``request.session``, ni
+    ``request.user``, ni les messages ; les processeurs de contexte de
+    l'authentification et des messages se passent de ces attributs.
+    """
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        pattern = settings.SESSIONLESS_PATHS
+        self.sessionless_paths = re.compile(pattern) if pattern else None
+
+    def __call__(self, request):
+        if self.sessionless_paths and self.sessionless_paths.match(request.path_info):
+            return self.get_response(request)
+        return super().__call__(request)
+
+
+class SecurityMiddleware(InlineHooksMixin, security.SecurityMiddleware):
+    pass
+
+
+class SessionMiddleware(SessionlessPathsMixin, sessions.SessionMiddleware):
+    """
+    ``SessionMiddleware`` qui n'écrit la session depuis le pool de threads
+    que si elle a été modifiée (ou si ``SESSION_SAVE_EVERY_REQUEST``).
+    """
+
+    async def __acall__(self, request):
+        self.process_request(request)
+        response = await self.get_response(request)
+        if request.session.modified or settings.SESSION_SAVE_EVERY_REQUEST:
+            return await sync_to_async(self.process_response, thread_sensitive=True)(
+                request, response
+            )
+        return self.process_response(request, response)
+
+
+class CommonMiddleware(InlineHooksMixin, common.CommonMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(InlineHooksMixin, csrf.CsrfViewMiddleware):
+    pass
+
+
+class AuthenticationMiddleware(SessionlessPathsMixin, InlineHooksMixin,
+                               auth.AuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(SessionlessPathsMixin, InlineHooksMixin, messages.MessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(InlineHooksMixin, clickjacking.XFrameOptionsMiddleware):
+    pass
+
+
+class PreloadLinkMiddleware(InlineHooksMixin, MiddlewareMixin):
+    """
+    Annonce les ressources critiques des pages HTML (``PRELOAD_ASSETS``) par
+    un en-tête ``Link: rel=preload`` : le navigateur les demande dès la
+    réception des en-têtes, sans attendre d'avoir lu le ``<head>``. Un proxy
+    ou CDN qui gère les *Early Hints* peut aussi en tirer une réponse 103,
+    que ni gunicorn ni uvicorn n'émettent.
+    """
+
+    def process_response(self, request, response):
+        if (response.status_code == 200 and 'Link' not in response
+                and response.get('Content-Type', '').startswith('text/html')):
+            header = preload_header()
+            if header:
+                response['Link'] = header
+        return response
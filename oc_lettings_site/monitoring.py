@@ -0,0 +1,39 @@
+"""
+Initialisation de Sentry, chargé à la demande.
+
+Le SDK et ses intégrations représentent une part notable du temps d'import
+des réglages : ``settings.py`` n'importe ce module que si ``SENTRY_DSN`` est
+défini, pour que les commandes de gestion et les workers d'un environnement
+sans Sentry (développement, tests, CI) ne paient pas ce coût.
+"""
+import sentry_sdk
+from sentry_sdk.integrations.django import DjangoIntegration
+from sentry_sdk.integrations.logging import LoggingIntegration
+
+from oc_lettings_site.sampling import traces_sampler
+
+
+def init_sentry(dsn, environment, release):
+    """
+    Initialise le SDK Sentry avec les intégrations du projet.
+
+    Le transport de Sentry relance son thread d'envoi après un ``fork`` :
+    l'initialisation dans le maître gunicorn (``preload_app``) vaut pour
+    tous les workers.
+
+    Args:
+        dsn (str): DSN du projet Sentry.
+        environment (str): Nom de l'environnement (``production``...).
+        release (str): Version déployée (SHA du commit).
+    """
+    sentry_sdk.init(
+        dsn=dsn,
+        integrations=[
+            DjangoIntegration(),
+            LoggingIntegration(level=None, event_level=None),
+        ],
+        traces_sampler=traces_sampler,
+        send_default_pii=True,
+        environment=environment,
+        release=release,
+    )
@@ -0,0 +1,179 @@
+"""
+Cache d'objets en lecture (read-through) pour les pages de détail.
+
+Les objets sont stockés dans le cache Django désigné par
+``OBJECT_CACHE_ALIAS`` sous une clé ``obj:<espace>:<clé>``. En cas d'absence,
+la fonction de chargement fournie par la vue est appelée et son résultat mis
+en cache. Les entrées sont supprimées par les signaux des applications
+``lettings`` et ``profiles`` dès que les modèles sources changent.
+
+Les compteurs de hits et de misses sont tenus dans le même cache, afin d'être
+partagés entre les workers lorsque le backend l'est aussi.
+
+Un objet absent de la base est lui aussi mis en cache, sous un marqueur et
+pour ``OBJECT_CACHE_MISS_TIMEOUT`` secondes seulement : les demandes répétées
+d'un identifiant inconnu (robots d'exploration) ne touchent plus la base. Les
+signaux suppriment ce marqueur dès que l'objet est créé.
+
+Les vues asynchrones utilisent :func:`aget_or_load`, qui attend un chargeur
+asynchrone et accède au cache par :mod:`oc_lettings_site.async_cache`.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.core.exceptions import ObjectDoesNotExist
+
+from . import async_cache
+
+_MISSING = object()
+# Valeur mise en cache pour un objet absent de la base
+NOT_FOUND = 'obj:not-found'
+STATS_KEYS = ('hits', 'misses')
+
+
+def _cache():
+    """Renvoie le backend de cache utilisé pour les objets."""
+    return caches[settings.OBJECT_CACHE_ALIAS]
+
+
+def make_key(namespace, key):
+    """
+    Construit la clé de cache d'un objet.
+
+    Args:
+        namespace (str): Espace de noms de l'objet (ex. ``'letting'``).
+        key: Identifiant de l'objet dans cet espace (id, username...).
+
+    Returns:
+        str: La clé de cache.
+    """
+    return f'obj:{namespace}:{key}'
+
+
+def _increment(counter):
+    """Incrémente un compteur de statistiques, en le créant au besoin."""
+    cache = _cache()
+    key = f'obj:stats:{counter}'
+    if not cache.add(key, 1, timeout=None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # La clé a été évincée entre add() et incr()
+            cache.set(key, 1, timeout=None)
+
+
+async def _aincrement(counter):
+    """Version asynchrone de :func:`_increment`."""
+    cache = _cache()
+    key = f'obj:stats:{counter}'
+    if not await async_cache.call(cache, 'add', key, 1, timeout=None):
+        try:
+            await async_cache.call(cache, 'incr', key)
+        except ValueError:
+            await async_cache.call(cache, 'set', key, 1, timeout=None)
+
+
+def get_or_load(namespace, key, loader):
+    """
+    Renvoie l'objet en cache, ou le charge et le met en cache.
+
+    Un ``DoesNotExist`` levé par ``loader`` est mémorisé sous le marqueur
+    :data:`NOT_FOUND` ; tant qu'il est en cache, l'absence est signalée sans
+    appeler ``loader``. Les autres exceptions ne sont pas mises en cache.
+
+    Args:
+        namespace (str): Espace de noms de l'objet.
+        key: Identifiant de l'objet.
+        loader (callable): Fonction sans argument qui charge l'objet depuis la base.
+
+    Returns:
+        object: L'objet, issu du cache ou de ``loader``.
+
+    Raises:
+        ObjectDoesNotExist: Si l'objet n'existe pas.
+    """
+    cache = _cache()
+    cache_key = make_key(namespace, key)
+    value = cache.get(cache_key, _MISSING)
+    if value is not _MISSING:
+        _increment('hits')
+        return _found(value, cache_key)
+    _increment('misses')
+    try:
+        value = loader()
+    except ObjectDoesNotExist:
+        cache.set(cache_key, NOT_FOUND, settings.OBJECT_CACHE_MISS_TIMEOUT)
+        raise
+    cache.set(cache_key, value, settings.OBJECT_CACHE_TIMEOUT)
+    return value
+
+
+def _found(value, cache_key):
+    """Renvoie une valeur lue en cache, ou lève ``ObjectDoesNotExist`` sur le marqueur."""
+    if value == NOT_FOUND:
+        raise ObjectDoesNotExist(f"{cache_key} : absent de la base (en cache)")
+    return value
+
+
+async def aget_or_load(namespace, key, loader):
+    """
+    Version asynchrone de :func:`get_or_load`.
+
+    Args:
+        namespace (str): Espace de noms de l'objet.
+        key: Identifiant de l'objet.
+        loader (callable): Fonction sans argument qui renvoie une coroutine
+            chargeant l'objet (ex. ``lambda: queryset.aget(...)``).
+
+    Returns:
+        object: L'objet, issu du cache ou de ``loader``.
+
+    Raises:
+        ObjectDoesNotExist: Si l'objet n'existe pas.
+    """
+    cache = _cache()
+    cache_key = make_key(namespace, key)
+    value = await async_cache.call(cache, 'get', cache_key, _MISSING)
+    if value is not _MISSING:
+        await _aincrement('hits')
+        return _found(value, cache_key)
+    await _aincrement('misses')
+    try:
+        value = await loader()
+    except ObjectDoesNotExist:
+        await async_cache.call(
+            cache, 'set', cache_key, NOT_FOUND, settings.OBJECT_CACHE_MISS_TIMEOUT
+        )
+        raise
+    await async_cache.call(cache, 'set', cache_key, value, settings.OBJECT_CACHE_TIMEOUT)
+    return value
+
+
+def invalidate(namespace, *keys):
+    """
+    Supprime des objets du cache.
+
+    Args:
+        namespace (str): Espace de noms des objets.
+        *keys: Identifiants des objets à invalider.
+    """
+    if keys:
+        _cache().delete_many([make_key(namespace, key) for key in keys])
+
+
+def stats():
+    """
+    Renvoie les compteurs du cache d'objets.
+
+    Returns:
+        dict: ``{'hits': int, 'misses': int, 'hit_ratio': float}``.
+    """
+    values = _cache().get_many([f'obj:stats:{name}' for name in STATS_KEYS])
+    counters = {name: values.get(f'obj:stats:{name}', 0) for name in STATS_KEYS}
+    total = counters['hits'] + counters['misses']
+    counters['hit_ratio'] = counters['hits'] / total if total else 0.0
+    return counters
+
+
+def reset_stats():
+    """Remet à zéro les compteurs du cache d'objets."""
+    _cache().delete_many([f'obj:stats:{name}' for name in STATS_KEYS])
@@ -0,0 +1,226 @@
+"""
+Cache de réponses complètes et requêtes conditionnelles pour les pages publiques.
+
+Chaque page est rattachée à un ou plusieurs espaces de noms (``'lettings'``,
+``'profiles'``). Un espace possède une version, égale à l'horodatage de sa
+dernière modification, stockée dans le cache Django et renouvelée par les
+signaux des modèles concernés.
+
+À partir de ces versions, du chemin demandé et de la release déployée, le
+décorateur :func:`cached_page` calcule un ``ETag`` fort et un
+``Last-Modified`` *avant* d'appeler la vue. Une requête conditionnelle à jour
+reçoit directement un 304 ; sinon, la réponse est servie depuis le cache de
+pages ou rendue puis mise en cache sous la clé de son ``ETag``. Renouveler la
+version d'un espace rend donc obsolètes toutes les entrées qui en dépendent,
+sans avoir à les énumérer.
+
+Les versions ne sont cohérentes entre workers que si le cache est partagé
+(``SHARED_CACHE``) : un signal ne renouvelle la version que dans le cache du
+worker qui a traité la modification. Avec un cache propre à chaque worker,
+les versions expirent donc après ``PAGE_VERSION_TIMEOUT`` secondes, ce qui
+borne le retard des autres workers, et l'``ETag`` est faible : deux workers
+peuvent servir le même contenu sous des versions différentes.
+
+Les vues asynchrones sont décorées de la même façon : le décorateur accède
+alors au cache par :mod:`oc_lettings_site.async_cache`.
+"""
+import hashlib
+import os
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+from . import async_cache
+
+
+def _cache():
+    """Renvoie le backend de cache utilisé pour les pages."""
+    return caches[settings.PAGE_CACHE_ALIAS]
+
+
+def _version_key(namespace):
+    return f'page:version:{namespace}'
+
+
+def get_version(namespace):
+    """
+    Renvoie la version courante d'un espace de noms.
+
+    Une version absente du cache (démarrage, éviction, expiration) est
+    initialisée à l'instant présent, ce qui invalide prudemment les pages de
+    cet espace.
+
+    Args:
+        namespace (str): L'espace de noms.
+
+    Returns:
+        float: Horodatage de la dernière modification connue.
+    """
+    cache = _cache()
+    key = _version_key(namespace)
+    version = cache.get(key)
+    if version is None:
+        version = time.time()
+        # Un autre worker a pu initialiser la version entre-temps : la sienne prime
+        if not cache.add(key, version, timeout=settings.PAGE_VERSION_TIMEOUT):
+            version = cache.get(key, version)
+    return version
+
+
+async def aget_version(namespace):
+    """Version asynchrone de :func:`get_version`."""
+    cache = _cache()
+    key = _version_key(namespace)
+    version = await async_cache.call(cache, 'get', key)
+    if version is None:
+        version = time.time()
+        if not await async_cache.call(
+            cache, 'add', key, version, timeout=settings.PAGE_VERSION_TIMEOUT
+        ):
+            version = await async_cache.call(cache, 'get', key, version)
+    return version
+
+
+def bump_version(*namespaces):
+    """
+    Renouvelle la version des espaces de noms après une modification.
+
+    Args:
+        *namespaces (str): Les espaces de noms modifiés.
+    """
+    now = time.time()
+    _cache().set_many(
+        {_version_key(namespace): now for namespace in namespaces},
+        timeout=settings.PAGE_VERSION_TIMEOUT,
+    )
+
+
+def _validators(request, versions):
+    """
+    Calcule l'``ETag`` et la date de dernière modification d'une page à
+    partir des versions de ses espaces de noms.
+
+    L'``ETag`` est faible (``W/``) si le cache n'est pas partagé.
+
+    Returns:
+        tuple: ``(etag entre guillemets, timestamp ou None)``.
+    """
+    release = os.getenv("GITHUB_SHA", "local-dev")
+    payload = '|'.join([release, request.get_full_path(), *map(repr, versions)])
+    etag = '"%s"' % hashlib.sha1(payload.encode()).hexdigest()
+    if not settings.SHARED_CACHE:
+        etag = f'W/{etag}'
+    last_modified = int(max(versions)) if versions else None
+    return etag, last_modified
+
+
+def _response_from(cached):
+    """Reconstruit une réponse depuis une entrée du cache de pages."""
+    if cached is None:
+        return None
+    content, content_type = cached
+    return HttpResponse(content, content_type=content_type)
+
+
+def _cacheable(response):
+    """Indique si une réponse peut être mise en cache (200 non diffusée)."""
+    return response.status_code == 200 and not response.streaming
+
+
+def _load(etag):
+    """Reconstruit une réponse depuis le cache de pages, ou renvoie ``None``."""
+    return _response_from(_cache().get(f'page:body:{etag}'))
+
+
+def _store(etag, response):
+    """Met en cache le contenu d'une réponse 200 non diffusée."""
+    if _cacheable(response):
+        _cache().set(
+            f'page:body:{etag}',
+            (response.content, response['Content-Type']),
+            settings.PAGE_CACHE_TIMEOUT,
+        )
+
+
+async def _aload(etag):
+    """Version asynchrone de :func:`_load`."""
+    return _response_from(await async_cache.call(_cache(), 'get', f'page:body:{etag}'))
+
+
+async def _astore(etag, response):
+    """Version asynchrone de :func:`_store`."""
+    if _cacheable(response):
+        await async_cache.call(
+            _cache(), 'set', f'page:body:{etag}',
+            (response.content, response['Content-Type']),
+            settings.PAGE_CACHE_TIMEOUT,
+        )
+
+
+def _finalize(response, etag, last_modified):
+    """Ajoute les en-têtes de validation et de cache à la réponse."""
+    if response.status_code in (200, 304):
+        response.headers.setdefault('ETag', etag)
+        if last_modified is not None:
+            response.headers.setdefault('Last-Modified', http_date(last_modified))
+        patch_cache_control(response, public=True, max_age=settings.PAGE_CACHE_MAX_AGE)
+    return response
+
+
+def cached_page(*namespaces):
+    """
+    Décorateur de vue : cache de page versionné et réponses 304.
+
+    Seules les requêtes ``GET`` et ``HEAD`` sont concernées ; les autres
+    méthodes appellent la vue directement. S'applique aux vues synchrones
+    comme asynchrones.
+
+    Args:
+        *namespaces (str): Espaces de noms dont dépend le contenu de la page.
+            Une page sans espace (contenu statique) ne dépend que de la release.
+
+    Returns:
+        callable: Le décorateur à appliquer à la vue.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                if request.method not in ('GET', 'HEAD'):
+                    return await view(request, *args, **kwargs)
+                versions = [await aget_version(namespace) for namespace in namespaces]
+                etag, last_modified = _validators(request, versions)
+                response = get_conditional_response(
+                    request, etag=etag, last_modified=last_modified
+                )
+                if response is None:
+                    response = await _aload(etag)
+                if response is None:
+                    response = await view(request, *args, **kwargs)
+                    await _astore(etag, response)
+                return _finalize(response, etag, last_modified)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if request.method not in ('GET', 'HEAD'):
+                return view(request, *args, **kwargs)
+            versions = [get_version(namespace) for namespace in namespaces]
+            etag, last_modified = _validators(request, versions)
+            response = get_conditional_response(
+                request, etag=etag, last_modified=last_modified
+            )
+            if response is None:
+                response = _load(etag)
+            if response is None:
+                response = view(request, *args, **kwargs)
+                _store(etag, response)
+            return _finalize(response, etag, last_modified)
+        return wrapper
+    return decorator
@@ -0,0 +1,225 @@
+"""
+Pagination par curseur (keyset) sur une clé entière croissante.
+
+Contrairement à la pagination par ``OFFSET``, la base n'a jamais à parcourir
+les lignes des pages précédentes : chaque page est une simple recherche
+``WHERE id > curseur ORDER BY id LIMIT n`` sur l'index de clé primaire, ce qui
+garde une latence constante quelle que soit la profondeur de la page.
+
+Paramètres de requête reconnus :
+    ``after`` : renvoie les lignes dont la clé est strictement supérieure.
+    ``before`` : renvoie les lignes dont la clé est strictement inférieure.
+    ``size`` : taille de page demandée, bornée par ``PAGINATION_MAX_PAGE_SIZE``.
+
+Les listes de l'admin, paginées par ``OFFSET``, utilisent
+:class:`EstimatedCountPaginator`, qui évite le ``COUNT(*)`` d'une grande
+table non filtrée.
+"""
+from django.conf import settings
+from django.core.paginator import Paginator
+from django.db import connections
+from django.db.models import QuerySet
+from django.utils.functional import cached_property
+
+
+class KeysetPage:
+    """
+    Page de résultats issue d'une pagination par curseur.
+
+    Attributs :
+        object_list (list) : Lignes de la page, dans l'ordre croissant de la clé.
+        next_cursor (int | None) : Curseur ``after`` de la page suivante.
+        previous_cursor (int | None) : Curseur ``before`` de la page précédente.
+        size_param (int | None) : Taille demandée explicitement par le client,
+            à reporter dans les liens de navigation.
+    """
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None, size_param=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+        self.size_param = size_param
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+def _parse_int(value):
+    """Convertit un paramètre de requête en entier positif, ou ``None``."""
+    try:
+        value = int(value)
+    except (TypeError, ValueError):
+        return None
+    return value if value >= 0 else None
+
+
+def _key_of(row, key):
+    """Lit la clé de pagination sur une instance de modèle ou un dictionnaire."""
+    if isinstance(row, dict):
+        return row[key]
+    return getattr(row, key)
+
+
+def get_page_size(request, default):
+    """
+    Détermine la taille de page d'une requête.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue.
+        default (int): Taille utilisée quand ``size`` est absent ou invalide.
+
+    Returns:
+        tuple: ``(taille effective, taille demandée ou None)``, la taille
+               effective étant toujours comprise entre 1 et
+               ``PAGINATION_MAX_PAGE_SIZE``.
+    """
+    maximum = settings.PAGINATION_MAX_PAGE_SIZE
+    requested = _parse_int(request.GET.get('size'))
+    size = requested or default
+    return max(1, min(size, maximum)), requested
+
+
+def keyset_queryset(queryset, request, size, key='id'):
+    """
+    Restreint un queryset à la page désignée par les curseurs de la requête.
+
+    Une ligne supplémentaire est demandée pour savoir s'il existe une page
+    au-delà de celle-ci sans lancer de ``COUNT(*)``.
+
+    Args:
+        queryset (QuerySet): Le queryset à paginer.
+        request (HttpRequest): La requête HTTP reçue.
+        size (int): Nombre de lignes par page.
+        key (str): Nom du champ entier servant de curseur.
+
+    Returns:
+        QuerySet: Le queryset filtré, trié et limité à ``size + 1`` lignes.
+    """
+    after = _parse_int(request.GET.get('after'))
+    before = _parse_int(request.GET.get('before'))
+    if before is not None:
+        return queryset.filter(**{f'{key}__lt': before}).order_by(f'-{key}')[:size + 1]
+    if after is not None:
+        queryset = queryset.filter(**{f'{key}__gt': after})
+    return queryset.order_by(key)[:size + 1]
+
+
+def build_page(rows, request, size, key='id', size_param=None):
+    """
+    Construit une :class:`KeysetPage` à partir des lignes déjà évaluées.
+
+    Séparée de :func:`keyset_queryset` pour que les vues asynchrones puissent
+    évaluer le queryset elles-mêmes.
+
+    Args:
+        rows (iterable): Lignes renvoyées par le queryset de :func:`keyset_queryset`.
+        request (HttpRequest): La requête HTTP reçue.
+        size (int): Nombre de lignes par page.
+        key (str): Nom du champ entier servant de curseur.
+        size_param (int | None): Taille demandée explicitement par le client.
+
+    Returns:
+        KeysetPage: La page de résultats.
+    """
+    rows = list(rows)
+    has_more = len(rows) > size
+    rows = rows[:size]
+    backwards = _parse_int(request.GET.get('before')) is not None
+    if backwards:
+        rows.reverse()
+        has_next, has_previous = True, has_more
+    else:
+        has_next, has_previous = has_more, _parse_int(request.GET.get('after')) is not None
+
+    next_cursor = _key_of(rows[-1], key) if rows and has_next else None
+    previous_cursor = _key_of(rows[0], key) if rows and has_previous else None
+    return KeysetPage(rows, next_cursor, previous_cursor, size_param)
+
+
+def paginate(queryset, request, default_size, key='id'):
+    """
+    Pagine un queryset par curseur et renvoie la page demandée.
+
+    Args:
+        queryset (QuerySet): Le queryset à paginer.
+        request (HttpRequest): La requête HTTP reçue.
+        default_size (int): Taille de page par défaut de la vue.
+        key (str): Nom du champ entier servant de curseur.
+
+    Returns:
+        KeysetPage: La page de résultats.
+    """
+    size, requested = get_page_size(request, default_size)
+    rows = keyset_queryset(queryset, request, size, key)
+    return build_page(rows, request, size, key, requested)
+
+
+async def apaginate(queryset, request, default_size, key='id'):
+    """
+    Version asynchrone de :func:`paginate`, qui évalue le queryset par
+    itération asynchrone de l'ORM.
+
+    Returns:
+        KeysetPage: La page de résultats.
+    """
+    size, requested = get_page_size(request, default_size)
+    rows = [row async for row in keyset_queryset(queryset, request, size, key)]
+    return build_page(rows, request, size, key, requested)
+
+
+def estimated_count(model, using):
+    """
+    Estime le nombre de lignes de la table d'un modèle sans la parcourir.
+
+    Sous PostgreSQL, l'estimation des statistiques du planificateur
+    (``pg_class.reltuples``) ; sous SQLite, le plus grand ``rowid``, lu en
+    bout d'index (il surestime la table après des suppressions).
+
+    Returns:
+        int | None: L'estimation, ou ``None`` si le moteur n'en fournit pas.
+    """
+    connection = connections[using]
+    table = connection.ops.quote_name(model._meta.db_table)
+    with connection.cursor() as cursor:
+        if connection.vendor == 'postgresql':
+            cursor.execute("SELECT reltuples::bigint FROM pg_class WHERE oid = %s::regclass",
+                           [table])
+        elif connection.vendor == 'sqlite':
+            cursor.execute(f"SELECT MAX(rowid) FROM {table}")
+        else:
+            return None
+        row = cursor.fetchone()
+    # reltuples vaut -1 tant que la table n'a pas été analysée
+    return row[0] if row and row[0] is not None and row[0] >= 0 else None
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator de l'admin qui estime le nombre de lignes d'une grande table.
+
+    Sur une liste non filtrée dont l'estimation dépasse
+    ``ADMIN_EXACT_COUNT_LIMIT``, le nombre de pages est calculé depuis
+    :func:`estimated_count` au lieu d'un ``COUNT(*)`` qui parcourt toute la
+    table. Une liste filtrée ou recherchée, ou une petite table, garde un
+    décompte exact.
+    """
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if isinstance(queryset, QuerySet) and not queryset.query.where:
+            estimate = estimated_count(queryset.model, queryset.db)
+            if estimate is not None and estimate > settings.ADMIN_EXACT_COUNT_LIMIT:
+                return estimate
+        return super().count
@@ -0,0 +1,112 @@
+"""
+Limitation du débit des requêtes par adresse IP.
+
+Chaque adresse dispose de ``RATE_LIMIT_REQUESTS`` requêtes par fenêtre fixe
+de ``RATE_LIMIT_WINDOW`` secondes et par portée (``'letting'``,
+``'profile'``) ; au-delà, la vue n'est pas appelée et la réponse est un 429
+avec ``Retry-After``.
+
+Les compteurs sont tenus dans le cache ``local``, en mémoire du worker : pas
+d'aller-retour réseau par requête, au prix d'une limite appliquée par worker
+(un client réparti sur N workers peut atteindre N fois la limite). Cela
+suffit à freiner un robot qui énumère les identifiants.
+
+L'adresse est ``REMOTE_ADDR``, ou, derrière un proxy, la dernière adresse de
+l'en-tête ``RATE_LIMIT_IP_HEADER`` (celle ajoutée par le proxy, que le client
+ne peut pas falsifier).
+"""
+import time
+from functools import wraps
+
+from asgiref.sync import iscoroutinefunction
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+
+CACHE_ALIAS = 'local'
+
+
+def client_ip(request):
+    """Renvoie l'adresse IP du client d'une requête."""
+    header = settings.RATE_LIMIT_IP_HEADER
+    if header and request.META.get(header):
+        return request.META[header].rsplit(',', 1)[-1].strip()
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def hit(scope, ip, now=None):
+    """
+    Compte une requête d'une adresse et indique si elle dépasse la limite.
+
+    Args:
+        scope (str): Portée de la limite.
+        ip (str): Adresse du client.
+        now (float | None): Instant de la requête (par défaut, maintenant).
+
+    Returns:
+        int | None: Secondes avant la fin de la fenêtre si la limite est
+        dépassée, sinon ``None``.
+    """
+    limit = settings.RATE_LIMIT_REQUESTS
+    if limit <= 0:
+        return None
+    window = settings.RATE_LIMIT_WINDOW
+    now = time.time() if now is None else now
+    cache = caches[CACHE_ALIAS]
+    key = f'rl:{scope}:{ip}:{int(now // window)}'
+    if cache.add(key, 1, timeout=window):
+        count = 1
+    else:
+        try:
+            count = cache.incr(key)
+        except ValueError:
+            # La fenêtre a expiré entre add() et incr()
+            cache.set(key, 1, timeout=window)
+            count = 1
+    if count <= limit:
+        return None
+    return max(1, int(window - now % window))
+
+
+def _too_many_requests(retry_after):
+    response = HttpResponse(
+        "Trop de requêtes, réessayez plus tard.", status=429,
+        content_type='text/plain; charset=utf-8',
+    )
+    response['Retry-After'] = str(retry_after)
+    return response
+
+
+def rate_limited(scope):
+    """
+    Décorateur de vue : limite le débit de chaque adresse IP (voir le module).
+
+    À placer au-dessus de ``cached_page``, pour compter aussi les pages
+    servies depuis le cache. Le cache ``local`` n'effectuant aucune
+    entrée/sortie, les vues asynchrones l'appellent depuis la boucle
+    d'événements.
+
+    Args:
+        scope (str): Portée de la limite.
+
+    Returns:
+        callable: Le décorateur à appliquer à la vue.
+    """
+    def decorator(view):
+        if iscoroutinefunction(view):
+            @wraps(view)
+            async def async_wrapper(request, *args, **kwargs):
+                retry_after = hit(scope, client_ip(request))
+                if retry_after is not None:
+                    return _too_many_requests(retry_after)
+                return await view(request, *args, **kwargs)
+            return async_wrapper
+
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            retry_after = hit(scope, client_ip(request))
+            if retry_after is not None:
+                return _too_many_requests(retry_after)
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
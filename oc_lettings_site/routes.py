@@ -0,0 +1,96 @@
+"""
+Énumération des routes publiques du projet, avec des URLs d'exemple.
+
+Utilisé par les commandes qui appellent chaque vue (``explain_queries``,
+``benchmark``) : les paramètres d'URL sont remplis avec des valeurs lues en
+base et les routes qui n'interrogent la base qu'avec une chaîne de requête
+reçoivent celle de :data:`ROUTE_QUERY_STRINGS`. Les exports diffusés de
+:data:`EXCLUDED_ROUTES` sont écartés.
+"""
+import re
+
+from django.conf import settings
+from django.test import Client
+from django.urls import URLPattern, URLResolver, get_resolver
+
+from lettings.models import Letting
+from profiles.models import Profile
+
+# Paramètres de requête d'exemple des routes qui n'interrogent la base qu'avec eux
+ROUTE_QUERY_STRINGS = {
+    'lettings_search': {'q': 'house'},
+    'lettings_nearby': {'zip': '31525', 'radius': '50'},
+}
+
+# Exports du catalogue complet : ni pages à mesurer, ni requêtes à expliquer
+EXCLUDED_ROUTES = {'api_lettings_export'}
+
+
+def sample_kwargs():
+    """
+    Renvoie des valeurs d'exemple, lues en base, pour les paramètres d'URL.
+
+    Returns:
+        dict: Valeur par nom de paramètre ; un paramètre sans donnée est absent.
+    """
+    samples = {
+        'letting_id': Letting.objects.values_list('id', flat=True).first(),
+        'username': Profile.objects.values_list('user__username', flat=True).first(),
+    }
+    return {name: value for name, value in samples.items() if value is not None}
+
+
+def iter_routes(patterns=None, prefix=''):
+    """
+    Parcourt les routes nommées du projet, hors interface d'administration.
+
+    Yields:
+        tuple: ``(nom de la route, motif d'URL, URLPattern)``.
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+    for pattern in patterns:
+        if isinstance(pattern, URLResolver):
+            if pattern.app_name == 'admin':
+                continue
+            yield from iter_routes(pattern.url_patterns, prefix + str(pattern.pattern))
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            yield pattern.name, prefix + str(pattern.pattern), pattern
+
+
+def iter_route_urls(samples=None):
+    """
+    Parcourt les routes publiques avec une URL d'exemple pour chacune, hors
+    :data:`EXCLUDED_ROUTES`.
+
+    Args:
+        samples (dict | None): Valeurs des paramètres d'URL, par défaut
+            celles de :func:`sample_kwargs`.
+
+    Yields:
+        tuple: ``(nom, chemin, paramètres de requête, paramètres manquants)`` ;
+        le chemin vaut ``None`` lorsqu'un paramètre n'a pas de valeur.
+    """
+    if samples is None:
+        samples = sample_kwargs()
+    for name, route, pattern in iter_routes():
+        if name in EXCLUDED_ROUTES:
+            continue
+        params = list(pattern.pattern.converters)
+        missing = [param for param in params if param not in samples]
+        if missing:
+            yield name, None, {}, missing
+            continue
+        url = route
+        for param in params:
+            url = re.sub(rf'<(\w+:)?{param}>', str(samples[param]), url)
+        yield name, '/' + url, ROUTE_QUERY_STRINGS.get(name, {}), []
+
+
+def make_client():
+    """
+    Renvoie un client de test dont l'en-tête ``Host`` est accepté par
+    ``ALLOWED_HOSTS``.
+    """
+    host = next((h for h in settings.ALLOWED_HOSTS if h and '*' not in h), 'localhost')
+    return Client(HTTP_HOST=host.lstrip('.'))
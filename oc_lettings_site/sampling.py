@@ -0,0 +1,92 @@
+"""
+Échantillonnage adaptatif des traces de performance Sentry.
+
+Plutôt que de tracer toutes les requêtes, :func:`traces_sampler` choisit un
+taux par route d'après sa latence récente : une route lente est tracée
+jusqu'à ``SENTRY_TRACES_MAX_RATE``, une route rapide descend vers
+``SENTRY_TRACES_MIN_RATE``. La latence de chaque route est une moyenne
+mobile exponentielle tenue par le middleware de mesure
+(:mod:`oc_lettings_site.timing`), propre à chaque worker.
+"""
+from django.conf import settings
+
+# Poids de la dernière mesure dans la moyenne mobile
+EWMA_ALPHA = 0.2
+
+_latencies = {}
+
+
+def record(route, duration):
+    """
+    Ajoute la durée d'une requête à la moyenne mobile de sa route.
+
+    Args:
+        route (str): Nom de la route (``url_name``).
+        duration (float): Durée de la requête, en secondes.
+    """
+    previous = _latencies.get(route)
+    if previous is None:
+        _latencies[route] = duration
+    else:
+        _latencies[route] = previous + EWMA_ALPHA * (duration - previous)
+
+
+def sample_rate(route):
+    """
+    Renvoie le taux d'échantillonnage d'une route.
+
+    Le taux croît linéairement avec la latence moyenne de la route, du taux
+    minimal (latence nulle) au taux maximal (``SENTRY_SLOW_REQUEST_MS`` et
+    au-delà). Une route sans mesure reçoit ``SENTRY_TRACES_SAMPLE_RATE``.
+
+    Args:
+        route (str | None): Nom de la route.
+
+    Returns:
+        float: Taux entre 0 et 1.
+    """
+    latency = _latencies.get(route)
+    if latency is None:
+        return settings.SENTRY_TRACES_SAMPLE_RATE
+    low, high = settings.SENTRY_TRACES_MIN_RATE, settings.SENTRY_TRACES_MAX_RATE
+    slowness = min(1.0, latency * 1000 / settings.SENTRY_SLOW_REQUEST_MS)
+    return low + (high - low) * slowness
+
+
+def _path_of(sampling_context):
+    """Extrait le chemin demandé du contexte d'échantillonnage WSGI ou ASGI."""
+    environ = sampling_context.get('wsgi_environ')
+    if environ:
+        return environ.get('PATH_INFO', '')
+    scope = sampling_context.get('asgi_scope')
+    if scope:
+        return scope.get('path', '')
+    return None
+
+
+def traces_sampler(sampling_context):
+    """
+    ``traces_sampler`` de Sentry : taux d'échantillonnage d'une transaction.
+
+    La décision d'une trace parente (requête distribuée) est respectée.
+
+    Args:
+        sampling_context (dict): Contexte fourni par ``sentry_sdk``.
+
+    Returns:
+        float: Taux entre 0 et 1.
+    """
+    parent_sampled = sampling_context.get('parent_sampled')
+    if parent_sampled is not None:
+        return float(parent_sampled)
+    path = _path_of(sampling_context)
+    if path is None:
+        return settings.SENTRY_TRACES_SAMPLE_RATE
+
+    from django.urls import Resolver404, resolve
+
+    try:
+        route = resolve(path).url_name
+    except Resolver404:
+        route = None
+    return sample_rate(route)
@@ -0,0 +1,172 @@
+"""
+Dimensionnement du serveur gunicorn d'après les ressources du conteneur.
+
+Lu par ``gunicorn.conf.py`` dans le processus maître, avant le chargement de
+l'application : ce module n'importe pas Django.
+
+Les ressources disponibles sont celles du cgroup du conteneur (quota de CPU
+et limite mémoire, cgroup v2 ou v1), à défaut celles de la machine. Elles
+donnent :
+
+- le nombre de workers : ``2 × CPU + 1`` en WSGI, un par CPU en ASGI (une
+  boucle d'événements occupe un cœur), plafonné par la mémoire disponible à
+  raison de ``GUNICORN_WORKER_MEMORY_MB`` par worker ;
+- la classe de worker : ``sync``, ``gthread`` dès qu'il y a plusieurs
+  threads, ou le worker uvicorn en ASGI ;
+- le recyclage des workers après ``max_requests`` requêtes, décalé d'une
+  valeur aléatoire (``max_requests_jitter``) pour que les workers ne
+  redémarrent pas ensemble.
+
+Chaque valeur peut être imposée par une variable d'environnement (voir
+:data:`OVERRIDES`).
+"""
+import math
+import os
+
+CGROUP_ROOT = '/sys/fs/cgroup'
+
+UVICORN_WORKER = 'uvicorn_worker.UvicornWorker'
+
+# Variable d'environnement → (réglage gunicorn, conversion)
+OVERRIDES = {
+    'WEB_CONCURRENCY': ('workers', int),
+    'GUNICORN_THREADS': ('threads', int),
+    'GUNICORN_WORKER_CLASS': ('worker_class', str),
+    'GUNICORN_KEEPALIVE': ('keepalive', int),
+    'GUNICORN_TIMEOUT': ('timeout', int),
+    'GUNICORN_GRACEFUL_TIMEOUT': ('graceful_timeout', int),
+    'GUNICORN_MAX_REQUESTS': ('max_requests', int),
+    'GUNICORN_MAX_REQUESTS_JITTER': ('max_requests_jitter', int),
+}
+
+DEFAULT_WORKER_MEMORY_MB = 150
+# Part de la limite mémoire laissée aux workers (le reste : maître, cache disque...)
+MEMORY_HEADROOM = 0.8
+
+
+def _read(path):
+    try:
+        with open(path, encoding='ascii') as file:
+            return file.read().strip()
+    except OSError:
+        return None
+
+
+def _cgroup_paths(name, controller=None):
+    """
+    Renvoie les chemins candidats d'un fichier du cgroup du processus : dans
+    son propre cgroup, puis à la racine (vue d'un conteneur).
+    """
+    own = ''
+    for line in (_read('/proc/self/cgroup') or '').splitlines():
+        _, controllers, path = line.split(':', 2)
+        if (controller is None and controllers == '') or controller in controllers.split(','):
+            own = path
+    base = CGROUP_ROOT if controller is None else f'{CGROUP_ROOT}/{controller}'
+    return [f'{base}{own}/{name}', f'{base}/{name}']
+
+
+def _first(paths):
+    for path in paths:
+        value = _read(path)
+        if value is not None:
+            return value
+    return None
+
+
+def cpu_limit():
+    """
+    Renvoie le nombre de CPU disponibles, éventuellement fractionnaire.
+
+    Returns:
+        float: Quota du cgroup (``cpu.max`` en v2, ``cpu.cfs_quota_us`` en v1),
+        sinon CPU accessibles au processus.
+    """
+    try:
+        cpus = float(len(os.sched_getaffinity(0)))
+    except AttributeError:
+        cpus = float(os.cpu_count() or 1)
+    quota = _first(_cgroup_paths('cpu.max'))
+    if quota:
+        limit, period = quota.split()
+        if limit != 'max':
+            return min(cpus, int(limit) / int(period))
+        return cpus
+    limit = _first(_cgroup_paths('cpu.cfs_quota_us', 'cpu'))
+    period = _first(_cgroup_paths('cpu.cfs_period_us', 'cpu'))
+    if limit and period and int(limit) > 0:
+        return min(cpus, int(limit) / int(period))
+    return cpus
+
+
+def memory_limit():
+    """
+    Renvoie la mémoire disponible, en octets.
+
+    Returns:
+        int | None: Limite du cgroup (``memory.max`` en v2,
+        ``memory.limit_in_bytes`` en v1), sinon mémoire physique de la
+        machine ; ``None`` si elle est inconnue.
+    """
+    try:
+        physical = os.sysconf('SC_PAGE_SIZE') * os.sysconf('SC_PHYS_PAGES')
+    except (AttributeError, ValueError, OSError):
+        physical = None
+    limit = _first(_cgroup_paths('memory.max'))
+    if limit is None:
+        limit = _first(_cgroup_paths('memory.limit_in_bytes', 'memory'))
+    if limit is None or not limit.isdigit():
+        return physical
+    # Sans limite, le cgroup v1 annonce une valeur proche de 2**63
+    return min(int(limit), physical) if physical else int(limit)
+
+
+def server_settings(environ=None, cpus=None, memory=None):
+    """
+    Calcule les réglages gunicorn.
+
+    Args:
+        environ (dict | None): Variables d'environnement (par défaut
+            ``os.environ``) : ``SERVER_MODE``, ``GUNICORN_WORKER_MEMORY_MB``
+            et les variables de :data:`OVERRIDES`.
+        cpus (float | None): CPU disponibles (par défaut :func:`cpu_limit`).
+        memory (int | None): Mémoire disponible en octets (par défaut
+            :func:`memory_limit`).
+
+    Returns:
+        dict: ``worker_class``, ``workers``, ``threads``, ``keepalive``,
+        ``timeout``, ``graceful_timeout``, ``max_requests`` et
+        ``max_requests_jitter``.
+    """
+    environ = os.environ if environ is None else environ
+    cpus = cpu_limit() if cpus is None else cpus
+    memory = memory_limit() if memory is None else memory
+    asgi = environ.get('SERVER_MODE', 'wsgi') == 'asgi'
+
+    workers = max(1, math.ceil(cpus)) if asgi else 2 * max(1, math.ceil(cpus)) + 1
+    if memory:
+        worker_memory = int(environ.get('GUNICORN_WORKER_MEMORY_MB', DEFAULT_WORKER_MEMORY_MB))
+        by_memory = int(memory * MEMORY_HEADROOM) // (worker_memory * 1024 * 1024)
+        workers = max(1, min(workers, by_memory))
+
+    config = {
+        'worker_class': None,
+        'workers': workers,
+        'threads': 1,
+        'keepalive': 5,
+        'timeout': 30,
+        'graceful_timeout': 30,
+        'max_requests': 1000,
+        'max_requests_jitter': None,
+    }
+    for variable, (name, convert) in OVERRIDES.items():
+        if environ.get(variable):
+            config[name] = convert(environ[variable])
+    if config['worker_class'] is None:
+        if asgi:
+            config['worker_class'] = UVICORN_WORKER
+        else:
+            config['worker_class'] = 'gthread' if config['threads'] > 1 else 'sync'
+    if config['max_requests_jitter'] is None:
+        config['max_requests_jitter'] = config['max_requests'] // 10
+    return config
@@ -1,32 +1,34 @@
 import os
 from pathlib import Path
-from dotenv import load_dotenv
-import sentry_sdk
-from sentry_sdk.integrations.django import DjangoIntegration
-from sentry_sdk.integrations.logging import LoggingIntegration
 
+from oc_lettings_site.db_config import database_settings
 
-# Charger .env pour le développement local
-load_dotenv()
+
+BASE_DIR = Path(__file__).resolve().parent.parent
+
+# Charger .env pour le développement local : python-dotenv n'est importé que
+# si le fichier existe (absent en production, en CI et dans l'image Docker)
+DOTENV_PATH = BASE_DIR / '.env'
+if DOTENV_PATH.is_file():
+    from dotenv import load_dotenv
+
+    load_dotenv(DOTENV_PATH)
 
 SENTRY_DSN = os.getenv("SENTRY_DSN", "")
 SENTRY_ENV = os.getenv("SENTRY_ENV", "development")
 
-if SENTRY_DSN:
-    sentry_sdk.init(
-        dsn=SENTRY_DSN,
-        integrations=[
-            DjangoIntegration(),
-            LoggingIntegration(level=None, event_level=None),
-        ],
-        traces_sample_rate=1.0,
-        send_default_pii=True,
-        environment=SENTRY_ENV,
-        release=os.getenv("GITHUB_SHA", "local-dev"),
-    )
+# Échantillonnage adaptatif des traces (voir oc_lettings_site.sampling) :
+# taux d'une route inconnue, bornes du taux et latence jugée lente
+SENTRY_TRACES_SAMPLE_RATE = float(os.getenv("SENTRY_TRACES_SAMPLE_RATE", "0.1"))
+SENTRY_TRACES_MIN_RATE = float(os.getenv("SENTRY_TRACES_MIN_RATE", "0.01"))
+SENTRY_TRACES_MAX_RATE = float(os.getenv("SENTRY_TRACES_MAX_RATE", "1.0"))
+SENTRY_SLOW_REQUEST_MS = float(os.getenv("SENTRY_SLOW_REQUEST_MS", "500"))
 
+# Le SDK Sentry n'est importé que s'il est configuré (voir oc_lettings_site.monitoring)
+if SENTRY_DSN:
+    from oc_lettings_site.monitoring import init_sentry
 
-BASE_DIR = Path(__file__).resolve().parent.parent
+    init_sentry(SENTRY_DSN, SENTRY_ENV, os.getenv("GITHUB_SHA", "local-dev"))
 
 # Secrets et configuration depuis l'environnement
 SECRET_KEY = os.environ.get("SECRET_KEY", "unsafe-default-for-local")
@@ -49,23 +51,62 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'oc_lettings_site.timing.RequestTimingMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
+    'oc_lettings_site.middleware.PreloadLinkMiddleware',
+    'oc_lettings_site.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
+    'oc_lettings_site.middleware.AuthenticationMiddleware',
+    'oc_lettings_site.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
 
+# Pages publiques en lecture seule (accueil, lettings/, profiles/, api/) :
+# les middlewares de session, d'authentification et de messages les laissent
+# passer sans traitement (voir oc_lettings_site.middleware). Vide : toutes les
+# pages passent par ces middlewares.
+SESSIONLESS_PATHS = os.environ.get("SESSIONLESS_PATHS", r'^/(?:$|lettings/|profiles/|api/)')
+
+# Mode de service : 'wsgi' (workers gunicorn synchrones) ou 'asgi' (workers
+# uvicorn, positionné par oc_lettings_site.asgi). En ASGI, les vues de données
+# asynchrones sont routées à la place des vues synchrones, les middlewares sans
+# entrée/sortie s'exécutent dans la boucle d'événements (voir
+# oc_lettings_site.middleware) et WhiteNoise, qui n'a pas de chemin
+# asynchrone, cède la place aux fichiers statiques servis par l'application ASGI.
+SERVER_MODE = os.environ.get("SERVER_MODE", "wsgi")
+ASYNC_VIEWS = SERVER_MODE == "asgi"
+ASGI_MIDDLEWARE = [
+    'oc_lettings_site.timing.RequestTimingMiddleware',
+    'oc_lettings_site.middleware.SecurityMiddleware',
+    'oc_lettings_site.middleware.PreloadLinkMiddleware',
+    'oc_lettings_site.middleware.SessionMiddleware',
+    'oc_lettings_site.middleware.CommonMiddleware',
+    'oc_lettings_site.middleware.CsrfViewMiddleware',
+    'oc_lettings_site.middleware.AuthenticationMiddleware',
+    'oc_lettings_site.middleware.MessageMiddleware',
+    'oc_lettings_site.middleware.XFrameOptionsMiddleware',
+]
+if ASYNC_VIEWS:
+    MIDDLEWARE = ASGI_MIDDLEWARE
+
 ROOT_URLCONF = 'oc_lettings_site.urls'
 
+# Backend DjangoTemplates qui mesure le rendu (voir oc_lettings_site.timing)
+TEMPLATE_LOADERS = [
+    'django.template.loaders.filesystem.Loader',
+    'django.template.loaders.app_directories.Loader',
+]
+
+# En production, les templates compilés sont gardés en mémoire par le loader
+# en cache (préchargés au démarrage du worker, voir
+# oc_lettings_site.template_loading) ; en développement, ils sont relus à
+# chaque rendu.
 TEMPLATES = [
     {
-        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'BACKEND': 'oc_lettings_site.timing.TimedDjangoTemplates',
         'DIRS': [BASE_DIR / 'templates'],
-        'APP_DIRS': True,
         'OPTIONS': {
             'context_processors': [
                 'django.template.context_processors.debug',
@@ -73,18 +114,205 @@ TEMPLATES = [
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
             ],
+            'loaders': TEMPLATE_LOADERS if DEBUG else [
+                ('django.template.loaders.cached.Loader', TEMPLATE_LOADERS),
+            ],
         },
     },
 ]
 
 WSGI_APPLICATION = 'oc_lettings_site.wsgi.application'
 
-# Database
+# Database, décrite par DATABASE_URL (voir oc_lettings_site.db_config) :
+# sqlite:////chemin/absolu ou postgres://utilisateur:mot-de-passe@hôte/base.
+# Sans DATABASE_URL, la base SQLite de SQLITE_PATH (par défaut la base du
+# dépôt ; par exemple un jeu de données créé par seed_benchmark_data).
+SQLITE_PATH = Path(os.environ.get("SQLITE_PATH", BASE_DIR / 'oc-lettings-site.sqlite3'))
+DATABASE_URL = os.environ.get("DATABASE_URL", f"sqlite:///{SQLITE_PATH}")
+
+# Mode de journal SQLite : WAL, où les lectures ne bloquent plus l'écriture et
+# inversement. Enregistré dans le fichier, il est appliqué une seule fois au
+# déploiement (manage.py set_journal_mode, lancé par entrypoint.sh) et non à
+# chaque connexion, qui réécrirait l'en-tête de la base versionnée du dépôt.
+SQLITE_JOURNAL_MODE = os.environ.get("SQLITE_JOURNAL_MODE", "WAL")
+
+# Pragmas appliqués à chaque ouverture de connexion SQLite : synchronisation
+# allégée sûre en WAL, lecture par mmap, cache de pages de 64 Mo et attente
+# de 5 s sur un verrou au lieu d'une erreur « database is locked ».
+SQLITE_PRAGMAS = {
+    'synchronous': 'NORMAL',
+    'mmap_size': 268435456,
+    'cache_size': -64000,
+    'busy_timeout': 5000,
+    'temp_store': 'MEMORY',
+}
+
+# Connexions persistantes ; désactivées par défaut en ASGI, où chaque requête
+# s'exécute dans un thread différent et laisserait ses connexions ouvertes
+CONN_MAX_AGE = int(os.environ.get("CONN_MAX_AGE", "0" if ASYNC_VIEWS else "600"))
+
+# Pool de connexions psycopg de PostgreSQL, propre à chaque worker
+# (DATABASE_POOL=False pour revenir aux connexions persistantes)
+DATABASE_POOL = None
+if os.environ.get("DATABASE_POOL", "True") == "True":
+    DATABASE_POOL = {
+        'min_size': int(os.environ.get("DATABASE_POOL_MIN_SIZE", "2")),
+        'max_size': int(os.environ.get("DATABASE_POOL_MAX_SIZE", "10")),
+        'timeout': float(os.environ.get("DATABASE_POOL_TIMEOUT", "10")),
+    }
+
+DATABASE_OPTIONS = {
+    'conn_max_age': CONN_MAX_AGE,
+    'pool': DATABASE_POOL,
+    'sqlite_pragmas': SQLITE_PRAGMAS,
+}
+
 DATABASES = {
+    'default': database_settings(DATABASE_URL, **DATABASE_OPTIONS),
+}
+
+# Alias de lecture des vues publiques (voir oc_lettings_site.db_routing)
+READ_DATABASE_ALIASES = []
+
+# DATABASE_REPLICA_URLS (URLs séparées par des virgules) déclare des réplicas
+# en lecture seule, « replica_1 », « replica_2 »... entre lesquels sont
+# réparties les lectures des vues publiques. En test, ils se confondent avec
+# « default ».
+DATABASE_REPLICA_URLS = [
+    url.strip() for url in os.environ.get("DATABASE_REPLICA_URLS", "").split(",")
+    if url.strip()
+]
+for index, replica_url in enumerate(DATABASE_REPLICA_URLS, start=1):
+    DATABASES[f'replica_{index}'] = database_settings(
+        replica_url, read_only=True, **DATABASE_OPTIONS
+    )
+    READ_DATABASE_ALIASES.append(f'replica_{index}')
+
+# SQLITE_READ_ONLY=True ajoute l'alias « readonly » : une connexion au même
+# fichier SQLite ouverte en lecture seule, vers laquelle sont dirigées les
+# lectures des vues publiques.
+if os.environ.get("SQLITE_READ_ONLY", "False") == "True":
+    DATABASES['readonly'] = database_settings(
+        f"sqlite:///{SQLITE_PATH}", read_only=True, **DATABASE_OPTIONS
+    )
+    READ_DATABASE_ALIASES.append('readonly')
+
+DATABASE_ROUTERS = ['oc_lettings_site.db_routing.ReadDatabaseRouter']
+
+# Cache : mémoire locale par défaut, backend remplaçable par l'environnement
+# (ex. CACHE_BACKEND=django.core.cache.backends.redis.RedisCache,
+# CACHE_LOCATION=redis://localhost:6379/1)
+CACHE_BACKEND = os.environ.get("CACHE_BACKEND", 'django.core.cache.backends.locmem.LocMemCache')
+CACHE_LOCATION = os.environ.get("CACHE_LOCATION", 'oc-lettings')
+# Un backend hors de cette liste est partagé par les workers (Redis, Memcached,
+# base de données) : une écriture d'un worker est vue par tous les autres
+PROCESS_LOCAL_CACHE_BACKENDS = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+SHARED_CACHE = CACHE_BACKEND not in PROCESS_LOCAL_CACHE_BACKENDS
+# Avec un cache propre à chaque worker, une modification n'invalide que le
+# cache du worker qui l'a traitée : les versions des pages et les objets mis
+# en cache y expirent donc au plus tard après ce délai (secondes), et les ETag
+# des pages sont faibles (voir oc_lettings_site.page_cache)
+LOCAL_CACHE_MAX_STALENESS = int(os.environ.get("LOCAL_CACHE_MAX_STALENESS", "30"))
+
+CACHES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
-        'NAME': BASE_DIR / 'oc-lettings-site.sqlite3',
-    }
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+    },
+    # Fragments {% cache %} des templates (en-tête, navigation, pied de page) :
+    # les clés sont préfixées par la release, un déploiement (et ses nouvelles
+    # URLs statiques) repart donc de fragments neufs
+    'template_fragments': {
+        'BACKEND': CACHE_BACKEND,
+        'LOCATION': CACHE_LOCATION,
+        'KEY_PREFIX': os.getenv("GITHUB_SHA", "local-dev"),
+    },
+    # Mémoire du worker, quel que soit CACHE_BACKEND : compteurs de la
+    # limitation de débit, sans aller-retour réseau
+    'local': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+        'LOCATION': 'oc-lettings-local',
+    },
+}
+
+# Sessions (administration) : en base par défaut. Avec un cache partagé
+# (SHARED_CACHE), cached_db les lit dans le cache et les écrit en base et dans
+# le cache. Jamais avec un cache propre à chaque worker : cached_db fait
+# confiance à une session trouvée en cache, et une déconnexion, un flush() ou
+# un changement de mot de passe traité par un worker laisserait la session
+# valide dans le cache des autres jusqu'à son expiration.
+# SESSION_ENGINE=django.contrib.sessions.backends.cache ne les garde qu'en
+# cache : à réserver à un cache partagé entre workers et persistant (Redis).
+SESSION_ENGINE = os.environ.get("SESSION_ENGINE", (
+    'django.contrib.sessions.backends.cached_db' if SHARED_CACHE
+    else 'django.contrib.sessions.backends.db'
+))
+SESSION_CACHE_ALIAS = os.environ.get("SESSION_CACHE_ALIAS", 'default')
+
+# Cache d'objets des pages de détail (voir oc_lettings_site.object_cache)
+OBJECT_CACHE_ALIAS = os.environ.get("OBJECT_CACHE_ALIAS", 'default')
+OBJECT_CACHE_TIMEOUT = int(os.environ.get(
+    "OBJECT_CACHE_TIMEOUT", "3600" if SHARED_CACHE else str(LOCAL_CACHE_MAX_STALENESS)
+))
+# Durée de mémorisation d'un objet absent (404 des identifiants inconnus)
+OBJECT_CACHE_MISS_TIMEOUT = int(os.environ.get(
+    "OBJECT_CACHE_MISS_TIMEOUT", "60" if SHARED_CACHE else str(LOCAL_CACHE_MAX_STALENESS)
+))
+
+# Limitation du débit des pages de détail, par adresse IP et par worker
+# (voir oc_lettings_site.rate_limit) ; 0 : désactivée
+RATE_LIMIT_REQUESTS = int(os.environ.get("RATE_LIMIT_REQUESTS", "120"))
+RATE_LIMIT_WINDOW = int(os.environ.get("RATE_LIMIT_WINDOW", "60"))
+# En-tête de l'adresse du client posé par le proxy (ex. HTTP_X_FORWARDED_FOR) ;
+# vide : REMOTE_ADDR
+RATE_LIMIT_IP_HEADER = os.environ.get("RATE_LIMIT_IP_HEADER", "")
+
+# Cache des pages publiques et en-têtes ETag/Last-Modified
+# (voir oc_lettings_site.page_cache)
+PAGE_CACHE_ALIAS = os.environ.get("PAGE_CACHE_ALIAS", 'default')
+PAGE_CACHE_TIMEOUT = int(os.environ.get("PAGE_CACHE_TIMEOUT", "600"))
+PAGE_CACHE_MAX_AGE = int(os.environ.get("PAGE_CACHE_MAX_AGE", "0"))
+# Durée de vie des versions des espaces de noms : illimitée dans un cache
+# partagé, bornée sinon
+PAGE_VERSION_TIMEOUT = None if SHARED_CACHE else LOCAL_CACHE_MAX_STALENESS
+
+# Journalisation : progression des migrations de données sur la console
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler'},
+    },
+    'loggers': {
+        'lettings.migrations': {'handlers': ['console'], 'level': 'INFO'},
+        'profiles.migrations': {'handlers': ['console'], 'level': 'INFO'},
+        'oc_lettings_site.timing': {
+            'handlers': ['console'],
+            'level': os.environ.get("REQUEST_LOG_LEVEL", 'INFO'),
+            'propagate': False,
+        },
+    },
+}
+
+# Budget de requêtes SQL par vue (nom de route) : au-delà, le middleware de
+# mesure journalise un avertissement
+QUERY_BUDGET_DEFAULT = int(os.environ.get("QUERY_BUDGET_DEFAULT", "20"))
+QUERY_BUDGETS = {
+    'index': 0,
+    'lettings_index': 1,
+    'letting': 1,
+    'lettings_search': 1,
+    'lettings_nearby': 4,
+    'profiles_index': 1,
+    'profile': 1,
+    'api_lettings': 1,
+    'api_letting': 1,
+    'api_profiles': 1,
+    'api_profile': 1,
+    'api_lettings_export': 1,
 }
 
 # Password validation
@@ -102,10 +330,48 @@ USE_I18N = True
 USE_L10N = True
 USE_TZ = True
 
-# Static files
-STATIC_ROOT = BASE_DIR / 'static'
+# Static files : sources dans static/, collectées, minifiées, empreintées et
+# précompressées dans staticfiles/ par build_assets (voir oc_lettings_site.assets)
+STATICFILES_DIRS = [BASE_DIR / 'static']
+STATIC_ROOT = BASE_DIR / 'staticfiles'
 STATIC_URL = '/static/'
-# STATICFILES_DIRS = [BASE_DIR / 'staticfiles']
-STATICFILES_STORAGE = 'whitenoise.storage.CompressedManifestStaticFilesStorage'
+STORAGES = {
+    'default': {'BACKEND': 'django.core.files.storage.FileSystemStorage'},
+    'staticfiles': {'BACKEND': 'oc_lettings_site.assets.AssetStorage'},
+}
+
+# Ressources critiques annoncées par un en-tête Link: rel=preload sur les pages
+# HTML (voir oc_lettings_site.middleware.PreloadLinkMiddleware) : (fichier, type)
+PRELOAD_ASSETS = [
+    ('css/styles.css', 'style'),
+    ('feather.min.js', 'script'),
+    ('js/scripts.js', 'script'),
+]
 
 DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+# Pagination par curseur des pages de liste
+LETTINGS_PAGE_SIZE = int(os.environ.get("LETTINGS_PAGE_SIZE", "50"))
+PROFILES_PAGE_SIZE = int(os.environ.get("PROFILES_PAGE_SIZE", "50"))
+PAGINATION_MAX_PAGE_SIZE = int(os.environ.get("PAGINATION_MAX_PAGE_SIZE", "200"))
+
+# Listes de l'admin : au-delà de ce nombre de lignes (estimé), une liste non
+# filtrée n'est plus comptée exactement (voir oc_lettings_site.pagination)
+ADMIN_EXACT_COUNT_LIMIT = int(os.environ.get("ADMIN_EXACT_COUNT_LIMIT", "10000"))
+
+# Taille des blocs de la liste des profils diffusée (?stream=1)
+PROFILES_STREAM_CHUNK_SIZE = int(os.environ.get("PROFILES_STREAM_CHUNK_SIZE", "500"))
+
+# Taille des lots lus et encodés par l'export diffusé des locations
+EXPORT_CHUNK_SIZE = int(os.environ.get("EXPORT_CHUNK_SIZE", "2000"))
+
+# Recherche plein texte des locations
+SEARCH_PAGE_SIZE = int(os.environ.get("SEARCH_PAGE_SIZE", "20"))
+SEARCH_MAX_PAGES = int(os.environ.get("SEARCH_MAX_PAGES", "50"))
+SEARCH_MAX_QUERY_LENGTH = 200
+
+# Recherche de proximité des locations (rayon en km, nombre de résultats)
+NEARBY_DEFAULT_RADIUS_KM = float(os.environ.get("NEARBY_DEFAULT_RADIUS_KM", "25"))
+NEARBY_MAX_RADIUS_KM = float(os.environ.get("NEARBY_MAX_RADIUS_KM", "100"))
+NEARBY_DEFAULT_RESULTS = int(os.environ.get("NEARBY_DEFAULT_RESULTS", "10"))
+NEARBY_MAX_RESULTS = int(os.environ.get("NEARBY_MAX_RESULTS", "50"))
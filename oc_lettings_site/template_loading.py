@@ -0,0 +1,67 @@
+"""
+Préchargement des templates du projet dans le loader en cache.
+
+En production, ``TEMPLATES`` utilise le loader en cache de Django : un
+template n'est lu et compilé qu'une fois par worker. :func:`warm_template_cache`
+compile d'avance tous les templates du projet (hors applications tierces),
+au chargement de l'application WSGI ou ASGI, pour que la première requête de
+chaque page ne paie pas cette compilation. Une erreur de syntaxe dans un
+template empêche alors le démarrage au lieu d'apparaître sur une page.
+"""
+from pathlib import Path
+
+from django.conf import settings
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.template.loaders.cached import Loader as CachedLoader
+from django.template.utils import get_app_template_dirs
+
+
+def project_template_names(engine):
+    """
+    Renvoie les noms des templates du projet visibles par un moteur.
+
+    Sont parcourus les dossiers ``DIRS`` du moteur et les dossiers
+    ``templates`` des applications situées dans ``BASE_DIR``, hors pages de
+    l'admin (``admin/``), qui ne servent pas le trafic public.
+
+    Args:
+        engine (DjangoTemplates): Moteur de templates.
+
+    Returns:
+        list[str]: Noms de templates (``'lettings/index.html'``...), sans doublon.
+    """
+    base_dir = Path(settings.BASE_DIR).resolve()
+    app_dirs = [
+        directory for directory in get_app_template_dirs('templates')
+        if Path(directory).resolve().is_relative_to(base_dir)
+    ]
+    names = {}
+    for directory in [*engine.dirs, *app_dirs]:
+        directory = Path(directory)
+        for path in sorted(directory.rglob('*.html')):
+            name = path.relative_to(directory).as_posix()
+            if not name.startswith('admin/'):
+                names.setdefault(name, None)
+    return list(names)
+
+
+def warm_template_cache():
+    """
+    Compile les templates du projet dans le loader en cache de chaque moteur
+    Django qui en utilise un.
+
+    Returns:
+        int: Nombre de templates compilés.
+    """
+    count = 0
+    for engine in engines.all():
+        if not isinstance(engine, DjangoTemplates):
+            continue
+        loaders = engine.engine.template_loaders
+        if not any(isinstance(loader, CachedLoader) for loader in loaders):
+            continue
+        for name in project_template_names(engine):
+            engine.get_template(name)
+            count += 1
+    return count
@@ -0,0 +1,21 @@
+"""
+Balises de template des fichiers statiques du projet.
+"""
+from django import template
+
+from oc_lettings_site.assets import vendor_url
+
+register = template.Library()
+
+
+@register.simple_tag
+def vendor(name):
+    """
+    Renvoie l'URL d'une bibliothèque tierce de
+    :data:`oc_lettings_site.assets.VENDOR_ASSETS` : sa copie locale si elle a
+    été construite, sinon son CDN.
+
+    Usage :
+        <script src="{% vendor 'feather.min.js' %}"></script>
+    """
+    return vendor_url(name)
@@ -0,0 +1,169 @@
+"""
+Mesure du temps passé par chaque requête en base, en rendu de templates et
+au total.
+
+:class:`RequestTimingMiddleware` ouvre un relevé (:class:`RequestTimings`)
+pour la requête, dans une variable de contexte qui suit la requête jusque
+dans le pool de threads des vues asynchrones. Les requêtes SQL y sont
+ajoutées par un ``execute_wrapper`` posé sur chaque connexion à son
+ouverture, et le rendu des templates par le backend
+:class:`TimedDjangoTemplates`.
+
+En fin de requête, le middleware :
+
+- ajoute un en-tête ``Server-Timing`` (``db``, ``tpl``, ``total``), lisible
+  dans l'onglet réseau du navigateur ;
+- écrit une ligne de journal JSON sur le logger ``oc_lettings_site.timing`` ;
+- avertit lorsque la vue dépasse son budget de requêtes SQL
+  (``QUERY_BUDGETS``, sinon ``QUERY_BUDGET_DEFAULT``) ;
+- transmet la durée à l'échantillonnage adaptatif des traces Sentry et aux
+  compteurs du worker (:mod:`oc_lettings_site.worker_stats`).
+"""
+import json
+import logging
+import time
+from contextvars import ContextVar
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.template.backends.django import DjangoTemplates
+
+from . import sampling, worker_stats
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_timings', default=None)
+
+
+class RequestTimings:
+    """Relevé des mesures d'une requête en cours."""
+
+    __slots__ = ('start', 'queries', 'db', 'template')
+
+    def __init__(self):
+        self.start = time.perf_counter()
+        self.queries = 0
+        self.db = 0.0
+        self.template = 0.0
+
+
+def timed_execute(execute, sql, params, many, context):
+    """``execute_wrapper`` qui ajoute chaque requête SQL au relevé en cours."""
+    timings = _current.get()
+    if timings is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        timings.queries += 1
+        timings.db += time.perf_counter() - start
+
+
+def install_query_timer(sender, connection, **kwargs):
+    """
+    Receveur de ``connection_created`` : pose :func:`timed_execute` sur la
+    connexion, une seule fois et en première position pour ne pas perturber
+    les ``execute_wrapper`` temporaires.
+    """
+    if timed_execute not in connection.execute_wrappers:
+        connection.execute_wrappers.insert(0, timed_execute)
+
+
+class TimedTemplate:
+    """Template du backend Django dont le rendu est ajouté au relevé en cours."""
+
+    def __init__(self, template):
+        self.template = template
+
+    def __getattr__(self, name):
+        return getattr(self.template, name)
+
+    def render(self, context=None, request=None):
+        timings = _current.get()
+        if timings is None:
+            return self.template.render(context, request)
+        start = time.perf_counter()
+        try:
+            return self.template.render(context, request)
+        finally:
+            timings.template += time.perf_counter() - start
+
+
+class TimedDjangoTemplates(DjangoTemplates):
+    """Backend ``DjangoTemplates`` qui mesure le rendu de chaque template."""
+
+    def from_string(self, template_code):
+        return TimedTemplate(super().from_string(template_code))
+
+    def get_template(self, template_name):
+        return TimedTemplate(super().get_template(template_name))
+
+
+class RequestTimingMiddleware:
+    """
+    Middleware de mesure des requêtes, compatible WSGI et ASGI.
+
+    À placer en tête de ``MIDDLEWARE`` pour que la durée totale couvre toute
+    la chaîne.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings)
+
+    async def __acall__(self, request):
+        timings = RequestTimings()
+        token = _current.set(timings)
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        return self._finish(request, response, timings)
+
+    def _finish(self, request, response, timings):
+        total = time.perf_counter() - timings.start
+        match = request.resolver_match
+        route = match.url_name if match else None
+        if route:
+            sampling.record(route, total)
+        worker_stats.record(route, total)
+
+        response.headers['Server-Timing'] = (
+            f'db;dur={timings.db * 1000:.2f};desc="{timings.queries} queries", '
+            f'tpl;dur={timings.template * 1000:.2f}, '
+            f'total;dur={total * 1000:.2f}'
+        )
+        record = {
+            'method': request.method,
+            'path': request.path,
+            'route': route,
+            'status': response.status_code,
+            'queries': timings.queries,
+            'db_ms': round(timings.db * 1000, 2),
+            'template_ms': round(timings.template * 1000, 2),
+            'total_ms': round(total * 1000, 2),
+        }
+        logger.info(json.dumps(record))
+
+        budget = settings.QUERY_BUDGETS.get(route, settings.QUERY_BUDGET_DEFAULT)
+        if timings.queries > budget:
+            warning = dict(record, event='query_budget_exceeded', budget=budget)
+            logger.warning(json.dumps(warning))
+        return response
@@ -4,22 +4,62 @@ Configuration des URLs principales de l'application.
         '' : page d'accueil, handled par views.index
         'lettings/' : liste des locations, handled par lettings.views.index \n
         'lettings/<int:letting_id>/' : détails d'une location,handled par lettings.views.letting \n
+        'lettings/search/' : recherche plein texte, handled par lettings.views.search \n
+        'lettings/nearby/' : locations les plus proches d'un point,
+            handled par lettings.views.nearby \n
         'profiles/' : liste des profils, handled par profiles.views.index \n
         'profiles/<str:username>/' : détails d'un profil, handled par profiles.views.profile \n
+        'api/lettings/', 'api/lettings/<int:letting_id>/' : API JSON des locations,
+            handled par lettings.api \n
+        'api/lettings/export/' : export diffusé des locations (NDJSON ou CSV),
+            handled par lettings.api.export \n
+        'api/profiles/', 'api/profiles/<str:username>/' : API JSON des profils,
+            handled par profiles.api \n
         'admin/' : interface d'administration Django
+
+    Les erreurs 404 sont rendues par ``views.page_not_found`` (``handler404``).
+
+    En mode ASGI (``settings.ASYNC_VIEWS``), les routes de liste et de détail
+    et l'export sont servis par les versions asynchrones des vues.
 """
+from django.conf import settings
 from django.contrib import admin
 from django.urls import path
+import lettings.api
 import lettings.views
+import profiles.api
 import profiles.views
 from . import views
 
 
+if settings.ASYNC_VIEWS:
+    data_views = (
+        lettings.views.index_async, lettings.views.letting_async,
+        profiles.views.index_async, profiles.views.profile_async,
+        lettings.api.export_async,
+    )
+else:
+    data_views = (
+        lettings.views.index, lettings.views.letting,
+        profiles.views.index, profiles.views.profile,
+        lettings.api.export,
+    )
+lettings_index, letting, profiles_index, profile, lettings_export = data_views
+
 urlpatterns = [
     path('', views.index, name='index'),
-    path('lettings/', lettings.views.index, name='lettings_index'),
-    path('lettings/<int:letting_id>/', lettings.views.letting, name='letting'),
-    path('profiles/', profiles.views.index, name='profiles_index'),
-    path('profiles/<str:username>/', profiles.views.profile, name='profile'),
+    path('lettings/', lettings_index, name='lettings_index'),
+    path('lettings/<int:letting_id>/', letting, name='letting'),
+    path('lettings/search/', lettings.views.search, name='lettings_search'),
+    path('lettings/nearby/', lettings.views.nearby, name='lettings_nearby'),
+    path('profiles/', profiles_index, name='profiles_index'),
+    path('profiles/<str:username>/', profile, name='profile'),
+    path('api/lettings/', lettings.api.letting_list, name='api_lettings'),
+    path('api/lettings/<int:letting_id>/', lettings.api.letting_detail, name='api_letting'),
+    path('api/lettings/export/', lettings_export, name='api_lettings_export'),
+    path('api/profiles/', profiles.api.profile_list, name='api_profiles'),
+    path('api/profiles/<str:username>/', profiles.api.profile_detail, name='api_profile'),
     path('admin/', admin.site.urls),
 ]
+
+handler404 = views.page_not_found
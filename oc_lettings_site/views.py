@@ -1,11 +1,32 @@
+from django.http import HttpResponseNotFound
 from django.shortcuts import render
+from django.template.loader import render_to_string
 import os
+from .page_cache import cached_page
 
+# Corps de la page 404, rendu au premier appel de page_not_found
+_not_found_page = None
 
+
+@cached_page()
 def index(request):
     return render(request, 'index.html')
 
 
+def page_not_found(request, exception):
+    """
+    Vue des erreurs 404 (``handler404``) : ``templates/404.html``.
+
+    La page ne dépend pas de la requête ; elle est rendue une fois par
+    processus, et les 404 suivantes (robots qui énumèrent les identifiants)
+    ne coûtent plus de rendu.
+    """
+    global _not_found_page
+    if _not_found_page is None:
+        _not_found_page = render_to_string('404.html', request=request)
+    return HttpResponseNotFound(_not_found_page)
+
+
 def sentry_settings(request):
     return {
         "SENTRY_DSN": os.getenv("SENTRY_DSN", ""),
@@ -0,0 +1,79 @@
+"""
+Compteurs de requêtes et histogramme des latences d'un worker.
+
+Le middleware de mesure (:mod:`oc_lettings_site.timing`) y ajoute la durée de
+chaque requête ; le hook ``worker_exit`` de ``gunicorn.conf.py`` journalise
+le résumé du worker à son arrêt (redémarrage après ``max_requests``,
+arrêt du serveur). Les compteurs sont propres à chaque processus.
+
+Le résumé porte aussi les hits et misses du cache d'objets : avec le cache
+par défaut, propre à chaque worker (``SHARED_CACHE`` faux), ce journal est le
+seul endroit où ils sont lisibles, ``cache_stats`` s'exécutant dans son
+propre processus.
+"""
+import threading
+
+from . import object_cache
+
+# Bornes supérieures des classes de l'histogramme, en millisecondes
+BUCKETS_MS = (1, 2, 5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000)
+
+_lock = threading.Lock()
+_routes = {}
+_histogram = [0] * (len(BUCKETS_MS) + 1)
+
+
+def record(route, duration):
+    """
+    Compte une requête et classe sa durée dans l'histogramme.
+
+    Args:
+        route (str | None): Nom de la route (``url_name``).
+        duration (float): Durée de la requête, en secondes.
+    """
+    milliseconds = duration * 1000
+    bucket = next(
+        (index for index, bound in enumerate(BUCKETS_MS) if milliseconds <= bound),
+        len(BUCKETS_MS),
+    )
+    with _lock:
+        _routes[route] = _routes.get(route, 0) + 1
+        _histogram[bucket] += 1
+
+
+def _percentile(histogram, rank):
+    """Renvoie la borne de la classe qui contient le percentile ``rank`` (0-100)."""
+    total = sum(histogram)
+    threshold = rank / 100 * total
+    seen = 0
+    for index, count in enumerate(histogram):
+        seen += count
+        if count and seen >= threshold:
+            return BUCKETS_MS[index] if index < len(BUCKETS_MS) else None
+    return None
+
+
+def summary():
+    """
+    Renvoie le résumé des requêtes servies par le worker.
+
+    Returns:
+        dict: ``requests``, ``routes`` (requêtes par route), ``histogram``
+        (requêtes par classe, ``'<=10ms'``... ``'>5000ms'``), ``p50_ms`` et
+        ``p99_ms`` (borne supérieure de leur classe, ``None`` au-delà de la
+        dernière), et ``object_cache`` (compteurs du cache d'objets, ceux du
+        worker ou, avec un cache partagé, ceux de tous les workers).
+    """
+    with _lock:
+        histogram = list(_histogram)
+        routes = dict(_routes)
+    labels = [f'<={bound}ms' for bound in BUCKETS_MS] + [f'>{BUCKETS_MS[-1]}ms']
+    return {
+        'requests': sum(histogram),
+        'routes': {str(route): count for route, count in sorted(
+            routes.items(), key=lambda item: item[1], reverse=True)},
+        'histogram': {label: count for label, count in zip(labels, histogram) if count},
+        'p50_ms': _percentile(histogram, 50),
+        'p99_ms': _percentile(histogram, 99),
+        'object_cache': object_cache.stats(),
+    }
@@ -0,0 +1,42 @@
+"""
+Ressources des workers gunicorn, avec ou sans préchargement de l'application.
+
+Avec ``preload_app`` (voir ``gunicorn.conf.py``), l'application est importée
+une seule fois par le processus maître : réglages, modèles, URLs et templates
+compilés sont partagés par copie sur écriture entre les workers, qui
+démarrent sans rien réimporter. Les ressources propres à un processus ne
+doivent en revanche pas traverser le ``fork`` :
+
+- :func:`prepare_fork`, dans le maître avant chaque ``fork``, ferme les
+  connexions aux bases et aux caches qu'il aurait ouvertes (un socket
+  partagé entre deux processus mélangerait leurs échanges) et gèle les
+  objets déjà alloués hors du ramasse-miettes, pour que ses passages dans
+  les workers ne touchent pas — et ne recopient pas — les pages partagées ;
+- :func:`init_worker`, dans chaque worker après le ``fork``, réinitialise
+  le générateur aléatoire, hérité à l'identique du maître (il choisit
+  notamment le réplica de lecture de chaque vue).
+
+Les connexions des workers sont ensuite ouvertes à la demande, par chacun.
+"""
+import gc
+import random
+
+from django.core.cache import caches
+from django.db import connections
+
+
+def prepare_fork():
+    """Libère les ressources du maître avant le ``fork`` d'un worker."""
+    for connection in connections.all(initialized_only=True):
+        connection.close()
+        # Le pool psycopg tient des threads et des sockets propres au processus ;
+        # la propriété ``pool`` le créerait : seuls les pools existants sont fermés
+        if connection.alias in getattr(connection, '_connection_pools', ()):
+            connection.close_pool()
+    caches.close_all()
+    gc.freeze()
+
+
+def init_worker():
+    """Initialise les ressources propres à un worker, après le ``fork``."""
+    random.seed()
@@ -5,3 +5,8 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'oc_lettings_site.settings')
 
 application = get_wsgi_application()
+
+# Compile les templates du projet avant la première requête
+from oc_lettings_site.template_loading import warm_template_cache  # noqa: E402
+
+warm_template_cache()
@@ -0,0 +1,91 @@
+"""
+API JSON en lecture seule des profils.
+
+Routes :
+    ``/api/profiles/`` : liste paginée par curseur (:func:`profile_list`).
+    ``/api/profiles/<username>/`` : un profil (:func:`profile_detail`).
+
+Un profil réunit les champs affichés par la page de profil, restreints à
+ceux du paramètre ``fields`` (voir :mod:`oc_lettings_site.api`).
+
+Comme la page de profil, :func:`profile_detail` lit le profil par le cache
+d'objets (un nom inconnu y reste brièvement mémorisé) et limite le débit par
+adresse IP.
+"""
+from functools import reduce
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from oc_lettings_site import api, object_cache
+from oc_lettings_site.db_routing import use_read_database
+from oc_lettings_site.page_cache import cached_page
+from oc_lettings_site.pagination import paginate
+from oc_lettings_site.rate_limit import rate_limited
+from .models import Profile
+from .views import PROFILE_DETAIL_FIELDS
+
+PROFILE_FIELDS = {
+    'username': 'user__username',
+    'first_name': 'user__first_name',
+    'last_name': 'user__last_name',
+    'email': 'user__email',
+    'favorite_city': 'favorite_city',
+}
+
+
+@api.api_view
+@cached_page('profiles')
+@use_read_database
+def profile_list(request):
+    """
+    Vue qui renvoie une page de profils en JSON.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue (``fields``, ``after``,
+            ``before``, ``size``).
+
+    Returns:
+        JsonResponse: ``{"results": [...], "next": url, "previous": url}``.
+    """
+    fields = api.select_fields(request, PROFILE_FIELDS)
+    rows = Profile.objects.values('id', *api.orm_paths(fields))
+    page = paginate(rows, request, settings.PROFILES_PAGE_SIZE)
+    data = {'results': [api.shape(row, fields) for row in page]}
+    data.update(api.page_links(request, page))
+    return api.json_response(data)
+
+
+@api.api_view
+@rate_limited('profile')
+@cached_page('profiles')
+@use_read_database
+def profile_detail(request, username):
+    """
+    Vue qui renvoie un profil en JSON.
+
+    Le profil et son utilisateur sont lus par le cache d'objets, partagé avec
+    la page de profil : les demandes répétées d'un nom inconnu ne touchent
+    pas la base.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue (``fields``).
+        username (str): Le nom d'utilisateur du profil.
+
+    Returns:
+        JsonResponse: Le profil, ou une erreur 404.
+    """
+    fields = api.select_fields(request, PROFILE_FIELDS)
+    try:
+        profile = object_cache.get_or_load(
+            'profile', username,
+            lambda: Profile.objects.select_related('user')
+            .only(*PROFILE_DETAIL_FIELDS)
+            .get(user__username=username),
+        )
+    except ObjectDoesNotExist:
+        return api.json_error("Profil introuvable.", status=404)
+    row = {
+        path: reduce(getattr, path.split('__'), profile)
+        for path in api.orm_paths(fields)
+    }
+    return api.json_response(api.shape(row, fields))
@@ -0,0 +1,75 @@
+"""
+Construction, écriture et lecture en masse des profils.
+
+Utilisé par les commandes ``import_profiles`` / ``export_profiles``. Une ligne
+décrit un utilisateur et son profil, à plat :
+``username, first_name, last_name, email, favorite_city``.
+"""
+from django.contrib.auth.models import User
+
+from oc_lettings_site import page_cache
+from oc_lettings_site.bulk import validate
+from .models import Profile
+
+USER_FIELDS = ('username', 'first_name', 'last_name', 'email')
+PROFILE_FIELDS = USER_FIELDS + ('favorite_city',)
+
+
+def build_profile(line_number, row):
+    """
+    Construit et valide l'utilisateur et le profil d'une ligne importée.
+
+    Les utilisateurs importés reçoivent un mot de passe inutilisable : ils ne
+    peuvent pas se connecter tant qu'un mot de passe n'a pas été défini.
+
+    Args:
+        line_number (int): Numéro de la ligne, pour les messages d'erreur.
+        row (dict): Valeurs de la ligne.
+
+    Returns:
+        tuple: ``(User, Profile)`` non enregistrés.
+
+    Raises:
+        ValidationError: Si une valeur enfreint les validateurs des modèles.
+    """
+    user = User(**{field: row.get(field, '') for field in USER_FIELDS})
+    user.set_unusable_password()
+    validate(user, line_number)
+    profile = Profile(favorite_city=row.get('favorite_city', ''))
+    validate(profile, line_number, exclude=['user'])
+    return user, profile
+
+
+def write_profiles(batch):
+    """
+    Écrit un lot de couples ``(User, Profile)`` en deux ``bulk_create``.
+    """
+    users = User.objects.bulk_create([user for user, _ in batch])
+    profiles = []
+    for user, (_, profile) in zip(users, batch):
+        profile.user = user
+        profiles.append(profile)
+    Profile.objects.bulk_create(profiles)
+
+
+def after_import():
+    """Invalide les pages ``profiles``, ``bulk_create`` n'émettant pas de signaux."""
+    page_cache.bump_version('profiles')
+
+
+def iter_profiles(chunk_size=2000):
+    """
+    Parcourt tous les profils et leur utilisateur, triés par id.
+
+    Args:
+        chunk_size (int): Nombre de lignes lues par aller-retour en base.
+
+    Returns:
+        iterator: Tuples de valeurs, dans l'ordre de ``PROFILE_FIELDS``.
+    """
+    columns = tuple(f'user__{field}' for field in USER_FIELDS) + ('favorite_city',)
+    return (
+        Profile.objects.order_by('id')
+        .values_list(*columns)
+        .iterator(chunk_size=chunk_size)
+    )
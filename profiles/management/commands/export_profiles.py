@@ -0,0 +1,17 @@
+from oc_lettings_site.bulk import ExportCommand
+
+from profiles import bulk
+
+
+class Command(ExportCommand):
+    """
+    Commande qui exporte tous les profils et leur utilisateur.
+
+    Usage :
+        python manage.py export_profiles profiles.jsonl [--batch-size 2000]
+    """
+
+    help = "Exporte les profils vers un fichier CSV ou JSON Lines, en flux."
+
+    fields = bulk.PROFILE_FIELDS
+    rows = staticmethod(bulk.iter_profiles)
@@ -0,0 +1,18 @@
+from oc_lettings_site.bulk import ImportCommand
+
+from profiles import bulk
+
+
+class Command(ImportCommand):
+    """
+    Commande qui importe des utilisateurs et leur profil par lots.
+
+    Usage :
+        python manage.py import_profiles profiles.csv [--batch-size 1000] [--skip-invalid]
+    """
+
+    help = "Importe des profils depuis un fichier CSV ou JSON Lines, par lots."
+
+    build = staticmethod(bulk.build_profile)
+    write = staticmethod(bulk.write_profiles)
+    after_import = staticmethod(bulk.after_import)
@@ -1,15 +1,67 @@
+import logging
+import time
+
 from django.db import migrations
 
+logger = logging.getLogger(__name__)
+
+BATCH_SIZE = 2000
+
+PROFILE_FIELDS = ('id', 'user_id', 'favorite_city')
+
+
+def copy_profiles(source, target, using, ignore_conflicts=False):
+    """
+    Copie les profils de ``source`` vers ``target`` par lots de ``BATCH_SIZE``.
+
+    Les lignes sont lues par un itérateur côté serveur et insérées par
+    ``bulk_create`` : un aller-retour par lot au lieu d'un par ligne. Avec
+    ``ignore_conflicts``, les profils déjà présents dans ``target`` sont
+    conservés.
+    """
+    start = time.perf_counter()
+    rows = source.objects.using(using).order_by('id').values(*PROFILE_FIELDS)
+    batch, total = [], 0
+    for row in rows.iterator(chunk_size=BATCH_SIZE):
+        batch.append(target(**row))
+        if len(batch) == BATCH_SIZE:
+            target.objects.using(using).bulk_create(batch, ignore_conflicts=ignore_conflicts)
+            total += len(batch)
+            batch = []
+            logger.info("Profile : %d lignes copiées...", total)
+    if batch:
+        target.objects.using(using).bulk_create(batch, ignore_conflicts=ignore_conflicts)
+        total += len(batch)
+    logger.info("Profile : %d lignes copiées en %.2f s", total, time.perf_counter() - start)
+
+
 def migrate_profiles_data(apps, schema_editor):
-    OldProfile = apps.get_model('profiles', 'Profile')
+    """Copie les profils de ``oc_lettings_site`` vers ``profiles`` par lots."""
+    copy_profiles(
+        apps.get_model('oc_lettings_site', 'Profile'),
+        apps.get_model('profiles', 'Profile'),
+        schema_editor.connection.alias,
+    )
+
+
+def unmigrate_profiles_data(apps, schema_editor):
+    """
+    Recopie les profils dans l'ancienne table, recréée vide par l'annulation
+    de ``oc_lettings_site.0002`` (ou encore remplie si elle n'avait pas été
+    appliquée : les profils présents sont gardés), puis vide la nouvelle
+    table.
+    """
     NewProfile = apps.get_model('profiles', 'Profile')
-    
-    for profile in OldProfile.objects.all():
-        NewProfile.objects.create(
-            id=profile.id,
-            user_id=profile.user_id,
-            favorite_city=profile.favorite_city,
-        )
+    copy_profiles(
+        NewProfile, apps.get_model('oc_lettings_site', 'Profile'),
+        schema_editor.connection.alias, ignore_conflicts=True,
+    )
+    start = time.perf_counter()
+    schema_editor.execute(
+        f"DELETE FROM {schema_editor.quote_name(NewProfile._meta.db_table)}"
+    )
+    logger.info("Profile : table vidée en %.2f s", time.perf_counter() - start)
+
 
 class Migration(migrations.Migration):
     dependencies = [
@@ -17,6 +69,11 @@ class Migration(migrations.Migration):
         ('oc_lettings_site', '0001_initial'),
     ]
 
+    # Les anciennes tables doivent encore exister pendant la copie
+    run_before = [
+        ('oc_lettings_site', '0002_auto_20251016_1313'),
+    ]
+
     operations = [
-        migrations.RunPython(migrate_profiles_data),
+        migrations.RunPython(migrate_profiles_data, unmigrate_profiles_data),
     ]
@@ -0,0 +1,36 @@
+from django.db import migrations
+
+# Index de la recherche par préfixe du nom d'utilisateur de l'admin des
+# profils (lookup istartswith sur auth_user.username, voir
+# lettings/migrations/0007_address_search_indexes.py).
+FORWARD_SQL = {
+    'sqlite': "CREATE INDEX auth_user_username_nocase_idx ON auth_user (username COLLATE NOCASE)",
+    'postgresql': (
+        "CREATE INDEX auth_user_username_nocase_idx "
+        "ON auth_user (UPPER(username::text) text_pattern_ops)"
+    ),
+}
+REVERSE_SQL = "DROP INDEX IF EXISTS auth_user_username_nocase_idx"
+
+
+def create_index(apps, schema_editor):
+    statement = FORWARD_SQL.get(schema_editor.connection.vendor)
+    if statement:
+        schema_editor.execute(statement)
+
+
+def drop_index(apps, schema_editor):
+    if schema_editor.connection.vendor in FORWARD_SQL:
+        schema_editor.execute(REVERSE_SQL)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('profiles', '0003_profile_favorite_city_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -9,7 +9,7 @@ class Profile(models.Model):
     Attributs :
         user (OneToOneField) : Utilisateur lié à ce profil.
         favorite_city (CharField) : Ville favorite de l'utilisateur
-        (optionnelle, max 64 caractères).
+        (optionnelle, max 64 caractères), indexée.
 
     Méthodes :
         __str__() : Retourne le nom d'utilisateur associé.
@@ -21,5 +21,10 @@ class Profile(models.Model):
     )
     favorite_city = models.CharField(max_length=64, blank=True)
 
+    class Meta:
+        indexes = [
+            models.Index(fields=['favorite_city'], name='profile_favorite_city_idx'),
+        ]
+
     def __str__(self):
         return self.user.username
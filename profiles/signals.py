@@ -0,0 +1,62 @@
+"""
+Signaux de l'application ``profiles``.
+
+Invalident le cache d'objets des pages de profil, indexé par nom
+d'utilisateur, et renouvellent la version des pages ``profiles`` dès qu'un
+profil ou son utilisateur change. L'ancien nom est relevé avant
+l'enregistrement pour couvrir les renommages et les changements d'utilisateur
+d'un profil. La simple mise à jour de ``last_login`` à la connexion est
+ignorée : elle n'apparaît sur aucune page.
+"""
+from django.contrib.auth.models import User
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+
+from oc_lettings_site import object_cache, page_cache
+from .models import Profile
+
+
+def _is_login_update(kwargs):
+    """Indique si l'enregistrement ne touche que la date de dernière connexion."""
+    return kwargs.get('update_fields') == frozenset({'last_login'})
+
+
+def _username_of(user_id):
+    """Renvoie le nom d'utilisateur enregistré en base, ou ``None``."""
+    return User.objects.filter(pk=user_id).values_list('username', flat=True).first()
+
+
+@receiver(pre_save, sender=User)
+def remember_previous_username(sender, instance, **kwargs):
+    """Mémorise le nom d'utilisateur avant modification."""
+    if _is_login_update(kwargs):
+        return
+    instance._previous_username = _username_of(instance.pk) if instance.pk else None
+
+
+@receiver(pre_save, sender=Profile)
+def remember_previous_profile_username(sender, instance, **kwargs):
+    """Mémorise le nom de l'utilisateur lié au profil avant modification."""
+    previous_user_id = (
+        Profile.objects.filter(pk=instance.pk).values_list('user_id', flat=True).first()
+        if instance.pk else None
+    )
+    instance._previous_username = _username_of(previous_user_id) if previous_user_id else None
+
+
+@receiver([post_save, post_delete], sender=User)
+def invalidate_user_profile(sender, instance, **kwargs):
+    """Supprime du cache le profil de l'utilisateur enregistré ou supprimé."""
+    if _is_login_update(kwargs):
+        return
+    usernames = {instance.username, getattr(instance, '_previous_username', None)}
+    object_cache.invalidate('profile', *(name for name in usernames if name))
+    page_cache.bump_version('profiles')
+
+
+@receiver([post_save, post_delete], sender=Profile)
+def invalidate_profile(sender, instance, **kwargs):
+    """Supprime du cache le profil enregistré ou supprimé."""
+    usernames = {_username_of(instance.user_id), getattr(instance, '_previous_username', None)}
+    object_cache.invalidate('profile', *(name for name in usernames if name))
+    page_cache.bump_version('profiles')
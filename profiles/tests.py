@@ -1,3 +1,310 @@
-# from django.test import TestCase
+"""
+Module de tests unitaires de l'application ``profiles``.
 
-# Create your tests here.
+Ce module contient des tests pour :
+- La liste paginée des profils et son nombre de requêtes
+- Le mode de diffusion par blocs de la liste des profils
+- Le cache d'objets de la page de profil et son invalidation
+- L'import et l'export en masse des profils
+- Les vues asynchrones servies en mode ASGI
+- L'API JSON des profils
+"""
+
+from io import StringIO
+
+import pytest
+from asgiref.sync import async_to_sync
+from django.contrib.auth.models import User
+from django.core.management import CommandError, call_command
+from django.db import connection
+from django.test import AsyncRequestFactory
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from oc_lettings_site import page_cache
+from profiles import views
+from profiles.models import Profile
+
+
+def create_profile(username, **fields):
+    """
+    Crée un utilisateur et son profil pour les besoins des tests.
+
+    :param username: nom d'utilisateur.
+    :type username: str
+    :return: le profil créé.
+    :rtype: profiles.models.Profile
+    """
+    user = User.objects.create(username=username, email=f"{username}@example.com")
+    return Profile.objects.create(user=user, **fields)
+
+
+# =========================
+# INDEX TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_profiles_index_has_no_n_plus_one(client):
+    """
+    Vérifie que la liste charge les noms d'utilisateur dans une seule requête
+    jointe, quel que soit le nombre de profils affichés.
+
+    :param client: client de test Django.
+    """
+    for i in range(10):
+        create_profile(f"user{i}")
+
+    with CaptureQueriesContext(connection) as queries:
+        response = client.get(reverse("profiles_index"))
+
+    profile_queries = [q["sql"] for q in queries if "profiles_profile" in q["sql"]]
+    assert len(profile_queries) == 1
+    assert "auth_user" in profile_queries[0]
+    assert b"user9" in response.content
+
+
+@pytest.mark.django_db
+def test_profiles_index_is_paginated(client, settings):
+    """
+    Vérifie que la liste des profils est paginée par curseur.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.PROFILES_PAGE_SIZE = 2
+    profiles = [create_profile(f"user{i}") for i in range(3)]
+
+    first = client.get(reverse("profiles_index")).context["page"]
+    assert [str(profile) for profile in first] == ["user0", "user1"]
+
+    second = client.get(reverse("profiles_index"), {"after": first.next_cursor})
+    assert [profile.id for profile in second.context["page"]] == [profiles[2].id]
+
+
+@pytest.mark.django_db
+def test_profiles_index_stream(client, settings):
+    """
+    Vérifie que le mode ``?stream=1`` diffuse la page complète par blocs.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.PROFILES_STREAM_CHUNK_SIZE = 2
+    for i in range(5):
+        create_profile(f"user{i}")
+
+    response = client.get(reverse("profiles_index"), {"stream": "1"})
+    assert response.streaming
+    chunks = list(response.streaming_content)
+    content = b"".join(chunks).decode()
+
+    # En-tête, trois blocs de lignes puis pied de page
+    assert len(chunks) == 5
+    assert content.index("user0") < content.index("user4") < content.index("</html>")
+    assert "<!-- profiles-stream -->" not in content
+
+
+# =========================
+# DETAIL CACHE TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_profile_detail_cache_hits_and_invalidation(client, settings):
+    """
+    Vérifie que la page de profil est servie par le cache, que les compteurs
+    sont exposés et que la modification de l'utilisateur invalide l'entrée.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    profile = create_profile("alice", favorite_city="Paris")
+    url = reverse("profile", kwargs={"username": "alice"})
+
+    client.get(url)
+    # Force un nouveau rendu de la page pour atteindre le cache d'objets
+    page_cache.bump_version("profiles")
+    with CaptureQueriesContext(connection) as queries:
+        client.get(url)
+    assert len(queries) == 0
+
+    profile.user.email = "new@example.com"
+    profile.user.save()
+    assert b"new@example.com" in client.get(url).content
+
+    # Le processus de la commande ne lit que les compteurs d'un cache partagé
+    with pytest.raises(CommandError, match="propre à chaque worker"):
+        call_command("cache_stats", stdout=StringIO())
+    settings.SHARED_CACHE = True
+    out = StringIO()
+    call_command("cache_stats", stdout=out)
+    assert "hits=1 misses=2" in out.getvalue()
+
+
+@pytest.mark.django_db
+def test_profile_detail_cache_invalidated_on_rename(client):
+    """
+    Vérifie qu'un renommage d'utilisateur invalide l'entrée de l'ancien nom.
+
+    :param client: client de test Django.
+    """
+    profile = create_profile("bob")
+    client.get(reverse("profile", kwargs={"username": "bob"}))
+
+    profile.user.username = "robert"
+    profile.user.save()
+
+    assert client.get(reverse("profile", kwargs={"username": "bob"})).status_code == 404
+
+
+# =========================
+# BULK IMPORT / EXPORT TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_import_then_export_profiles(tmp_path):
+    """
+    Vérifie qu'un import JSON Lines crée les utilisateurs (sans mot de passe
+    utilisable) et leur profil, puis que l'export CSV les restitue.
+
+    :param tmp_path: dossier temporaire fourni par Pytest.
+    """
+    source = tmp_path / "profiles.jsonl"
+    source.write_text(
+        '{"username": "HeadlinesGazer", "email": "jssssss33@acee9.live", '
+        '"favorite_city": "Buenos Aires"}\n'
+        '{"username": "DavWin", "first_name": "Dave", "favorite_city": "Barcelona"}\n'
+    )
+    call_command("import_profiles", str(source), stdout=StringIO())
+
+    profile = Profile.objects.select_related("user").get(user__username="DavWin")
+    assert profile.favorite_city == "Barcelona"
+    assert not profile.user.has_usable_password()
+
+    target = tmp_path / "profiles.csv"
+    call_command("export_profiles", str(target), stderr=StringIO())
+    lines = target.read_text().splitlines()
+    assert lines[0] == "username,first_name,last_name,email,favorite_city"
+    assert lines[2] == "DavWin,Dave,,,Barcelona"
+
+
+@pytest.mark.django_db
+def test_import_profiles_rejects_invalid_email(tmp_path):
+    """
+    Vérifie qu'un email invalide interrompt l'import avec le numéro de ligne.
+
+    :param tmp_path: dossier temporaire fourni par Pytest.
+    """
+    source = tmp_path / "profiles.jsonl"
+    source.write_text('{"username": "bob", "email": "not-an-email"}\n')
+
+    with pytest.raises(CommandError, match="ligne 1 : email"):
+        call_command("import_profiles", str(source), stdout=StringIO())
+
+
+@pytest.mark.django_db
+def test_interrupted_import_still_invalidates_pages(tmp_path):
+    """
+    Vérifie qu'un lot rejeté interrompt l'import, mais que les pages
+    ``profiles`` sont invalidées pour les lots déjà enregistrés.
+
+    :param tmp_path: dossier temporaire fourni par Pytest.
+    """
+    source = tmp_path / "profiles.jsonl"
+    source.write_text('{"username": "alice"}\n{"username": "alice"}\n')
+    version = page_cache.get_version("profiles")
+
+    with pytest.raises(CommandError, match="Lot rejeté après 1 lignes"):
+        call_command("import_profiles", str(source), batch_size=1, stdout=StringIO())
+    assert Profile.objects.filter(user__username="alice").exists()
+    assert page_cache.get_version("profiles") > version
+
+
+# =========================
+# ASYNC VIEWS TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_async_profile_views(settings):
+    """
+    Vérifie la vue asynchrone de profil et la diffusion asynchrone de la
+    liste complète des profils.
+
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.PROFILES_STREAM_CHUNK_SIZE = 2
+    for i in range(3):
+        create_profile(f"user{i}", favorite_city="Lyon")
+    factory = AsyncRequestFactory()
+
+    url = reverse("profile", kwargs={"username": "user1"})
+    detail = async_to_sync(views.profile_async)(factory.get(url), username="user1")
+    assert b"user1@example.com" in detail.content
+
+    response = async_to_sync(views.index_async)(factory.get("/profiles/", {"stream": "1"}))
+    assert response.streaming
+
+    async def collect():
+        return [chunk async for chunk in response.streaming_content]
+
+    chunks = async_to_sync(collect)()
+    content = b"".join(chunks).decode()
+    # En-tête, deux blocs de lignes puis pied de page
+    assert len(chunks) == 4
+    assert content.index("user0") < content.index("user2") < content.index("</html>")
+
+
+# =========================
+# API TESTS
+# =========================
+
+@pytest.mark.django_db
+def test_profiles_api_list_and_detail(client, settings):
+    """
+    Vérifie la liste paginée et le détail JSON des profils, avec sélection
+    de champs, en une requête SQL, et l'erreur 404 d'un profil inconnu.
+
+    :param client: client de test Django.
+    :param settings: fixture pytest-django pour surcharger les réglages.
+    """
+    settings.PROFILES_PAGE_SIZE = 2
+    for name in ("alice", "bob", "carol"):
+        create_profile(name, favorite_city="Paris")
+
+    with CaptureQueriesContext(connection) as queries:
+        first = client.get(reverse("api_profiles"), {"fields": "username"}).json()
+    assert len(queries) == 1
+    assert first["results"] == [{"username": "alice"}, {"username": "bob"}]
+    second = client.get(first["next"]).json()
+    assert second["results"] == [{"username": "carol"}]
+
+    detail = client.get(reverse("api_profile", args=["bob"])).json()
+    assert detail == {
+        "username": "bob", "first_name": "", "last_name": "",
+        "email": "bob@example.com", "favorite_city": "Paris",
+    }
+    assert client.get(reverse("api_profile", args=["nobody"])).status_code == 404
+
+
+@pytest.mark.django_db
+def test_profiles_api_unknown_profile_is_a_cached_404(client):
+    """
+    Vérifie que le détail JSON d'un nom inconnu est une erreur 404, que les
+    demandes suivantes ne touchent pas la base, et que la création du profil
+    efface l'absence mémorisée.
+
+    :param client: client de test Django.
+    """
+    url = reverse("api_profile", args=["dave"])
+
+    with CaptureQueriesContext(connection) as first:
+        response = client.get(url)
+    assert response.status_code == 404
+    assert response.json() == {"detail": "Profil introuvable."}
+    with CaptureQueriesContext(connection) as second:
+        assert client.get(url).status_code == 404
+    assert len(first) == 1 and len(second) == 0
+
+    create_profile("dave", favorite_city="Lyon")
+    assert client.get(url, {"fields": "username,favorite_city"}).json() == {
+        "username": "dave", "favorite_city": "Lyon",
+    }
@@ -1,27 +1,141 @@
+from itertools import islice
+
+from django.conf import settings
+from django.core.exceptions import ObjectDoesNotExist
+from django.http import Http404, StreamingHttpResponse
 from django.shortcuts import render
+from django.template.loader import get_template, render_to_string
+from django.utils.safestring import mark_safe
+from oc_lettings_site import object_cache
+from oc_lettings_site.db_routing import use_read_database
+from oc_lettings_site.page_cache import cached_page
+from oc_lettings_site.pagination import apaginate, paginate
+from oc_lettings_site.rate_limit import rate_limited
 from .models import Profile
 
 
+STREAM_MARKER = '<!-- profiles-stream -->'
+
+# Champs affichés par la page de détail : seuls ceux-ci sont mis en cache
+PROFILE_DETAIL_FIELDS = (
+    'favorite_city',
+    'user__username',
+    'user__first_name',
+    'user__last_name',
+    'user__email',
+)
+
+
+def _profiles_queryset():
+    """
+    Renvoie le queryset de la liste des profils : une seule requête jointe
+    sur ``auth_user``, limitée aux colonnes affichées.
+    """
+    return Profile.objects.select_related('user').only('id', 'user__username')
+
+
+def _stream_index(request):
+    """
+    Diffuse la liste complète des profils par blocs.
+
+    La page est rendue une fois autour d'un marqueur, puis les lignes sont
+    lues via un itérateur côté serveur et rendues bloc par bloc : le worker
+    ne garde jamais plus de ``PROFILES_STREAM_CHUNK_SIZE`` profils en mémoire.
+
+    Args:
+        request (HttpRequest): La requête HTTP reçue.
+
+    Returns:
+        StreamingHttpResponse: La page HTML diffusée par morceaux.
+    """
+    chunk_size = settings.PROFILES_STREAM_CHUNK_SIZE
+    page = render_to_string(
+        'profiles/index.html', {'stream_marker': mark_safe(STREAM_MARKER)}, request
+    )
+    head, tail = page.split(STREAM_MARKER, 1)
+    rows_template = get_template('profiles/_profile_rows.html')
+    profiles = _profiles_queryset().order_by('id')
+    # Le générateur est consommé après le retour de la vue : l'alias de
+    # lecture est fixé tant qu'il est encore connu
+    profiles = profiles.using(profiles.db).iterator(chunk_size=chunk_size)
+
+    def generate():
+        yield head
+        while True:
+            chunk = list(islice(profiles, chunk_size))
+            if not chunk:
+                break
+            yield rows_template.render({'profiles_list': chunk})
+        yield tail
+
+    return StreamingHttpResponse(generate(), content_type='text/html; charset=utf-8')
+
+
+def _astream_index(request):
+    """
+    Version asynchrone de :func:`_stream_index` : les profils sont lus par
+    itération asynchrone de l'ORM et la réponse est diffusée par un
+    générateur asynchrone.
+    """
+    chunk_size = settings.PROFILES_STREAM_CHUNK_SIZE
+    page = render_to_string(
+        'profiles/index.html', {'stream_marker': mark_safe(STREAM_MARKER)}, request
+    )
+    head, tail = page.split(STREAM_MARKER, 1)
+    rows_template = get_template('profiles/_profile_rows.html')
+    profiles = _profiles_queryset().order_by('id')
+    profiles = profiles.using(profiles.db).aiterator(chunk_size=chunk_size)
+
+    async def generate():
+        yield head
+        chunk = []
+        async for profile in profiles:
+            chunk.append(profile)
+            if len(chunk) == chunk_size:
+                yield rows_template.render({'profiles_list': chunk})
+                chunk = []
+        if chunk:
+            yield rows_template.render({'profiles_list': chunk})
+        yield tail
+
+    return StreamingHttpResponse(generate(), content_type='text/html; charset=utf-8')
+
+
+@cached_page('profiles')
+@use_read_database
 def index(request):
     """
-    Vue qui affiche la liste de tous les profils.
+    Vue qui affiche la liste paginée des profils.
+
+    Les noms d'utilisateur sont chargés par jointure dans la même requête que
+    les profils. Avec ``?stream=1``, la liste complète est diffusée par blocs
+    au lieu d'être paginée.
 
     Args:
         request (HttpRequest): La requête HTTP reçue.
 
     Returns:
         HttpResponse: La réponse contenant le template 'profiles/index.html'
-                      avec le contexte {'profiles_list': profiles_list}.
+                      avec le contexte {'profiles_list': ..., 'page': page}.
     """
-    profiles_list = Profile.objects.all()
-    context = {'profiles_list': profiles_list}
+    if request.GET.get('stream') == '1':
+        return _stream_index(request)
+    page = paginate(_profiles_queryset(), request, settings.PROFILES_PAGE_SIZE)
+    context = {'profiles_list': page.object_list, 'page': page}
     return render(request, 'profiles/index.html', context)
 
 
+@rate_limited('profile')
+@cached_page('profiles')
+@use_read_database
 def profile(request, username):
     """
     Vue qui affiche les détails d'un profil spécifique en fonction du nom d'utilisateur.
 
+    Le profil et son utilisateur sont chargés en une requête, limitée aux
+    champs affichés, puis servis par le cache d'objets. Un nom inconnu donne
+    la page 404, et son absence reste brièvement en cache.
+
     Args:
         request (HttpRequest): La requête HTTP reçue.
         username (str): Le nom d'utilisateur associé au profil.
@@ -29,7 +143,53 @@ def profile(request, username):
     Returns:
         HttpResponse: La réponse contenant le template 'profiles/profile.html'
                       avec le contexte {'profile': profile}.
+
+    Raises:
+        Http404: Si aucun profil n'a ce nom d'utilisateur.
+    """
+    try:
+        profile = object_cache.get_or_load(
+            'profile', username,
+            lambda: Profile.objects.select_related('user')
+            .only(*PROFILE_DETAIL_FIELDS)
+            .get(user__username=username),
+        )
+    except ObjectDoesNotExist:
+        raise Http404("Profil introuvable.")
+    context = {'profile': profile}
+    return render(request, 'profiles/profile.html', context)
+
+
+@cached_page('profiles')
+@use_read_database
+async def index_async(request):
+    """
+    Version asynchrone de :func:`index`, servie en mode ASGI.
+    """
+    if request.GET.get('stream') == '1':
+        return _astream_index(request)
+    page = await apaginate(_profiles_queryset(), request, settings.PROFILES_PAGE_SIZE)
+    context = {'profiles_list': page.object_list, 'page': page}
+    return render(request, 'profiles/index.html', context)
+
+
+@rate_limited('profile')
+@cached_page('profiles')
+@use_read_database
+async def profile_async(request, username):
+    """
+    Version asynchrone de :func:`profile`, servie en mode ASGI.
+
+    Le profil est chargé par ``aget`` en cas d'absence du cache d'objets.
     """
-    profile = Profile.objects.get(user__username=username)
+    try:
+        profile = await object_cache.aget_or_load(
+            'profile', username,
+            lambda: Profile.objects.select_related('user')
+            .only(*PROFILE_DETAIL_FIELDS)
+            .aget(user__username=username),
+        )
+    except ObjectDoesNotExist:
+        raise Http404("Profil introuvable.")
     context = {'profile': profile}
     return render(request, 'profiles/profile.html', context)
@@ -0,0 +1,24 @@
+#!/usr/bin/env bash
+# Lance le serveur d'application selon SERVER_MODE :
+#   wsgi (défaut) : workers gunicorn synchrones sur oc_lettings_site.wsgi
+#   asgi          : workers uvicorn (uvicorn-worker) sur oc_lettings_site.asgi
+# Le reste de la configuration (classe et nombre de workers, threads, délais,
+# préchargement, hooks des workers) est lu par gunicorn dans gunicorn.conf.py,
+# depuis le dossier courant : dimensionnée d'après le CPU et la mémoire du
+# conteneur, elle reste ajustable par l'environnement (WEB_CONCURRENCY...).
+set -e
+
+BIND="0.0.0.0:${PORT:-8000}"
+
+case "${SERVER_MODE:-wsgi}" in
+  asgi)
+    exec gunicorn oc_lettings_site.asgi:application --bind "$BIND" --log-level info
+    ;;
+  wsgi)
+    exec gunicorn oc_lettings_site.wsgi:application --bind "$BIND" --log-level info
+    ;;
+  *)
+    echo "SERVER_MODE inconnu : ${SERVER_MODE} (attendu : wsgi ou asgi)" >&2
+    exit 1
+    ;;
+esac